@@ -0,0 +1,165 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from filtros import COLUNAS_FACETAS
+
+# Dimensões exibidas na aba de estatísticas
+DIMENSOES_ESTATISTICAS = ["Ramo Direito", "Repercussão Geral", "Classe Processo"]
+
+_SEM_PERIODO = -1
+
+
+# Códigos das facetas e mês (meses desde 1970) das linhas a partir de "inicio"
+def _chaves_linhas(motor, colunas, inicio):
+    codigos = np.column_stack([motor.facetas[c]["codigos"][inicio:] for c in colunas])
+
+    datas = np.empty(motor.num_linhas, dtype="datetime64[ns]")
+    datas[motor.ordem_datas] = motor.datas_ordenadas
+    datas = datas[inicio:]
+    periodos = datas.astype("datetime64[M]").astype(np.int64)
+    periodos[np.isnat(datas)] = _SEM_PERIODO
+
+    return codigos, periodos
+
+
+# Cubo de agregações: contagens por (faceta × ano × mês), calculado uma vez por versão
+#
+# Cada célula do cubo é uma combinação distinta dos códigos das facetas e do mês
+# (meses desde 1970). Estatísticas filtradas somam células em vez de varrer linhas;
+# quando o filtro não cabe no cubo (pesquisa por termo ou intervalo de datas que
+# corta um mês ao meio), as contagens saem dos códigos das linhas filtradas.
+class CuboAgregacoes:
+    def __init__(self, motor, colunas, codigos, periodos, celulas, quantidades, max_memo=256):
+        self.motor = motor
+        self.colunas = list(colunas)
+        self.codigos = codigos
+        self.periodos = periodos
+        self.celulas = celulas
+        self.quantidades = quantidades
+        self.max_memo = max_memo
+        self._memo = OrderedDict()
+        self._trava = threading.Lock()
+
+        validos = periodos[periodos != _SEM_PERIODO]
+        self.periodo_inicial = int(validos.min()) if len(validos) else 0
+
+    # Serialização (modo de serviço): o memo e a trava ficam de fora
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado["_memo"], estado["_trava"]
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._memo = OrderedDict()
+        self._trava = threading.Lock()
+
+    @classmethod
+    def construir(cls, motor, colunas=COLUNAS_FACETAS):
+        codigos, periodos = _chaves_linhas(motor, colunas, 0)
+        celulas, quantidades = np.unique(np.column_stack([codigos, periodos]), axis=0, return_counts=True)
+        return cls(motor, colunas, codigos, periodos, celulas, quantidades)
+
+    # Função para criar um novo cubo a partir de um motor estendido com novos registros
+    # (os códigos antigos continuam válidos; só as linhas novas são agregadas)
+    def estendido(self, motor):
+        codigos, periodos = _chaves_linhas(motor, self.colunas, self.motor.num_linhas)
+
+        chaves = np.concatenate([self.celulas, np.column_stack([codigos, periodos])])
+        pesos = np.concatenate([self.quantidades, np.ones(len(codigos), dtype=self.quantidades.dtype)])
+        celulas, inverso = np.unique(chaves, axis=0, return_inverse=True)
+        quantidades = np.bincount(inverso.ravel(), weights=pesos, minlength=len(celulas)).astype(np.int64)
+
+        return CuboAgregacoes(
+            motor, self.colunas,
+            np.concatenate([self.codigos, codigos]), np.concatenate([self.periodos, periodos]),
+            celulas, quantidades, self.max_memo,
+        )
+
+    # Verifica se o intervalo cobre meses inteiros (considerando só as datas existentes)
+    def _intervalo_alinhado(self, inicio, fim):
+        datas = self.motor.datas_ordenadas
+        inicio_mes = np.datetime64(inicio, "M").astype("datetime64[ns]")
+        inicio = np.datetime64(inicio, "ns")
+        fim_dia = (np.datetime64(fim, "D") + np.timedelta64(1, "D")).astype("datetime64[ns]")
+        fim_mes = (np.datetime64(fim, "M") + np.timedelta64(1, "M")).astype("datetime64[ns]")
+
+        antes = np.searchsorted(datas, inicio, "left") - np.searchsorted(datas, inicio_mes, "left")
+        depois = np.searchsorted(datas, fim_mes, "left") - np.searchsorted(datas, fim_dia, "left")
+        return antes == 0 and depois == 0
+
+    # Contagens a partir das células do cubo
+    def _contar_cubo(self, selecoes, intervalo):
+        mascara = np.ones(len(self.celulas), dtype=bool)
+
+        for coluna, valor in selecoes.items():
+            if valor is None:
+                continue
+            codigo = self.motor.facetas[coluna]["posicao"].get(valor, -2)
+            mascara &= self.celulas[:, self.colunas.index(coluna)] == codigo
+
+        if intervalo is not None:
+            mes_inicio = np.datetime64(intervalo[0], "M").astype(np.int64)
+            mes_fim = np.datetime64(intervalo[1], "M").astype(np.int64)
+            periodos = self.celulas[:, -1]
+            mascara &= (periodos >= mes_inicio) & (periodos <= mes_fim)
+
+        return self.celulas[mascara], self.quantidades[mascara]
+
+    # Contagens a partir das linhas filtradas (cada linha é uma "célula" de peso 1)
+    def _contar_linhas(self, linhas):
+        chaves = np.column_stack([self.codigos[linhas], self.periodos[linhas]])
+        return chaves, np.ones(len(linhas), dtype=np.int64)
+
+    def _serie(self, codigos, pesos, valores):
+        validos = codigos >= 0
+        contagem = np.bincount(codigos[validos], weights=pesos[validos], minlength=len(valores))
+        serie = pd.Series(contagem.astype(np.int64), index=pd.Index(valores, dtype=object))
+        serie = serie[serie > 0]
+        # Mesma ordem do value_counts (quantidade decrescente)
+        return serie.iloc[np.argsort(-serie.to_numpy(), kind="stable")]
+
+    # Função para obter as estatísticas de um filtro
+    # selecoes/intervalo seguem o MotorFiltros; linhas é usado quando há pesquisa por termo
+    def estatisticas(self, selecoes, intervalo=None, linhas=None, termo=None):
+        assinatura = (tuple(sorted(selecoes.items(), key=lambda i: i[0])), intervalo, termo)
+        with self._trava:
+            if assinatura in self._memo:
+                self._memo.move_to_end(assinatura)
+                return self._memo[assinatura]
+
+        if termo is None and (intervalo is None or self._intervalo_alinhado(*intervalo)):
+            celulas, pesos = self._contar_cubo(selecoes, intervalo)
+        else:
+            if linhas is None:
+                linhas = self.motor.filtrar(selecoes, intervalo)
+            celulas, pesos = self._contar_linhas(linhas)
+
+        resultado = {
+            coluna: self._serie(celulas[:, self.colunas.index(coluna)], pesos, self.motor.facetas[coluna]["valores"])
+            for coluna in DIMENSOES_ESTATISTICAS
+        }
+
+        # Séries temporais por mês e por ano
+        periodos = celulas[:, -1]
+        validos = periodos != _SEM_PERIODO
+        if validos.any():
+            deslocados = periodos[validos] - self.periodo_inicial
+            por_mes = np.bincount(deslocados, weights=pesos[validos]).astype(np.int64)
+            meses = np.arange(self.periodo_inicial, self.periodo_inicial + len(por_mes))
+            serie_mes = pd.Series(por_mes, index=meses.astype("datetime64[M]"))
+        else:
+            serie_mes = pd.Series(dtype=np.int64, index=pd.DatetimeIndex([]))
+        resultado["Mês"] = serie_mes[serie_mes > 0]
+        resultado["Ano"] = serie_mes.groupby(serie_mes.index.year).sum().pipe(lambda s: s[s > 0])
+        resultado["Total"] = int(pesos.sum())
+
+        # Memo compartilhado entre sessões (o cubo vive em st.cache_resource)
+        with self._trava:
+            self._memo[assinatura] = resultado
+            if len(self._memo) > self.max_memo:
+                self._memo.popitem(last=False)
+        return resultado
@@ -0,0 +1,426 @@
+import datetime
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import tornado.httpserver
+import tornado.ioloop
+import tornado.web
+from tornado.log import app_log
+
+from instrumentacao import medir, metricas
+from nucleo import MODOS_BUSCA, FonteNucleo, cache_respostas, registros_json
+from relacionados import VIZINHOS
+from tendencias import MINIMO_REGISTROS
+
+PORTA = int(os.environ.get("INFORMATIVOS_PORTA_API", "8502"))
+
+# Limites por requisição
+LIMITE_PADRAO = 20
+LIMITE_MAXIMO = 500
+MAX_ASSERTIVAS = 5000
+MAX_LOTE = 100
+
+# Conexões keep-alive ociosas são fechadas depois deste tempo (segundos)
+TEMPO_OCIOSO = 60
+
+# Colunas devolvidas nas listagens (o resumo completo só com "completo": true)
+COLUNAS_LISTAGEM = ["Informativo", "Classe Processo", "Data Julgamento", "Título", "Ramo Direito", "Repercussão Geral"]
+
+_fonte = FonteNucleo()
+
+
+class ErroRequisicao(Exception):
+    pass
+
+
+def _inteiro(parametros, nome, padrao, minimo=0, maximo=None):
+    try:
+        valor = int(parametros.get(nome, padrao))
+    except (TypeError, ValueError):
+        raise ErroRequisicao(f"'{nome}' deve ser um inteiro")
+    if valor < minimo or (maximo is not None and valor > maximo):
+        raise ErroRequisicao(f"'{nome}' deve estar entre {minimo} e {maximo}")
+    return valor
+
+
+def _data(valor, nome):
+    try:
+        return datetime.date.fromisoformat(valor)
+    except (TypeError, ValueError):
+        raise ErroRequisicao(f"'{nome}' deve ser uma data AAAA-MM-DD")
+
+
+# Mês "AAAA-MM" -> meses desde 1970
+def _mes(valor, nome):
+    try:
+        data = datetime.datetime.strptime(valor, "%Y-%m")
+    except (TypeError, ValueError):
+        raise ErroRequisicao(f"'{nome}' deve ser um mês AAAA-MM")
+    return (data.year - 1970) * 12 + data.month - 1
+
+
+def _filtro(nucleo, parametros):
+    # {"selecoes": {"Ramo Direito": "..."}, "data_inicio": "2023-01-01", "data_fim": "...", "termo": "..."}
+    selecoes = parametros.get("selecoes") or {}
+    if not isinstance(selecoes, dict):
+        raise ErroRequisicao("'selecoes' deve ser um objeto {coluna: valor}")
+    desconhecidas = [c for c in selecoes if c not in nucleo.filtros.facetas]
+    if desconhecidas:
+        raise ErroRequisicao(f"facetas desconhecidas: {', '.join(desconhecidas)}")
+
+    intervalo = None
+    if parametros.get("data_inicio") or parametros.get("data_fim"):
+        inicio, fim = nucleo.filtros.intervalo_datas()
+        intervalo = (
+            _data(parametros["data_inicio"], "data_inicio") if parametros.get("data_inicio") else inicio,
+            _data(parametros["data_fim"], "data_fim") if parametros.get("data_fim") else fim,
+        )
+
+    return selecoes, intervalo, _texto(parametros, "termo"), _booleano(parametros, "busca_literal")
+
+
+def _listagem(nucleo, linhas, parametros):
+    limite = _inteiro(parametros, "limite", LIMITE_PADRAO, 0, LIMITE_MAXIMO)
+    deslocamento = _inteiro(parametros, "deslocamento", 0)
+    colunas = None if _booleano(parametros, "completo") else COLUNAS_LISTAGEM
+
+    pagina = np.asarray(linhas)[deslocamento:deslocamento + limite]
+    registros = nucleo.df.iloc[pagina]
+    if colunas is not None:
+        registros = registros[colunas]
+
+    itens = registros_json(registros)
+    grupos = nucleo.duplicatas.grupos[pagina].tolist()
+    for item, posicao, grupo in zip(itens, pagina.tolist(), grupos):
+        item["id"] = posicao
+        item["grupo_duplicatas"] = grupo
+    return itens
+
+
+def _booleano(parametros, nome):
+    valor = parametros.get(nome, False)
+    if isinstance(valor, str):
+        return valor.lower() not in ("", "0", "false", "nao", "não")
+    return bool(valor)
+
+
+def _texto(parametros, nome):
+    valor = parametros.get(nome)
+    if valor is not None and not isinstance(valor, str):
+        raise ErroRequisicao(f"'{nome}' deve ser texto")
+    return valor or None
+
+
+def _modo(parametros):
+    modo = parametros.get("modo", "palavras")
+    if modo not in MODOS_BUSCA:
+        raise ErroRequisicao(f"'modo' deve ser um de: {', '.join(MODOS_BUSCA)}")
+    return modo
+
+
+# Consultas expostas pela API: nome -> função(núcleo, parâmetros) -> resultado JSON
+def consultar_filtro(nucleo, parametros):
+    linhas = nucleo.filtrar(*_filtro(nucleo, parametros))
+    if _booleano(parametros, "agrupar_duplicatas"):
+        linhas = nucleo.duplicatas.unicos(linhas)
+    return {"total": len(linhas), "registros": _listagem(nucleo, linhas, parametros)}
+
+
+def consultar_pesquisa(nucleo, parametros):
+    consulta = _texto(parametros, "consulta") or _texto(parametros, "termo")
+    if not consulta:
+        raise ErroRequisicao("informe 'consulta'")
+    limite = _inteiro(parametros, "limite", LIMITE_PADRAO, 1, LIMITE_MAXIMO)
+    posicoes = nucleo.buscar(consulta, limite, _modo(parametros))
+    return {"total": len(posicoes), "registros": _listagem(nucleo, posicoes, {**parametros, "deslocamento": 0})}
+
+
+def consultar_estatisticas(nucleo, parametros):
+    estatisticas = nucleo.estatisticas(*_filtro(nucleo, parametros))
+    resultado = {"total": estatisticas["Total"]}
+    for chave, serie in estatisticas.items():
+        if isinstance(serie, pd.Series):
+            rotulos = serie.index.strftime("%Y-%m") if chave == "Mês" else serie.index.astype(str)
+            resultado[chave] = dict(zip(rotulos, serie.astype(int).tolist()))
+    return resultado
+
+
+def consultar_pergunta(nucleo, parametros):
+    pergunta = _texto(parametros, "pergunta")
+    if not pergunta:
+        raise ErroRequisicao("informe 'pergunta'")
+    modo = _modo(parametros)
+    posicoes = nucleo.buscar(pergunta, 3, modo)
+    return {
+        "resposta": nucleo.responder(pergunta, modo),
+        "registros": _listagem(nucleo, posicoes, {"limite": len(posicoes)}),
+    }
+
+
+def consultar_assertivas(nucleo, parametros):
+    quantidade = _inteiro(parametros, "quantidade", 5, 1, MAX_ASSERTIVAS)
+    semente = parametros.get("semente")
+    if semente is not None:
+        semente = _inteiro(parametros, "semente", 0)
+
+    linhas = None
+    if parametros.get("selecoes") or parametros.get("termo") or parametros.get("data_inicio") or parametros.get("data_fim"):
+        linhas = nucleo.filtrar(*_filtro(nucleo, parametros))
+
+    assertivas = nucleo.gerar_assertivas(quantidade, semente, linhas)
+    return {
+        "semente": semente,
+        "assertivas": [
+            {"texto": a["texto"], "resposta": bool(a["resposta"]), "explicacao": a["explicacao"], "id": int(a["posicao"])}
+            for a in assertivas.to_dict("records")
+        ],
+    }
+
+
+def consultar_relacionados(nucleo, parametros):
+    if parametros.get("id") is None:
+        raise ErroRequisicao("informe 'id'")
+    posicao = _inteiro(parametros, "id", 0, 0, len(nucleo.df) - 1)
+    limite = _inteiro(parametros, "limite", 10, 1, VIZINHOS)
+    posicoes, similaridades = nucleo.informativos_relacionados(posicao, limite)
+    registros = _listagem(nucleo, posicoes, {**parametros, "limite": len(posicoes), "deslocamento": 0})
+    for registro, similaridade in zip(registros, similaridades.tolist()):
+        registro["similaridade"] = round(similaridade, 4)
+    return {"id": posicao, "registros": registros}
+
+
+def _periodo(parametros, nome, padrao):
+    return tuple(
+        _mes(parametros[f"{nome}_{limite}"], f"{nome}_{limite}") if parametros.get(f"{nome}_{limite}") else valor
+        for limite, valor in zip(("inicio", "fim"), padrao)
+    )
+
+
+def _ramo(matriz, parametros):
+    ramo = _texto(parametros, "ramo")
+    if ramo is not None and ramo not in matriz.ramos:
+        raise ErroRequisicao(f"ramo desconhecido: {ramo}")
+    return ramo
+
+
+def _meses(periodo):
+    return [str(np.datetime64(mes, "M")) for mes in periodo]
+
+
+def consultar_tendencias(nucleo, parametros):
+    matriz = nucleo.tendencias
+    padrao = matriz.periodos_padrao(_inteiro(parametros, "meses", 12, 1, 120))
+    if padrao is None:
+        return {"subindo": [], "caindo": []}
+    padrao_anterior, padrao_recente = padrao
+    anterior = _periodo(parametros, "anterior", padrao_anterior)
+    recente = _periodo(parametros, "recente", padrao_recente)
+    ordem = parametros.get("ordem")
+    if ordem is not None:
+        ordem = _inteiro(parametros, "ordem", 1, 1, 2)
+
+    variacoes = matriz.variacoes(
+        anterior, recente, _ramo(matriz, parametros), ordem,
+        _inteiro(parametros, "limite", LIMITE_PADRAO, 1, LIMITE_MAXIMO),
+        _inteiro(parametros, "minimo", MINIMO_REGISTROS, 1),
+    )
+    resultado = {"anterior": _meses(anterior), "recente": _meses(recente)}
+    for nome, tabela in variacoes.items():
+        resultado[nome] = [
+            {"termo": termo, "anterior": int(a), "recente": int(r), "variacao_pp": round(float(v), 4)}
+            for termo, a, r, v in zip(tabela["Termo"], tabela["Anterior"], tabela["Recente"], tabela["Variação (p.p.)"])
+        ]
+    return resultado
+
+
+def consultar_termo(nucleo, parametros):
+    texto = _texto(parametros, "termo")
+    if not texto:
+        raise ErroRequisicao("informe 'termo'")
+    matriz = nucleo.tendencias
+    termo = matriz.termo(texto)
+    if termo is None:
+        return {"termo": texto, "serie": {}, "ramos": {}}
+    serie = matriz.serie(termo, _ramo(matriz, parametros))
+    return {
+        "termo": matriz.texto(termo),
+        "serie": dict(zip(serie.index.strftime("%Y-%m"), serie.astype(int).tolist())),
+        "ramos": {ramo: int(quantidade) for ramo, quantidade in matriz.por_ramo(termo).items()},
+    }
+
+
+CONSULTAS = {
+    "filtro": consultar_filtro,
+    "pesquisa": consultar_pesquisa,
+    "estatisticas": consultar_estatisticas,
+    "pergunta": consultar_pergunta,
+    "assertivas": consultar_assertivas,
+    "relacionados": consultar_relacionados,
+    "tendencias": consultar_tendencias,
+    "termo": consultar_termo,
+}
+
+
+def executar_consulta(nome, nucleo, parametros):
+    with medir(f"api_{nome}"):
+        return CONSULTAS[nome](nucleo, parametros)
+
+
+# Função para resolver a versão atual dos dados e consultar (roda no pool: a troca
+# de versão recarrega o DataFrame, que não pode bloquear o IOLoop)
+def consultar_atual(nome, parametros):
+    nucleo = _fonte.atual()
+    dados = executar_consulta(nome, nucleo, parametros)
+    dados["versao"] = nucleo.versao
+    return dados
+
+
+def estado_saude():
+    nucleo = _fonte.atual()
+    return {
+        "status": "ok",
+        "versao": nucleo.versao,
+        "registros": len(nucleo.df),
+        "cache_respostas": cache_respostas().estatisticas(),
+    }
+
+
+class BaseHandler(tornado.web.RequestHandler):
+    def set_default_headers(self):
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+
+    def parametros(self):
+        # GET: parâmetros da URL (selecoes como JSON); POST: corpo JSON
+        if self.request.method == "POST":
+            try:
+                corpo = json.loads(self.request.body or b"{}")
+            except ValueError:
+                raise ErroRequisicao("corpo da requisição não é JSON válido")
+            if not isinstance(corpo, dict):
+                raise ErroRequisicao("o corpo deve ser um objeto JSON")
+            return corpo
+
+        parametros = {nome: self.get_argument(nome) for nome in self.request.arguments}
+        if "selecoes" in parametros:
+            try:
+                parametros["selecoes"] = json.loads(parametros["selecoes"])
+            except ValueError:
+                raise ErroRequisicao("'selecoes' deve ser JSON")
+        return parametros
+
+    def responder(self, dados, status=200):
+        self.set_status(status)
+        self.finish(json.dumps(dados, ensure_ascii=False, default=str))
+
+    def write_error(self, status_code, **kwargs):
+        self.finish(json.dumps({"erro": self._reason}, ensure_ascii=False))
+
+
+class NaoEncontradoHandler(BaseHandler):
+    def prepare(self):
+        raise tornado.web.HTTPError(404)
+
+
+# Uma consulta por requisição: GET/POST /filtro, /pesquisa, /estatisticas, /pergunta, /assertivas,
+# /relacionados, /tendencias, /termo
+class ConsultaHandler(BaseHandler):
+    def initialize(self, nome):
+        self.nome = nome
+
+    async def _executar(self):
+        try:
+            parametros = self.parametros()
+            # Toda consulta roda no pool: a primeira chamada pode construir um índice (LSA, k-NN, cubo...)
+            dados = await tornado.ioloop.IOLoop.current().run_in_executor(
+                None, consultar_atual, self.nome, parametros
+            )
+        except ErroRequisicao as e:
+            return self.responder({"erro": str(e)}, 400)
+        self.responder(dados)
+
+    async def get(self):
+        await self._executar()
+
+    async def post(self):
+        await self._executar()
+
+
+# Várias consultas numa única requisição (menos idas e voltas para quem consulta em lote):
+# POST /lote {"consultas": [{"tipo": "filtro", ...parâmetros}, {"tipo": "pergunta", ...}]}
+class LoteHandler(BaseHandler):
+    async def post(self):
+        try:
+            consultas = self.parametros().get("consultas")
+            if not isinstance(consultas, list) or not consultas or len(consultas) > MAX_LOTE:
+                raise ErroRequisicao(f"'consultas' deve ser uma lista com 1 a {MAX_LOTE} itens")
+        except ErroRequisicao as e:
+            return self.responder({"erro": str(e)}, 400)
+
+        def executar():
+            # Todas as consultas do lote usam a mesma versão dos dados
+            nucleo = _fonte.atual()
+            resultados = []
+            for parametros in consultas:
+                nome = parametros.get("tipo") if isinstance(parametros, dict) else None
+                if nome not in CONSULTAS:
+                    resultados.append({"erro": f"'tipo' deve ser um de: {', '.join(CONSULTAS)}"})
+                    continue
+                try:
+                    resultados.append(executar_consulta(nome, nucleo, parametros))
+                except ErroRequisicao as e:
+                    resultados.append({"erro": str(e)})
+                except Exception:
+                    # Uma falha inesperada afeta só o item (o restante do lote é respondido)
+                    app_log.exception("Erro na consulta %r do lote", nome)
+                    resultados.append({"erro": "erro interno ao executar a consulta"})
+            return {"versao": nucleo.versao, "resultados": resultados}
+
+        self.responder(await tornado.ioloop.IOLoop.current().run_in_executor(None, executar))
+
+
+class SaudeHandler(BaseHandler):
+    async def get(self):
+        self.responder(await tornado.ioloop.IOLoop.current().run_in_executor(None, estado_saude))
+
+
+# Métricas por etapa (histogramas) no formato texto do Prometheus
+class MetricasHandler(BaseHandler):
+    def get(self):
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.finish(metricas().prometheus())
+
+
+def criar_aplicacao():
+    rotas = [(rf"/{nome}", ConsultaHandler, {"nome": nome}) for nome in CONSULTAS]
+    rotas += [(r"/lote", LoteHandler), (r"/saude", SaudeHandler), (r"/metricas", MetricasHandler)]
+    # compress_response: gzip quando o cliente aceita (Accept-Encoding)
+    return tornado.web.Application(rotas, compress_response=True, default_handler_class=NaoEncontradoHandler)
+
+
+# Função para aquecer o núcleo (carregar dados e construir os índices antes de aceitar conexões)
+def aquecer():
+    nucleo = _fonte.atual()
+    for nome in ("filtros", "cubo", "pesquisa", "bm25", "assertivas", "duplicatas", "relacionados", "tendencias", "semantica"):
+        getattr(nucleo, nome)
+    return nucleo
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="API JSON dos informativos do STF")
+    parser.add_argument("--porta", type=int, default=PORTA)
+    parser.add_argument("--processos", type=int, default=1,
+                        help="processos (0 = um por CPU); use com INFORMATIVOS_MODO_SERVICO=1 para compartilhar os índices")
+    argumentos = parser.parse_args()
+
+    servidor = tornado.httpserver.HTTPServer(
+        criar_aplicacao(), idle_connection_timeout=TEMPO_OCIOSO, xheaders=True,
+    )
+    servidor.bind(argumentos.porta)
+    servidor.start(argumentos.processos)
+    aquecer()
+    print(f"API ouvindo na porta {argumentos.porta}")
+    tornado.ioloop.IOLoop.current().start()
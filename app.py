@@ -1,10 +1,22 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime
 import random
 import os
+import contextlib
+import uuid
+
+from dados import ARQUIVO_ORIGEM, assinatura_fontes, carregar_informativos, versao_dataset
+from estudo import RepositorioEstudo
+from exportacao import TIPOS, exportador
+from graficos import RENDERIZADOR, grafico_serie_termo, grafico_termo_ramos, montar_grafico
+from incremental import RegistroIncremental
+from instrumentacao import ARQUIVO_PILHAS, MEDIR_MEMORIA, medir, metricas, perfilador
+from nucleo import Nucleo, cache_respostas
+from paginacao import PaginadorCards
+from tabela import ProvedorTabela
+from respostas import responder
+from servico import MODO_SERVICO, assinatura_publicacao, carregar_publicado, indice_publicado, versao_publicada
+from tendencias import MINIMO_REGISTROS
 
 # Configuração da página
 st.set_page_config(
@@ -14,23 +26,33 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Copy-on-Write: seleções derivadas do DataFrame compartilhado nunca escrevem nele
+pd.set_option("mode.copy_on_write", True)
+
 # Função para carregar os dados (corrigida para Streamlit Cloud)
-@st.cache_data
-def carregar_dados():
+# cache_resource: um único DataFrame somente leitura compartilhado por todas as sessões
+# (cache_data devolveria uma cópia desserializada a cada chamada). Não modificar o
+# objeto retornado; usar seleções por posição (df.iloc[linhas]).
+# A assinatura das fontes (mtime da planilha e do manifesto de partições) faz parte
+# da chave, então uma nova ingestão é vista na próxima rerun sem reiniciar o app.
+@st.cache_resource(show_spinner=False, max_entries=2)
+def carregar_dados(assinatura=None):
     # Caminho relativo para o arquivo de dados
-    arquivo_final = 'data/informativos_stf_2021_2025.xlsx'
+    arquivo_final = ARQUIVO_ORIGEM
     
     try:
+        # Modo de serviço: dataset publicado pelo processo carregador, mapeado do disco
+        if MODO_SERVICO and versao_publicada() is not None:
+            return carregar_publicado()
+        
         # Verificar se o arquivo existe
         if not os.path.exists(arquivo_final):
             st.error(f"Arquivo de dados não encontrado em: {arquivo_final}")
             return None
             
-        # Carregar o arquivo Excel
-        df = pd.read_excel(arquivo_final)
-        
-        # Converter a coluna de data para datetime
-        df["Data Julgamento"] = pd.to_datetime(df["Data Julgamento"], format="%d/%m/%Y", errors="coerce")
+        # Carregar o snapshot colunar (reconstruído a partir do Excel quando desatualizado)
+        # junto com as partições ingeridas depois
+        df = carregar_informativos(arquivo_final)
         
         return df
     except Exception as e:
@@ -141,307 +163,138 @@ def aplicar_estilo():
     </style>
     """, unsafe_allow_html=True)
 
-# Função para gerar assertivas baseadas nos dados
-def gerar_assertivas(df, num_assertivas=5):
-    assertivas = []
-    
-    # Filtrar apenas registros com resumo não nulo
-    df_com_resumo = df[df["Resumo"].notna()]
-    
-    if len(df_com_resumo) < 5:
-        return [{"texto": "Não há dados suficientes para gerar assertivas.", "resposta": None}]
-    
-    # Selecionar registros aleatórios
-    indices = random.sample(range(len(df_com_resumo)), min(num_assertivas * 2, len(df_com_resumo)))
-    registros_selecionados = df_com_resumo.iloc[indices]
-    
-    # Tipos de assertivas
-    tipos_assertivas = [
-        "O STF decidiu que {tese}.",
-        "De acordo com o informativo {informativo}, {resumo_parcial}.",
-        "No julgamento de {classe} em {data}, o STF entendeu que {resumo_parcial}.",
-        "É correto afirmar que, segundo o STF, {tese}.",
-        "O {orgao} do STF, ao julgar {classe} em {data}, firmou entendimento de que {resumo_parcial}."
-    ]
-    
-    # Gerar assertivas verdadeiras e falsas
-    for i, (_, registro) in enumerate(registros_selecionados.iterrows()):
-        if i >= num_assertivas:
-            break
-            
-        # Obter dados do registro
-        informativo = registro["Informativo"]
-        classe = registro["Classe Processo"]
-        data = registro["Data Julgamento"].strftime("%d/%m/%Y") if pd.notna(registro["Data Julgamento"]) else "data não especificada"
-        
-        # Verificar se há resumo ou tese
-        if pd.notna(registro["Resumo"]):
-            resumo = registro["Resumo"]
-            # Pegar apenas parte do resumo para não ficar muito longo
-            palavras = resumo.split()
-            if len(palavras) > 15:
-                resumo_parcial = " ".join(palavras[:15]) + "..."
-            else:
-                resumo_parcial = resumo
-        else:
-            resumo_parcial = "o tema foi objeto de análise pelo tribunal"
-        
-        tese = registro["Tese Julgado"] if pd.notna(registro["Tese Julgado"]) else resumo_parcial
-        
-        # Escolher aleatoriamente se a assertiva será verdadeira ou falsa
-        e_verdadeira = random.choice([True, False])
-        
-        # Escolher um tipo de assertiva aleatoriamente
-        tipo_assertiva = random.choice(tipos_assertivas)
-        
-        # Formatar a assertiva
-        if e_verdadeira:
-            texto_assertiva = tipo_assertiva.format(
-                tese=tese,
-                informativo=informativo,
-                resumo_parcial=resumo_parcial,
-                classe=classe,
-                data=data,
-                orgao="Plenário"
-            )
-        else:
-            # Para assertivas falsas, modificamos algum elemento
-            modificadores = [
-                lambda t: "Não " + t[0].lower() + t[1:] if t else t,  # Negar a afirmação
-                lambda t: t.replace("pode", "não pode") if "pode" in t else t.replace("não pode", "pode"),  # Inverter permissões
-                lambda t: t.replace("constitucional", "inconstitucional") if "constitucional" in t else t.replace("inconstitucional", "constitucional"),  # Inverter constitucionalidade
-                lambda t: t.replace("direito", "dever") if "direito" in t else t.replace("dever", "direito"),  # Trocar direito por dever
-            ]
-            
-            modificador = random.choice(modificadores)
-            texto_modificado = modificador(tese)
-            
-            texto_assertiva = tipo_assertiva.format(
-                tese=texto_modificado,
-                informativo=informativo,
-                resumo_parcial=modificador(resumo_parcial),
-                classe=classe,
-                data=data,
-                orgao="Plenário"
-            )
-        
-        assertivas.append({
-            "texto": texto_assertiva,
-            "resposta": e_verdadeira,
-            "explicacao": f"Informativo {informativo}: {resumo_parcial}"
-        })
-    
-    return assertivas
+# Registro dos últimos índices construídos: quando só chegam partições novas,
+# os índices são estendidos com as linhas acrescentadas em vez de reconstruídos
+# (no modo de serviço, os índices publicados são usados diretamente, sem construir)
+@st.cache_resource(show_spinner=False)
+def obter_registro_indices():
+    return RegistroIncremental(publicados=indice_publicado if MODO_SERVICO else None)
 
-# Função para encontrar registros relevantes para a pergunta
-def encontrar_registros_relevantes(pergunta, df, max_registros=3):
-    # Palavras-chave para buscar nos dados
-    palavras_chave = [palavra.lower() for palavra in pergunta.split() if len(palavra) > 3]
-    
-    # Se não houver palavras-chave significativas, retornar lista vazia
-    if not palavras_chave:
-        return []
-    
-    # Buscar registros relevantes
-    registros_relevantes = []
-    
-    for _, row in df.iterrows():
-        pontuacao = 0
-        
-        # Verificar título
-        if pd.notna(row["Título"]):
-            for palavra in palavras_chave:
-                if palavra in row["Título"].lower():
-                    pontuacao += 3  # Peso maior para correspondência no título
-        
-        # Verificar resumo
-        if pd.notna(row["Resumo"]):
-            for palavra in palavras_chave:
-                if palavra in row["Resumo"].lower():
-                    pontuacao += 2
-        
-        # Verificar matéria
-        if pd.notna(row["Matéria"]):
-            for palavra in palavras_chave:
-                if palavra in row["Matéria"].lower():
-                    pontuacao += 1
-        
-        # Verificar ramo do direito
-        if pd.notna(row["Ramo Direito"]):
-            for palavra in palavras_chave:
-                if palavra in row["Ramo Direito"].lower():
-                    pontuacao += 1
-        
-        # Se houver pontuação, adicionar à lista de registros relevantes
-        if pontuacao > 0:
-            registros_relevantes.append((pontuacao, row))
-    
-    # Ordenar por relevância (pontuação)
-    registros_relevantes.sort(reverse=True, key=lambda x: x[0])
-    
-    # Retornar apenas os registros mais relevantes
-    return [registro for _, registro in registros_relevantes[:max_registros]]
+# Núcleo de consultas (filtros, cubo, índices, assertivas) compartilhado entre sessões;
+# as estruturas são construídas sob demanda, uma vez por versão dos dados
+@st.cache_resource(show_spinner=False, max_entries=2)
+def obter_nucleo(versao, _df):
+    return Nucleo(_df, obter_registro_indices())
 
-# Função para criar um contexto baseado nos registros relevantes
-def criar_contexto(registros_relevantes):
-    if not registros_relevantes:
-        return ""
-    
-    contexto = "Contexto dos informativos do STF:\n\n"
-    
-    for i, registro in enumerate(registros_relevantes):
-        informativo = registro["Informativo"]
-        data = registro["Data Julgamento"].strftime("%d/%m/%Y") if pd.notna(registro["Data Julgamento"]) else "data não especificada"
-        titulo = registro["Título"] if pd.notna(registro["Título"]) else "Título não disponível"
-        
-        contexto += f"Informativo {informativo} ({data}): {titulo}\n"
-        
-        if pd.notna(registro["Resumo"]):
-            contexto += f"Resumo: {registro["Resumo"]}\n"
-        
-        if pd.notna(registro["Tese Julgado"]):
-            contexto += f"Tese: {registro["Tese Julgado"]}\n"
-        
-        contexto += "\n"
-    
-    return contexto
+# Paginador dos cards de leitura (ordem pré-calculada + HTML das páginas em cache)
+@st.cache_resource(show_spinner=False, max_entries=2)
+def obter_paginador_cards(versao, _df):
+    return PaginadorCards(_df)
 
-# Função para simular respostas às perguntas
-def simular_resposta(pergunta, df):
-    # Buscar registros relevantes
-    registros_relevantes = encontrar_registros_relevantes(pergunta, df)
-    
-    # Se não houver registros relevantes, retornar mensagem
-    if not registros_relevantes:
-        return "Não encontrei informações específicas sobre essa pergunta nos informativos do STF entre 2021 e 2025."
-    
-    # Construir resposta com base nos registros mais relevantes
-    resposta = "Com base nos informativos do STF, posso informar que:\n\n"
-    
-    for i, registro in enumerate(registros_relevantes):
-        informativo = registro["Informativo"]
-        data = registro["Data Julgamento"].strftime("%d/%m/%Y") if pd.notna(registro["Data Julgamento"]) else "data não especificada"
-        titulo = registro["Título"] if pd.notna(registro["Título"]) else "Título não disponível"
-        
-        resposta += f"**Informativo {informativo} ({data})**: {titulo}\n\n"
-        
-        if pd.notna(registro["Resumo"]):
-            resposta += f"{registro["Resumo"]}\n\n"
-        elif pd.notna(registro["Tese Julgado"]):
-            resposta += f"**Tese**: {registro["Tese Julgado"]}\n\n"
-        
-        if i < len(registros_relevantes) - 1:
-            resposta += "---\n\n"
-    
-    return resposta
+# Provedor da tabela (projeção de colunas + lotes Arrow)
+@st.cache_resource(show_spinner=False, max_entries=2)
+def obter_provedor_tabela(versao, _df):
+    return ProvedorTabela(_df)
 
-# Função principal
-def main():
-    # Aplicar estilo
-    aplicar_estilo()
-    
-    # Cabeçalho
-    st.markdown('<div class="main-header">Dashboard Informativos STF (2021-2025)</div>', unsafe_allow_html=True)
-    
-    # Carregar dados
-    df = carregar_dados()
-    
-    if df is None:
-        st.error("Não foi possível carregar os dados. Por favor, verifique se o arquivo existe.")
-        return
-    
-    # Sidebar para filtros
-    with st.sidebar:
-        st.header("Filtros")
-        
-        # Filtro por Informativo
-        informativos = sorted(df["Informativo"].unique())
-        informativo_selecionado = st.selectbox("Número do Informativo", 
-                                              options=["Todos"] + list(informativos))
-        
-        # Filtro por Ramo do Direito
-        ramos_direito = sorted(df["Ramo Direito"].dropna().unique())
-        ramo_selecionado = st.selectbox("Ramo do Direito", 
-                                       options=["Todos"] + list(ramos_direito))
-        
-        # Filtro por Classe Processual
-        classes_processo = sorted(df["Classe Processo"].unique())
-        classe_selecionada = st.selectbox("Classe Processual", 
-                                         options=["Todos"] + list(classes_processo))
-        
-        # Filtro por Repercussão Geral
-        repercussoes = sorted(df["Repercussão Geral"].dropna().unique())
-        repercussao_selecionada = st.selectbox("Repercussão Geral", 
-                                              options=["Todos"] + list(repercussoes))
-        
-        # Filtro por Data
-        min_date = df["Data Julgamento"].min().date()
-        max_date = df["Data Julgamento"].max().date()
-        
-        data_selecionada = st.date_input(
-            "Intervalo de Data",
-            value=(min_date, max_date),
-            min_value=min_date,
-            max_value=max_date
-        )
-        
-        # Barra de pesquisa
-        termo_pesquisa = st.text_input("Pesquisar termo", "")
+# Gráficos da aba de estatísticas, prontos (figura plotly ou especificação Vega-Lite),
+# por versão dos dados e assinatura do filtro: reruns e sessões com o mesmo filtro não
+# remontam as figuras. Não modificar a figura retornada.
+@st.cache_resource(show_spinner=False, max_entries=256)
+def obter_grafico(nome, renderizador, versao, assinatura_filtros, _estatisticas):
+    return montar_grafico(nome, _estatisticas, renderizador)
+
+# Função para exibir um gráfico (especificações Vega-Lite vão direto para o st.vega_lite_chart)
+def exibir_grafico(grafico):
+    if isinstance(grafico, dict):
+        st.vega_lite_chart(grafico, use_container_width=True)
+    else:
+        st.plotly_chart(grafico, use_container_width=True)
+
+# Repositório de estudo (SQLite): cartões da repetição espaçada, placar e lote em andamento
+@st.cache_resource(show_spinner=False)
+def obter_repositorio_estudo():
+    return RepositorioEstudo()
+
+# Função para obter o identificador do estudante: fica no endereço da página
+# (?estudante=...), então o progresso continua depois de recarregar
+def estudante_atual():
+    estudante = st.query_params.get("estudante")
+    if not estudante:
+        estudante = uuid.uuid4().hex[:12]
+        st.query_params["estudante"] = estudante
+    return estudante
+
+# Seções do dashboard
+SECOES = ["Visualização dos Informativos", "Estatísticas Interativas", "Assertivas para Estudo", "Pergunte para a Result"]
+
+# Modos de busca da aba de perguntas
+MODOS_BUSCA = {
+    "Híbrida (semântica + palavras-chave)": "hibrida",
+    "Semântica": "semantica",
+    "Palavras-chave": "palavras",
+}
+
+# Conteúdo de um arquivo exportado, lido uma vez por arquivo gerado (o fragmento de
+# exportação é reexecutado a cada interação, e o download_button precisa dos bytes)
+@st.cache_resource(show_spinner=False, max_entries=8)
+def ler_exportacao(caminho, modificado):
+    with open(caminho, "rb") as arquivo:
+        return arquivo.read()
+
+# Acompanhamento de uma exportação em andamento: só este fragmento é reexecutado
+# (a cada segundo) até o arquivo ficar pronto
+@st.fragment(run_every=1)
+def acompanhar_exportacao(versao, assinatura_filtros, formato):
+    if exportador().estado(versao, assinatura_filtros, formato)[0] == "gerando":
+        st.info(f"Gerando o arquivo {formato.upper()}...")
+    else:
+        st.rerun()
+
+# Painel de exportação da seleção filtrada (PDF, CSV ou XLSX), gerada num processo
+# do pool de exportação sem bloquear a sessão
+@st.fragment
+def painel_exportacao(df, linhas_filtradas, assinatura_filtros):
+    with st.expander("Exportar seleção"):
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            formato = st.selectbox("Formato", list(TIPOS), format_func=str.upper, key="formato_exportacao")
+        
+        versao = versao_dataset(df)
+        estado, resultado = exportador().estado(versao, assinatura_filtros, formato)
+        
+        with col2:
+            if estado == "pronto":
+                st.download_button(
+                    f"Baixar {formato.upper()} ({len(linhas_filtradas)} informativos)",
+                    ler_exportacao(resultado, os.path.getmtime(resultado)), f"informativos.{formato}", TIPOS[formato]
+                )
+            elif estado == "gerando":
+                acompanhar_exportacao(versao, assinatura_filtros, formato)
+            else:
+                if estado == "erro":
+                    st.error(f"Erro ao gerar o arquivo: {resultado}")
+                if st.button("Gerar arquivo", key="gerar_exportacao"):
+                    # Mesma ordem dos cards de leitura (mais recente primeiro)
+                    ordenadas = obter_paginador_cards(versao, df).ordenar(linhas_filtradas, assinatura_filtros)
+                    exportador().exportar(df, ordenadas, versao, assinatura_filtros, formato)
+                    acompanhar_exportacao(versao, assinatura_filtros, formato)
+
+# Seção: Visualização dos Informativos
+@st.fragment
+def secao_visualizacao(df, nucleo, linhas_filtradas, assinatura_filtros, agrupar_duplicatas):
+    with medir("aba_visualizacao"):
+        # Quase-duplicatas (mesmo julgamento em vários informativos): só a primeira de cada grupo
+        total_filtrado = len(linhas_filtradas)
+        if agrupar_duplicatas:
+            with medir("duplicatas"):
+                linhas_filtradas = nucleo.duplicatas.unicos(linhas_filtradas)
+        assinatura_filtros = assinatura_filtros + (agrupar_duplicatas,)
+        
+        # Materializar apenas as linhas selecionadas
+        df_filtrado = df.iloc[linhas_filtradas]
         
-        # Botão para limpar filtros
-        if st.button("Limpar Filtros"):
-            informativo_selecionado = "Todos"
-            ramo_selecionado = "Todos"
-            classe_selecionada = "Todos"
-            repercussao_selecionada = "Todos"
-            data_selecionada = (min_date, max_date)
-            termo_pesquisa = ""
-    
-    # Aplicar filtros
-    df_filtrado = df.copy()
-    
-    # Filtro por Informativo
-    if informativo_selecionado != "Todos":
-        df_filtrado = df_filtrado[df_filtrado["Informativo"] == informativo_selecionado]
-    
-    # Filtro por Ramo do Direito
-    if ramo_selecionado != "Todos":
-        df_filtrado = df_filtrado[df_filtrado["Ramo Direito"] == ramo_selecionado]
-    
-    # Filtro por Classe Processual
-    if classe_selecionada != "Todos":
-        df_filtrado = df_filtrado[df_filtrado["Classe Processo"] == classe_selecionada]
-    
-    # Filtro por Repercussão Geral
-    if repercussao_selecionada != "Todos":
-        df_filtrado = df_filtrado[df_filtrado["Repercussão Geral"] == repercussao_selecionada]
-    
-    # Filtro por Data
-    if len(data_selecionada) == 2:
-        start_date, end_date = data_selecionada
-        df_filtrado = df_filtrado[(df_filtrado["Data Julgamento"].dt.date >= start_date) & 
-                                 (df_filtrado["Data Julgamento"].dt.date <= end_date)]
-    
-    # Filtro por termo de pesquisa
-    if termo_pesquisa:
-        mask = (
-            df_filtrado["Título"].fillna("").str.contains(termo_pesquisa, case=False) |
-            df_filtrado["Resumo"].fillna("").str.contains(termo_pesquisa, case=False) |
-            df_filtrado["Matéria"].fillna("").str.contains(termo_pesquisa, case=False) |
-            df_filtrado["Tese Julgado"].fillna("").str.contains(termo_pesquisa, case=False)
-        )
-        df_filtrado = df_filtrado[mask]
-    
-    # Criar abas para as diferentes seções
-    tab1, tab2, tab3, tab4 = st.tabs(["Visualização dos Informativos", "Estatísticas Interativas", 
-                                      "Assertivas para Estudo", "Pergunte para a Result"])
-    
-    # Aba 1: Visualização dos Informativos
-    with tab1:
         st.markdown('<div class="sub-header">Visualização dos Informativos</div>', unsafe_allow_html=True)
         
         # Mostrar número de resultados
-        st.write(f"Exibindo {len(df_filtrado)} de {len(df)} informativos.")
+        ocultas = total_filtrado - len(linhas_filtradas)
+        st.write(
+            f"Exibindo {len(df_filtrado)} de {len(df)} informativos"
+            + (f" ({ocultas} duplicatas agrupadas)." if ocultas else ".")
+        )
+        
+        # Exportação da seleção (gerada em segundo plano)
+        if not df_filtrado.empty:
+            painel_exportacao(df, linhas_filtradas, assinatura_filtros)
         
         # Opções de visualização
         visualizacao = st.radio(
@@ -453,105 +306,134 @@ def main():
         if visualizacao == "Tabela":
             # Tabela interativa
             if not df_filtrado.empty:
-                # Formatar a data para exibição
-                df_exibicao = df_filtrado.copy()
-                df_exibicao["Data Julgamento"] = df_exibicao["Data Julgamento"].dt.strftime("%d/%m/%Y")
+                provedor = obter_provedor_tabela(versao_dataset(df), df)
                 
-                # Selecionar colunas para exibição
-                colunas_exibicao = ["Informativo", "Classe Processo", "Data Julgamento", "Título", "Ramo Direito", "Matéria"]
-                st.dataframe(df_exibicao[colunas_exibicao], use_container_width=True)
+                # Resultados grandes são enviados em lotes Arrow, um de cada vez
+                num_lotes = provedor.num_lotes(linhas_filtradas)
+                lote_atual = 0
+                if num_lotes > 1:
+                    lote_atual = st.number_input(
+                        f"Lote ({provedor.linhas_por_lote} linhas por lote)",
+                        min_value=1, max_value=num_lotes, value=1
+                    ) - 1
+                
+                # Tabela interativa: só as colunas exibidas; a data é formatada pelo column_config
+                evento = st.dataframe(
+                    provedor.tabela(linhas_filtradas, lote_atual),
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "Data Julgamento": st.column_config.DateColumn("Data Julgamento", format="DD/MM/YYYY"),
+                    },
+                    key="tabela_informativos",
+                    on_select="rerun",
+                    selection_mode="single-row",
+                )
                 
                 # Detalhes do informativo selecionado
                 st.markdown('<div class="sub-header">Detalhes do Informativo Selecionado</div>', unsafe_allow_html=True)
                 
-                # Permitir selecionar um informativo para ver detalhes
-                indices = df_exibicao.index.tolist()
-                if indices:
-                    indice_selecionado = st.selectbox("Selecione um informativo para ver detalhes:", indices)
-                    informativo_selecionado = df_exibicao.loc[indice_selecionado]
+                # Linha selecionada na própria tabela (primeira linha do lote por padrão)
+                selecionadas = evento.selection.rows if evento is not None else []
+                linhas_no_lote = min(provedor.linhas_por_lote, len(linhas_filtradas) - lote_atual * provedor.linhas_por_lote)
+                linha_no_lote = selecionadas[0] if selecionadas and selecionadas[0] < linhas_no_lote else 0
+                if not selecionadas:
+                    st.caption("Clique em uma linha da tabela para ver os detalhes.")
+                
+                posicao = provedor.posicao_global(linhas_filtradas, lote_atual, linha_no_lote)
+                informativo_selecionado = df.iloc[posicao]
+                data_julgamento = informativo_selecionado["Data Julgamento"]
+                data_julgamento = data_julgamento.strftime("%d/%m/%Y") if pd.notna(data_julgamento) else ""
+                
+                # Exibir detalhes em cards
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown('<div class="card">', unsafe_allow_html=True)
+                    st.markdown(f"**Informativo:** {informativo_selecionado['Informativo']}")
+                    st.markdown(f"**Classe Processo:** {informativo_selecionado['Classe Processo']}")
+                    st.markdown(f"**Data Julgamento:** {data_julgamento}")
+                    st.markdown(f"**Ramo Direito:** {informativo_selecionado['Ramo Direito']}")
+                    st.markdown(f"**Matéria:** {informativo_selecionado['Matéria']}")
+                    st.markdown(f"**Repercussão Geral:** {informativo_selecionado['Repercussão Geral']}")
                     
-                    # Exibir detalhes em cards
-                    col1, col2 = st.columns(2)
+                    # Mesmo julgamento noticiado em outros informativos
+                    duplicatas = df.iloc[nucleo.duplicatas.duplicatas(posicao)]
+                    if not duplicatas.empty:
+                        st.markdown("**Também em:** " + ", ".join(
+                            f"Informativo {registro['Informativo']} ({registro['Classe Processo']})"
+                            for _, registro in duplicatas.iterrows()
+                        ))
+                    st.markdown('</div>', unsafe_allow_html=True)
+                
+                with col2:
+                    st.markdown('<div class="card">', unsafe_allow_html=True)
+                    st.markdown(f"**Título:** {informativo_selecionado['Título']}")
                     
-                    with col1:
-                        st.markdown('<div class="card">', unsafe_allow_html=True)
-                        st.markdown(f"**Informativo:** {informativo_selecionado['Informativo']}")
-                        st.markdown(f"**Classe Processo:** {informativo_selecionado['Classe Processo']}")
-                        st.markdown(f"**Data Julgamento:** {informativo_selecionado['Data Julgamento']}")
-                        st.markdown(f"**Ramo Direito:** {informativo_selecionado['Ramo Direito']}")
-                        st.markdown(f"**Matéria:** {informativo_selecionado['Matéria']}")
-                        st.markdown(f"**Repercussão Geral:** {informativo_selecionado['Repercussão Geral']}")
-                        st.markdown('</div>', unsafe_allow_html=True)
+                    # Verificar se há tese julgada
+                    if pd.notna(informativo_selecionado["Tese Julgado"]):
+                        st.markdown("**Tese Julgada:**")
+                        st.markdown(f"{informativo_selecionado['Tese Julgado']}")
                     
-                    with col2:
-                        st.markdown('<div class="card">', unsafe_allow_html=True)
-                        st.markdown(f"**Título:** {informativo_selecionado['Título']}")
-                        
-                        # Verificar se há tese julgada
-                        if pd.notna(informativo_selecionado["Tese Julgado"]):
-                            st.markdown("**Tese Julgada:**")
-                            st.markdown(f"{informativo_selecionado['Tese Julgado']}")
-                        
-                        # Verificar se há resumo
-                        if pd.notna(informativo_selecionado["Resumo"]):
-                            st.markdown("**Resumo:**")
-                            st.markdown(f"{informativo_selecionado['Resumo']}")
-                        st.markdown('</div>', unsafe_allow_html=True)
+                    # Verificar se há resumo
+                    if pd.notna(informativo_selecionado["Resumo"]):
+                        st.markdown("**Resumo:**")
+                        st.markdown(f"{informativo_selecionado['Resumo']}")
+                    st.markdown('</div>', unsafe_allow_html=True)
+                
+                # Informativos relacionados: consulta ao grafo de vizinhos pré-calculado
+                with medir("relacionados"):
+                    relacionados, similaridades = nucleo.informativos_relacionados(posicao)
+                if len(relacionados):
+                    st.markdown('<div class="sub-header">Informativos Relacionados</div>', unsafe_allow_html=True)
+                    itens = []
+                    for (_, registro), similaridade in zip(df.iloc[relacionados].iterrows(), similaridades):
+                        data = registro["Data Julgamento"]
+                        data = data.strftime("%d/%m/%Y") if pd.notna(data) else "data não especificada"
+                        titulo = registro["Título"] if pd.notna(registro["Título"]) else "Título não disponível"
+                        itens.append(
+                            f"- **Informativo {registro['Informativo']}** ({data}, {registro['Classe Processo']}): "
+                            f"{titulo} — similaridade {similaridade:.0%}"
+                        )
+                    st.markdown("\n".join(itens))
             else:
                 st.warning("Nenhum informativo encontrado com os filtros selecionados.")
         
         else:  # Cards de Leitura
             if not df_filtrado.empty:
-                # Ordenar por data (mais recente primeiro)
-                df_cards = df_filtrado.sort_values(by="Data Julgamento", ascending=False)
-                
-                # Paginação
-                items_por_pagina = 5
-                num_paginas = (len(df_cards) + items_por_pagina - 1) // items_por_pagina
+                # Ordem "mais recente primeiro" pré-calculada; só a página atual é montada
+                paginador = obter_paginador_cards(versao_dataset(df), df)
+                total = len(linhas_filtradas)
+                num_paginas = paginador.num_paginas(total)
                 
                 if num_paginas > 1:
                     pagina_atual = st.number_input("Página", min_value=1, max_value=num_paginas, value=1) - 1
-                    inicio = pagina_atual * items_por_pagina
-                    fim = min(inicio + items_por_pagina, len(df_cards))
-                    df_pagina = df_cards.iloc[inicio:fim]
-                    st.write(f"Mostrando {inicio+1}-{fim} de {len(df_cards)} informativos")
+                    inicio = pagina_atual * paginador.itens_por_pagina
+                    fim = min(inicio + paginador.itens_por_pagina, total)
+                    st.write(f"Mostrando {inicio+1}-{fim} de {total} informativos")
                 else:
-                    df_pagina = df_cards
+                    pagina_atual = 0
                 
-                # Exibir cards
-                for _, row in df_pagina.iterrows():
-                    st.markdown(f"""
-                    <div class="reading-card">
-                        <h3>{row['Título'] if pd.notna(row['Título']) else 'Sem título'}</h3>
-                        <div class="reading-card-meta">
-                            <strong>Informativo:</strong> {row['Informativo']} | 
-                            <strong>Data:</strong> {row['Data Julgamento'].strftime('%d/%m/%Y') if pd.notna(row['Data Julgamento']) else 'Data não disponível'} | 
-                            <strong>Classe:</strong> {row['Classe Processo']} | 
-                            <strong>Ramo:</strong> {row['Ramo Direito'] if pd.notna(row['Ramo Direito']) else 'Não especificado'}
-                        </div>
-                        <div class="reading-card-content">
-                    """, unsafe_allow_html=True)
-                    
-                    # Verificar se há tese julgada
-                    if pd.notna(row["Tese Julgado"]):
-                        st.markdown("<strong>Tese Julgada:</strong>", unsafe_allow_html=True)
-                        st.markdown(f"{row['Tese Julgado']}")
-                    
-                    # Verificar se há resumo
-                    if pd.notna(row["Resumo"]):
-                        st.markdown("<strong>Resumo:</strong>", unsafe_allow_html=True)
-                        st.markdown(f"{row['Resumo']}")
-                    
-                    st.markdown("</div></div>", unsafe_allow_html=True)
+                # Exibir os cards da página em um único bloco HTML
+                st.markdown(
+                    paginador.pagina_html(linhas_filtradas, assinatura_filtros, pagina_atual),
+                    unsafe_allow_html=True
+                )
             else:
                 st.warning("Nenhum informativo encontrado com os filtros selecionados.")
-    
-    # Aba 2: Estatísticas Interativas
-    with tab2:
+
+# Seção: Estatísticas Interativas
+@st.fragment
+def secao_estatisticas(nucleo, selecoes, intervalo, termo_pesquisa, busca_literal, linhas_filtradas, assinatura_filtros):
+    with medir("aba_estatisticas"):
         st.markdown('<div class="sub-header">Estatísticas Interativas</div>', unsafe_allow_html=True)
         
+        # Estatísticas do conjunto filtrado, somando células do cubo (memoizadas pelo filtro)
+        with medir("agregacoes"):
+            estatisticas = nucleo.estatisticas(selecoes, intervalo, termo_pesquisa, busca_literal, linhas=linhas_filtradas)
+        
         # Verificar se há dados suficientes para gerar estatísticas
-        if len(df) > 0:
+        if estatisticas["Total"] > 0:
             # Layout em colunas para os gráficos
             col1, col2 = st.columns(2)
             
@@ -559,104 +441,114 @@ def main():
                 # Gráfico de distribuição por Ramo do Direito
                 st.markdown('<div class="card">', unsafe_allow_html=True)
                 st.subheader("Distribuição por Ramo do Direito")
-                
-                # Contar ocorrências de cada ramo do direito
-                ramo_counts = df["Ramo Direito"].value_counts().reset_index()
-                ramo_counts.columns = ["Ramo do Direito", "Quantidade"]
-                
-                # Limitar para os 10 principais ramos
-                top_ramos = ramo_counts.head(10)
-                
-                # Criar gráfico de barras
-                fig = px.bar(
-                    top_ramos, 
-                    x="Quantidade", 
-                    y="Ramo do Direito",
-                    orientation="h",
-                    color="Quantidade",
-                    color_continuous_scale="Blues",
-                    title="Top 10 Ramos do Direito"
-                )
-                
-                fig.update_layout(height=500)
-                st.plotly_chart(fig, use_container_width=True)
+                with medir("graficos"):
+                    exibir_grafico(obter_grafico("ramos", RENDERIZADOR, nucleo.versao, assinatura_filtros, estatisticas))
                 st.markdown('</div>', unsafe_allow_html=True)
             
             with col2:
                 # Gráfico de distribuição por Repercussão Geral
                 st.markdown('<div class="card">', unsafe_allow_html=True)
                 st.subheader("Proporção de Casos com Repercussão Geral")
-                
-                # Contar ocorrências de cada tipo de repercussão geral
-                repercussao_counts = df["Repercussão Geral"].value_counts().reset_index()
-                repercussao_counts.columns = ["Repercussão Geral", "Quantidade"]
-                
-                # Criar gráfico de pizza
-                fig = px.pie(
-                    repercussao_counts, 
-                    values="Quantidade", 
-                    names="Repercussão Geral",
-                    hole=0.4,
-                    color_discrete_sequence=px.colors.sequential.Blues_r
-                )
-                
-                fig.update_layout(height=500)
-                st.plotly_chart(fig, use_container_width=True)
+                with medir("graficos"):
+                    exibir_grafico(obter_grafico("repercussao", RENDERIZADOR, nucleo.versao, assinatura_filtros, estatisticas))
                 st.markdown('</div>', unsafe_allow_html=True)
             
             # Gráfico de distribuição por Classe Processual
             st.markdown('<div class="card">', unsafe_allow_html=True)
             st.subheader("Classes Processuais mais Frequentes")
-            
-            # Contar ocorrências de cada classe processual
-            classe_counts = df["Classe Processo"].value_counts().reset_index()
-            classe_counts.columns = ["Classe Processual", "Quantidade"]
-            
-            # Limitar para as 15 principais classes
-            top_classes = classe_counts.head(15)
-            
-            # Criar gráfico de barras
-            fig = px.bar(
-                top_classes, 
-                x="Classe Processual", 
-                y="Quantidade",
-                color="Quantidade",
-                color_continuous_scale="Blues",
-                title="Top 15 Classes Processuais"
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+            with medir("graficos"):
+                exibir_grafico(obter_grafico("classes", RENDERIZADOR, nucleo.versao, assinatura_filtros, estatisticas))
             st.markdown('</div>', unsafe_allow_html=True)
             
             # Gráfico de distribuição por ano
             st.markdown('<div class="card">', unsafe_allow_html=True)
             st.subheader("Distribuição de Informativos por Ano")
-            
-            # Extrair o ano da data de julgamento
-            df["Ano"] = df["Data Julgamento"].dt.year
-            
-            # Contar ocorrências de cada ano
-            ano_counts = df["Ano"].value_counts().sort_index().reset_index()
-            ano_counts.columns = ["Ano", "Quantidade"]
-            
-            # Criar gráfico de linha
-            fig = px.line(
-                ano_counts, 
-                x="Ano", 
-                y="Quantidade",
-                markers=True,
-                line_shape="linear",
-                title="Evolução Anual dos Informativos"
-            )
-            
-            fig.update_layout(xaxis=dict(tickmode="linear", dtick=1))
-            st.plotly_chart(fig, use_container_width=True)
+            with medir("graficos"):
+                exibir_grafico(obter_grafico("anos", RENDERIZADOR, nucleo.versao, assinatura_filtros, estatisticas))
             st.markdown('</div>', unsafe_allow_html=True)
         else:
             st.warning("Não há dados suficientes para gerar estatísticas.")
-    
-    # Aba 3: Assertivas para Estudo
-    with tab3:
+        
+        # Tendências de temas (todo o acervo, não só o filtro atual)
+        painel_tendencias(nucleo, selecoes.get("Ramo Direito"))
+
+# Opções de n-gramas do painel de tendências
+ORDENS_TENDENCIAS = {"Palavras e expressões": None, "Palavras": 1, "Expressões (duas palavras)": 2}
+
+# Painel de tendências: termos que mais subiram e mais caíram entre dois anos, por ramo,
+# e a evolução de um termo. As consultas usam a matriz termo × mês da versão dos dados
+# (construída uma vez), sem voltar aos textos; interações reexecutam só o painel.
+@st.fragment
+def painel_tendencias(nucleo, ramo_selecionado):
+    with medir("tendencias"):
+        matriz = nucleo.tendencias
+        anos = matriz.anos()
+        
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.subheader("Tendências de Temas")
+        if len(anos) < 2:
+            st.info("É preciso ter informativos de pelo menos dois anos para comparar tendências.")
+            st.markdown('</div>', unsafe_allow_html=True)
+            return
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            ano_recente = st.selectbox("Ano", anos[::-1][:-1], key="tendencias_ano")
+        with col2:
+            anteriores = [ano for ano in anos[::-1] if ano < ano_recente]
+            ano_anterior = st.selectbox("Comparado com", anteriores, key="tendencias_ano_anterior")
+        with col3:
+            ramos = ["Todos"] + sorted(matriz.ramos)
+            ramo = st.selectbox(
+                "Ramo do Direito", ramos, key="tendencias_ramo",
+                index=ramos.index(ramo_selecionado) if ramo_selecionado in ramos else 0,
+            )
+        with col4:
+            ordem = st.selectbox("Termos", list(ORDENS_TENDENCIAS), key="tendencias_ordem")
+        
+        variacoes = matriz.variacoes(
+            (f"{ano_anterior}-01", f"{ano_anterior}-12"), (f"{ano_recente}-01", f"{ano_recente}-12"),
+            ramo, ORDENS_TENDENCIAS[ordem], limite=15,
+        )
+        st.caption(
+            f"Fração dos informativos de cada ano que citam o termo; variação em pontos percentuais "
+            f"(mínimo de {MINIMO_REGISTROS} informativos somando os dois anos)."
+        )
+        colunas = {
+            "Anterior": st.column_config.NumberColumn(str(ano_anterior)),
+            "Recente": st.column_config.NumberColumn(str(ano_recente)),
+            "Anterior (%)": None,
+            "Recente (%)": None,
+            "Variação (p.p.)": st.column_config.NumberColumn("Variação (p.p.)", format="%+.1f"),
+        }
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**Em alta**")
+            st.dataframe(variacoes["subindo"], hide_index=True, use_container_width=True, column_config=colunas)
+        with col2:
+            st.markdown("**Em queda**")
+            st.dataframe(variacoes["caindo"], hide_index=True, use_container_width=True, column_config=colunas)
+        
+        # Evolução de um termo (o primeiro em alta, se nenhum for digitado)
+        sugestao = variacoes["subindo"]["Termo"].iloc[0] if len(variacoes["subindo"]) else ""
+        texto = st.text_input("Evolução de um termo", "", placeholder=sugestao, key="tendencias_termo",
+                              help="Uma palavra ou uma expressão de duas palavras") or sugestao
+        if texto:
+            termo = matriz.termo(texto)
+            if termo is None:
+                st.warning(f"O termo “{texto}” não aparece nos informativos.")
+            else:
+                col1, col2 = st.columns(2)
+                with col1:
+                    exibir_grafico(grafico_serie_termo(matriz.serie(termo, ramo), matriz.texto(termo)))
+                with col2:
+                    exibir_grafico(grafico_termo_ramos(matriz.por_ramo(termo), matriz.texto(termo)))
+        st.markdown('</div>', unsafe_allow_html=True)
+
+# Seção: Assertivas para Estudo
+@st.fragment
+def secao_assertivas(nucleo):
+    with medir("aba_assertivas"):
         st.markdown('<div class="sub-header">Assertivas para Estudo</div>', unsafe_allow_html=True)
         
         # Introdução
@@ -665,36 +557,31 @@ def main():
         Teste seus conhecimentos respondendo às questões abaixo.
         """)
         
-        # Botão para gerar novas assertivas
-        if st.button("Gerar Novas Assertivas"):
-            # Limpar estado anterior
-            if "assertivas" in st.session_state:
-                del st.session_state["assertivas"]
-            if "respostas_usuario" in st.session_state:
-                del st.session_state["respostas_usuario"]
+        if len(nucleo.assertivas) < 5:
+            st.markdown("""
+            <div class="assertiva-card">
+                <p>Não há dados suficientes para gerar assertivas.</p>
+            </div>
+            """, unsafe_allow_html=True)
+            return
         
-        # Inicializar estado da sessão se necessário
-        if "assertivas" not in st.session_state:
-            st.session_state.assertivas = gerar_assertivas(df, num_assertivas=5)
+        # Progresso salvo no banco de estudo: o lote em andamento volta depois de recarregar
+        repositorio = obter_repositorio_estudo()
+        estudante = estudante_atual()
+        lote = repositorio.lote(estudante)
         
-        if "respostas_usuario" not in st.session_state:
-            st.session_state.respostas_usuario = {}
+        # Botão para gerar novas assertivas: primeiro as que vencem pela repetição espaçada, depois novas
+        if st.button("Gerar Novas Assertivas") or not lote:
+            lote = nucleo.lote_estudo(repositorio, estudante, 5, random.randrange(2**32))
         
         # Exibir assertivas
-        for i, assertiva in enumerate(st.session_state.assertivas):
-            # Verificar se a assertiva tem resposta (algumas podem ser apenas informativas)
-            if assertiva["resposta"] is None:
-                st.markdown(f"""
-                <div class="assertiva-card">
-                    <p>{assertiva['texto']}</p>
-                </div>
-                """, unsafe_allow_html=True)
-                continue
+        for assertiva in lote:
+            i = assertiva["ordem"]
             
             # Determinar a classe CSS com base no estado da resposta
             classe_css = "assertiva-card"
-            if i in st.session_state.respostas_usuario:
-                if st.session_state.respostas_usuario[i] == assertiva["resposta"]:
+            if assertiva["resposta_usuario"] is not None:
+                if assertiva["resposta_usuario"] == assertiva["resposta"]:
                     classe_css += " correct"
                 else:
                     classe_css += " incorrect"
@@ -705,23 +592,24 @@ def main():
             </div>
             """, unsafe_allow_html=True)
             
-            # Opções de resposta
+            # Opções de resposta (só a primeira resposta conta para a repetição espaçada)
             col1, col2, col3 = st.columns([1, 1, 3])
+            respondida = assertiva["resposta_usuario"] is not None
             
             with col1:
-                verdadeiro = st.button("Verdadeiro", key=f"v_{i}")
-                if verdadeiro:
-                    st.session_state.respostas_usuario[i] = True
+                verdadeiro = st.button("Verdadeiro", key=f"v_{i}", disabled=respondida)
+                if verdadeiro and repositorio.responder(estudante, i, True) is not None:
+                    assertiva["resposta_usuario"] = True
             
             with col2:
-                falso = st.button("Falso", key=f"f_{i}")
-                if falso:
-                    st.session_state.respostas_usuario[i] = False
+                falso = st.button("Falso", key=f"f_{i}", disabled=respondida)
+                if falso and repositorio.responder(estudante, i, False) is not None:
+                    assertiva["resposta_usuario"] = False
             
             # Mostrar feedback se o usuário já respondeu
-            if i in st.session_state.respostas_usuario:
+            if assertiva["resposta_usuario"] is not None:
                 resposta_correta = assertiva["resposta"]
-                resposta_usuario = st.session_state.respostas_usuario[i]
+                resposta_usuario = assertiva["resposta_usuario"]
                 
                 if resposta_usuario == resposta_correta:
                     st.markdown(f"""
@@ -739,21 +627,24 @@ def main():
             
             st.markdown("<hr>", unsafe_allow_html=True)
         
-        # Mostrar pontuação
-        if st.session_state.respostas_usuario:
-            acertos = sum(1 for i, resposta in st.session_state.respostas_usuario.items() 
-                         if resposta == st.session_state.assertivas[i]["resposta"])
-            total = len(st.session_state.respostas_usuario)
+        # Mostrar pontuação (contadores atualizados a cada resposta)
+        placar = repositorio.placar(estudante)
+        if placar["respostas"]:
+            acertos = placar["acertos"]
+            total = placar["respostas"]
             
             st.markdown(f"""
             <div class="card">
                 <h3>Pontuação Atual</h3>
                 <p>Você acertou {acertos} de {total} assertivas ({acertos/total*100:.1f}%).</p>
+                <p>{placar['estudados']} informativos em estudo, {placar['vencidos']} para revisar agora.</p>
             </div>
             """, unsafe_allow_html=True)
-    
-    # Aba 4: Pergunte para a Result
-    with tab4:
+
+# Seção: Pergunte para a Result
+@st.fragment
+def secao_perguntas(nucleo):
+    with medir("aba_perguntas"):
         st.markdown('<div class="sub-header">Pergunte para a Result</div>', unsafe_allow_html=True)
         
         st.markdown("""
@@ -768,32 +659,221 @@ def main():
         # Campo de entrada para a pergunta
         pergunta = st.text_input("Digite sua pergunta sobre os informativos do STF:", placeholder="Ex: Quais são as principais teses sobre direito tributário?")
         
+        # A busca semântica encontra perguntas parafraseadas; a híbrida soma as duas pontuações
+        modo_busca = MODOS_BUSCA[st.radio("Modo de busca", list(MODOS_BUSCA), horizontal=True)]
+        
         # Botão para enviar a pergunta
         if st.button("Enviar Pergunta"):
             if pergunta:
-                with st.spinner("Analisando sua pergunta..."):
-                    # Simular um pequeno atraso para dar a impressão de processamento
-                    import time
-                    time.sleep(1)
-                    
-                    # Obter resposta simulada
-                    resposta = simular_resposta(pergunta, df)
-                    
-                    # Exibir a resposta
-                    st.markdown(f"""
-                    <div class="question-card">
-                        <strong>Sua pergunta:</strong> {pergunta}
-                    </div>
-                    <div class="answer-card">
-                        <strong>Resposta:</strong><br>
-                        {resposta}
-                    </div>
-                    """, unsafe_allow_html=True)
+                # Cancelar a resposta anterior desta sessão, se ainda estiver em andamento
+                anterior = st.session_state.get("tarefa_resposta")
+                if anterior is not None:
+                    anterior.cancelar()
+                
+                # Busca e montagem da resposta rodam no pool compartilhado (ou no LLM, se configurado)
+                with st.spinner("Preparando o índice de busca..."):
+                    indice = nucleo.indice_respostas(modo_busca)
+                tarefa = responder(
+                    pergunta,
+                    lambda: cache_respostas().trechos(
+                        f"resposta-{modo_busca}", nucleo.versao, pergunta,
+                        lambda: nucleo.trechos_resposta(pergunta, modo_busca, indice),
+                    ),
+                    lambda: nucleo.contexto(pergunta, modo_busca, indice),
+                )
+                st.session_state.tarefa_resposta = tarefa
+                
+                st.markdown(f"""
+                <div class="question-card">
+                    <strong>Sua pergunta:</strong> {pergunta}
+                </div>
+                """, unsafe_allow_html=True)
+                
+                # Exibir a resposta à medida que os trechos chegam
+                area_resposta = st.empty()
+                area_resposta.markdown('<div class="answer-card"><strong>Resposta:</strong><br>Analisando sua pergunta...</div>', unsafe_allow_html=True)
+                
+                resposta = ""
+                try:
+                    for trecho in tarefa.trechos():
+                        resposta += trecho
+                        area_resposta.markdown(f"""
+                        <div class="answer-card">
+                            <strong>Resposta:</strong><br>
+                            {resposta}
+                        </div>
+                        """, unsafe_allow_html=True)
+                except Exception as e:
+                    area_resposta.error(f"Não foi possível gerar a resposta: {e}")
+                finally:
+                    tarefa.cancelar()
+                
+                cache = cache_respostas().estatisticas()
+                st.caption(
+                    f"Cache de respostas: {cache['acertos']} acertos, {cache['falhas']} falhas, "
+                    f"{cache['itens']} itens ({cache['memoria'] / 1024:.0f} KB)"
+                )
             else:
                 st.warning("Por favor, digite uma pergunta para continuar.")
+
+# Função principal
+def main():
+    # Aplicar estilo
+    aplicar_estilo()
+    
+    # Cabeçalho
+    st.markdown('<div class="main-header">Dashboard Informativos STF (2021-2025)</div>', unsafe_allow_html=True)
+    
+    # Carregar dados
+    with medir("carregar_dados"):
+        df = carregar_dados(assinatura_publicacao() if MODO_SERVICO else assinatura_fontes())
+    
+    if df is None:
+        st.error("Não foi possível carregar os dados. Por favor, verifique se o arquivo existe.")
+        return
+    
+    # Núcleo de consultas desta versão dos dados (motor de filtros pré-calculado etc.)
+    with medir("nucleo"):
+        nucleo = obter_nucleo(versao_dataset(df), df)
+        motor_filtros = nucleo.filtros
+    
+    # Sidebar para filtros
+    with st.sidebar:
+        st.header("Filtros")
+        
+        # Filtro por Informativo
+        informativos = motor_filtros.opcoes("Informativo")
+        informativo_selecionado = st.selectbox("Número do Informativo", 
+                                              options=["Todos"] + list(informativos))
+        
+        # Filtro por Ramo do Direito
+        ramos_direito = motor_filtros.opcoes("Ramo Direito")
+        ramo_selecionado = st.selectbox("Ramo do Direito", 
+                                       options=["Todos"] + list(ramos_direito))
+        
+        # Filtro por Classe Processual
+        classes_processo = motor_filtros.opcoes("Classe Processo")
+        classe_selecionada = st.selectbox("Classe Processual", 
+                                         options=["Todos"] + list(classes_processo))
+        
+        # Filtro por Repercussão Geral
+        repercussoes = motor_filtros.opcoes("Repercussão Geral")
+        repercussao_selecionada = st.selectbox("Repercussão Geral", 
+                                              options=["Todos"] + list(repercussoes))
+        
+        # Filtro por Data
+        min_date, max_date = motor_filtros.intervalo_datas()
+        
+        data_selecionada = st.date_input(
+            "Intervalo de Data",
+            value=(min_date, max_date),
+            min_value=min_date,
+            max_value=max_date
+        )
+        
+        # Barra de pesquisa
+        termo_pesquisa = st.text_input("Pesquisar termo", "", help='Use aspas para buscar uma frase exata, ex.: "repercussão geral"')
+        busca_literal = st.checkbox("Busca literal (diferencia acentos)", value=False)
+        agrupar_duplicatas = st.checkbox(
+            "Agrupar duplicatas", value=True,
+            help="Mostra uma vez só o mesmo julgamento noticiado em mais de um informativo"
+        )
+        
+        # Botão para limpar filtros
+        if st.button("Limpar Filtros"):
+            informativo_selecionado = "Todos"
+            ramo_selecionado = "Todos"
+            classe_selecionada = "Todos"
+            repercussao_selecionada = "Todos"
+            data_selecionada = (min_date, max_date)
+            termo_pesquisa = ""
+            busca_literal = False
+    
+    # Aplicar filtros: AND dos bitsets das facetas + busca binária no intervalo de datas
+    selecoes = {
+        "Informativo": informativo_selecionado,
+        "Ramo Direito": ramo_selecionado,
+        "Classe Processo": classe_selecionada,
+        "Repercussão Geral": repercussao_selecionada,
+    }
+    selecoes = {coluna: (None if valor == "Todos" else valor) for coluna, valor in selecoes.items()}
+    intervalo = tuple(data_selecionada) if len(data_selecionada) == 2 else None
+    
+    # Termo de pesquisa: índice de trigramas ou, no modo literal, str.contains
+    with medir("filtros"):
+        linhas_filtradas = nucleo.filtrar(selecoes, intervalo, termo_pesquisa, busca_literal)
+    
+    # Assinatura do filtro atual (chave dos caches de ordenação e páginas)
+    assinatura_filtros = (tuple(selecoes.items()), intervalo, termo_pesquisa, busca_literal)
+    
+    # Seções do dashboard: só a seção aberta é executada (com st.tabs as quatro rodariam
+    # a cada rerun). Cada seção é um fragmento: interações dentro dela (botões, tabela,
+    # paginação) reexecutam só a seção, sem recalcular filtros nem as outras seções.
+    secao = st.radio("Seção", SECOES, horizontal=True, key="secao", label_visibility="collapsed")
+    
+    if secao == SECOES[0]:
+        secao_visualizacao(df, nucleo, linhas_filtradas, assinatura_filtros, agrupar_duplicatas)
+    elif secao == SECOES[1]:
+        secao_estatisticas(nucleo, selecoes, intervalo, termo_pesquisa, busca_literal, linhas_filtradas, assinatura_filtros)
+    elif secao == SECOES[2]:
+        secao_assertivas(nucleo)
+    else:
+        secao_perguntas(nucleo)
+    
+    # Painel de diagnóstico (opcional)
+    painel_diagnostico()
     
     # Rodapé
     st.markdown('<div class="footer">Dashboard Informativos STF © 2025</div>', unsafe_allow_html=True)
 
+# Painel de diagnóstico: tempos por etapa das reruns (todas as sessões do processo)
+def painel_diagnostico():
+    with st.sidebar:
+        if not st.checkbox("Diagnóstico", value=False, key="mostrar_diagnostico"):
+            return
+        
+        resumo = metricas().resumo()
+        if resumo:
+            st.dataframe(
+                pd.DataFrame.from_dict(resumo, orient="index"),
+                use_container_width=True,
+                column_config={
+                    "execucoes": st.column_config.NumberColumn("Execuções"),
+                    "p50_ms": st.column_config.NumberColumn("p50 (ms)", format="%.1f"),
+                    "p95_ms": st.column_config.NumberColumn("p95 (ms)", format="%.1f"),
+                    "max_ms": st.column_config.NumberColumn("Máx (ms)", format="%.1f"),
+                    "alocacao_media_kb": st.column_config.NumberColumn("Alocação média (KB)", format="%.0f"),
+                },
+            )
+        else:
+            st.caption("Nenhuma etapa medida ainda.")
+        if not MEDIR_MEMORIA:
+            st.caption("Alocações: defina INFORMATIVOS_DIAGNOSTICO_MEMORIA=1 para medir (tracemalloc).")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("Prometheus", metricas().prometheus(), "metricas.prom", "text/plain")
+        with col2:
+            st.download_button("JSONL", metricas().jsonl(), "metricas.jsonl", "application/jsonl")
+        
+        # Perfilador por amostragem: vale a partir da próxima rerun desta sessão
+        st.checkbox("Perfilador por amostragem", value=False, key="perfilador_ativo",
+                    help="Amostra a pilha desta sessão a cada 5 ms; exporta no formato do flamegraph.pl")
+        if perfilador().amostras:
+            st.caption(f"{perfilador().amostras} amostras de pilha")
+            st.download_button("Pilhas (flamegraph)", perfilador().colapsadas(), "pilhas.folded", "text/plain")
+        
+        if st.button("Limpar diagnóstico"):
+            metricas().limpar()
+            perfilador().limpar()
+
+# Função para executar uma rerun medindo o tempo total (e amostrando as pilhas, se ligado)
+def executar():
+    amostrar = ARQUIVO_PILHAS or st.session_state.get("perfilador_ativo", False)
+    with medir("rerun"), (perfilador().acompanhar() if amostrar else contextlib.nullcontext()):
+        main()
+    if ARQUIVO_PILHAS:
+        perfilador().gravar(ARQUIVO_PILHAS)
+
 if __name__ == "__main__":
-    main()
+    executar()
@@ -0,0 +1,196 @@
+import string
+
+import numpy as np
+import pandas as pd
+
+from colunar import Textos
+
+# Modelos de assertiva (cada um usa a tese ou o resumo parcial do informativo)
+MODELOS_ASSERTIVAS = [
+    "O STF decidiu que {tese}.",
+    "De acordo com o informativo {informativo}, {resumo_parcial}.",
+    "No julgamento de {classe} em {data}, o STF entendeu que {resumo_parcial}.",
+    "É correto afirmar que, segundo o STF, {tese}.",
+    "O {orgao} do STF, ao julgar {classe} em {data}, firmou entendimento de que {resumo_parcial}.",
+]
+
+# Palavras do resumo mantidas na assertiva
+PALAVRAS_RESUMO = 15
+
+ORGAO = "Plenário"
+
+
+def _negar(t):
+    # "Não " + texto com a primeira letra minúscula
+    return ("Não " + t.str[0].str.lower() + t.str[1:]).where(t.str.len() > 0, t)
+
+
+def _inverter(t, a, b):
+    # Troca a por b quando a aparece (ex.: a forma negativa pela positiva); senão, b por a
+    return pd.Series(
+        np.where(t.str.contains(a, regex=False), t.str.replace(a, b, regex=False), t.str.replace(b, a, regex=False)),
+        index=t.index, dtype=object,
+    )
+
+
+# Modificações usadas para transformar uma assertiva verdadeira em falsa
+MODIFICADORES = [
+    _negar,
+    lambda t: _inverter(t, "não pode", "pode"),
+    lambda t: _inverter(t, "inconstitucional", "constitucional"),
+    lambda t: _inverter(t, "direito", "dever"),
+]
+
+
+def _partes_modelo(modelo):
+    # "No julgamento de {classe} em ..." -> [("No julgamento de ", "classe"), (" em ", ...), ...]
+    return [(literal, campo) for literal, campo, _, _ in string.Formatter().parse(modelo)]
+
+
+# Função para pré-calcular os trechos de um bloco de registros (posições globais a partir de inicio)
+def _montar_trechos(df, inicio):
+    com_resumo = df["Resumo"].notna().to_numpy()
+    df = df[com_resumo]
+
+    resumo = df["Resumo"].astype("string")
+    palavras = resumo.str.split()
+    resumo_parcial = palavras.str[:PALAVRAS_RESUMO].str.join(" ")
+    resumo_parcial = resumo_parcial.where(palavras.str.len() <= PALAVRAS_RESUMO, resumo_parcial + "...")
+    resumo_parcial = resumo_parcial.where(resumo_parcial.str.len() > 0, "o tema foi objeto de análise pelo tribunal")
+
+    tese = df["Tese Julgado"].astype("string").fillna(resumo_parcial)
+    datas = pd.to_datetime(df["Data Julgamento"])
+
+    # Variantes: linha 0 = texto original, linha k = modificador k - 1
+    variantes = {}
+    for nome, serie in (("tese", tese), ("resumo_parcial", resumo_parcial)):
+        variantes[nome] = np.vstack(
+            [serie.to_numpy(dtype=object)] + [pd.Series(m(serie)).to_numpy(dtype=object) for m in MODIFICADORES]
+        )
+
+    informativo = df["Informativo"].astype("string").fillna("").to_numpy(dtype=object)
+    return {
+        "posicoes": inicio + np.flatnonzero(com_resumo),
+        "informativo": informativo,
+        "classe": df["Classe Processo"].astype("string").fillna("").to_numpy(dtype=object),
+        "data": datas.dt.strftime("%d/%m/%Y").fillna("data não especificada").to_numpy(dtype=object),
+        "tese": variantes["tese"],
+        "resumo_parcial": variantes["resumo_parcial"],
+        "explicacao": "Informativo " + informativo + ": " + variantes["resumo_parcial"][0],
+    }
+
+
+# Gerador de assertivas de verdadeiro ou falso
+#
+# Resumos truncados, datas formatadas e as versões modificadas (falsas) de cada
+# tese/resumo são calculados uma vez por versão dos dados. Gerar N assertivas é só
+# sortear índices com numpy e concatenar arrays de trechos, então milhares de itens
+# saem de uma vez. Com a mesma semente (e os mesmos dados) o resultado é idêntico.
+class GeradorAssertivas:
+    def __init__(self, trechos, num_linhas):
+        self.trechos = trechos
+        self.num_linhas = num_linhas
+        self.partes_modelos = [_partes_modelo(m) for m in MODELOS_ASSERTIVAS]
+        self.usa_tese = np.array(["{tese}" in m for m in MODELOS_ASSERTIVAS])
+
+        # Modificador k é elegível para um registro quando de fato altera o texto
+        self.elegivel = {
+            campo: trechos[campo][1:] != trechos[campo][0]
+            for campo in ("tese", "resumo_parcial")
+        }
+
+    # Serialização (modo de serviço): os trechos de texto viram Textos (mesma forma)
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        estado["trechos"] = {
+            chave: Textos.de_array(valor) if isinstance(valor, np.ndarray) and valor.dtype == object else valor
+            for chave, valor in self.trechos.items()
+        }
+        return estado
+
+    @classmethod
+    def construir(cls, df):
+        return cls(_montar_trechos(df, 0), len(df))
+
+    # Função para criar um novo gerador com os registros adicionais (o atual não muda)
+    def estendido(self, df_novos):
+        novos = _montar_trechos(df_novos, self.num_linhas)
+        trechos = {
+            chave: np.concatenate([valor, novos[chave]], axis=-1)
+            for chave, valor in self.trechos.items()
+        }
+        return GeradorAssertivas(trechos, self.num_linhas + len(df_novos))
+
+    def __len__(self):
+        return len(self.trechos["posicoes"])
+
+    # Função para gerar assertivas (opcionalmente só a partir das posições em linhas)
+    def gerar(self, quantidade, semente=None, linhas=None):
+        rng = np.random.default_rng(semente)
+
+        disponiveis = np.arange(len(self))
+        if linhas is not None:
+            disponiveis = np.flatnonzero(np.isin(self.trechos["posicoes"], linhas))
+        if not len(disponiveis) or quantidade <= 0:
+            return pd.DataFrame(columns=["texto", "resposta", "explicacao", "posicao", "modelo"])
+
+        # Sem repetição enquanto houver registros suficientes
+        registros = rng.choice(disponiveis, size=quantidade, replace=quantidade > len(disponiveis))
+        modelos = rng.integers(len(MODELOS_ASSERTIVAS), size=quantidade)
+        verdadeiras = rng.random(quantidade) < 0.5
+
+        # Modificador sorteado entre os elegíveis (o texto usado pelo modelo precisa mudar)
+        elegiveis = np.where(
+            self.usa_tese[modelos][:, None],
+            self.elegivel["tese"][:, registros].T,
+            self.elegivel["resumo_parcial"][:, registros].T,
+        )
+        sorteio = rng.random(elegiveis.shape)
+        sorteio[~elegiveis] = -1.0
+        modificadores = sorteio.argmax(axis=1)
+        verdadeiras |= ~elegiveis.any(axis=1)
+
+        variante = np.where(verdadeiras, 0, modificadores + 1)
+        campos = {
+            "tese": self.trechos["tese"][variante, registros],
+            "resumo_parcial": self.trechos["resumo_parcial"][variante, registros],
+            "informativo": self.trechos["informativo"][registros],
+            "classe": self.trechos["classe"][registros],
+            "data": self.trechos["data"][registros],
+        }
+
+        # Montar os textos por modelo, concatenando arrays de trechos
+        textos = np.empty(quantidade, dtype=object)
+        for modelo, partes in enumerate(self.partes_modelos):
+            selecao = np.flatnonzero(modelos == modelo)
+            if not len(selecao):
+                continue
+            texto = np.full(len(selecao), "", dtype=object)
+            for literal, campo in partes:
+                texto = texto + literal
+                if campo == "orgao":
+                    texto = texto + ORGAO
+                elif campo:
+                    texto = texto + campos[campo][selecao]
+            textos[selecao] = texto
+
+        return pd.DataFrame({
+            "texto": textos,
+            "resposta": verdadeiras,
+            "explicacao": self.trechos["explicacao"][registros],
+            "posicao": self.trechos["posicoes"][registros],
+            "modelo": modelos,
+        })
+
+
+if __name__ == "__main__":
+    import sys
+
+    from dados import carregar_informativos
+
+    # Uso: python assertivas.py [quantidade] [semente] > banco.csv
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    semente = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    gerador = GeradorAssertivas.construir(carregar_informativos())
+    gerador.gerar(quantidade, semente).to_csv(sys.stdout, index=False)
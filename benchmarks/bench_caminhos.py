@@ -0,0 +1,292 @@
+# Benchmark dos caminhos quentes do dashboard em corpus sintéticos de 1x, 10x e 100x
+#
+# Uso: python benchmarks/bench_caminhos.py [--fatores 1 10 100] [--repeticoes 50]
+#                                          [--saida resultado.json] [--comparar anterior.json]
+# Cada escala roda em um processo novo: gera o corpus (benchmarks/sintetico.py), grava
+# o snapshot Arrow e mede a carga, a construção de cada estrutura derivada e as
+# consultas que uma rerun do Streamlit faz (filtros da barra lateral, pesquisa por
+# índice e literal, registros relevantes por modo de busca, assertivas, agregações
+# e tendências de temas da aba de estatísticas). Para cada caminho: percentis de latência, vazão e pico de
+# memória (tracemalloc, numa passada separada porque distorce os tempos; conta as
+# alocações do Python e do numpy, não os buffers do Arrow); para cada construção:
+# tempo e pico de RSS. O JSON leva o commit, e --comparar mostra a razão das
+# medianas contra um resultado anterior.
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+FATORES = [1, 10, 100]
+REPETICOES = 50
+AQUECIMENTO = 3
+# Repetições da passada com tracemalloc
+REPETICOES_MEMORIA = 3
+
+# Consultas com o vocabulário dos informativos
+CONSULTAS = [
+    "imunidade tributária", "servidor público", "competência legislativa", "liberdade de expressão",
+    "meio ambiente", "ICMS", "prisão preventiva", "direito à saúde", "lei estadual inconstitucional",
+    "previdência social", "foro por prerrogativa", "concurso público",
+]
+TERMOS = ["tributo", "servidor", "competência", "ambiental", "penal", "saúde", "ICMS", "municipal"]
+
+
+def _percentis(tempos):
+    tempos = np.asarray(tempos) * 1000
+    return {
+        "p50_ms": float(np.percentile(tempos, 50)),
+        "p90_ms": float(np.percentile(tempos, 90)),
+        "p99_ms": float(np.percentile(tempos, 99)),
+        "max_ms": float(tempos.max()),
+        "vazao_por_s": float(len(tempos) / (tempos.sum() / 1000)) if tempos.sum() else None,
+    }
+
+
+# Função para medir um caminho: aquecimento, latências e, à parte, o pico de memória
+def medir(operacao, repeticoes):
+    for i in range(AQUECIMENTO):
+        operacao(i)
+
+    tempos = []
+    for i in range(repeticoes):
+        inicio = time.perf_counter()
+        operacao(i)
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    for i in range(REPETICOES_MEMORIA):
+        operacao(i)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {**_percentis(tempos), "pico_memoria_mb": pico / 1024 / 1024, "repeticoes": repeticoes}
+
+
+# RSS atual do processo em MB (Linux; None em outros sistemas)
+def _rss():
+    try:
+        with open("/proc/self/statm") as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except OSError:
+        return None
+
+
+# Construções são longas e o tracemalloc as deixa várias vezes mais lentas: o pico
+# é o maior RSS amostrado durante a construção, descontado o RSS do início
+def _construir(construtor):
+    base = _rss()
+    pico = [base]
+    terminou = threading.Event()
+
+    def amostrar():
+        while not terminou.wait(0.01):
+            pico[0] = max(pico[0], _rss())
+
+    amostrador = threading.Thread(target=amostrar, daemon=True)
+    if base is not None:
+        amostrador.start()
+    inicio = time.perf_counter()
+    objeto = construtor()
+    tempo = time.perf_counter() - inicio
+    terminou.set()
+    if base is not None:
+        amostrador.join()
+        pico[0] = max(pico[0], _rss())
+
+    return objeto, {"tempo_s": tempo, "pico_rss_mb": pico[0] - base if base is not None else None}
+
+
+# Parâmetros sorteados (com semente) para as consultas de filtro
+def _selecoes(motor, rng, quantidade):
+    inicio, fim = motor.intervalo_datas()
+    dias = (fim - inicio).days
+    facetas = list(motor.facetas)
+    sorteios = []
+    for _ in range(quantidade):
+        selecoes = {}
+        for coluna in rng.choice(facetas, rng.integers(0, 3), replace=False):
+            opcoes = motor.opcoes(coluna)
+            selecoes[str(coluna)] = opcoes[rng.integers(0, len(opcoes))]
+        intervalo = None
+        if rng.random() < 0.5:
+            comeco = inicio + np.timedelta64(int(rng.integers(0, dias)), "D").item()
+            intervalo = (comeco, min(fim, comeco + np.timedelta64(int(rng.integers(30, 720)), "D").item()))
+        sorteios.append((selecoes, intervalo))
+    return sorteios
+
+
+# Função que roda uma escala inteira (processo worker)
+# Parâmetros sorteados para as consultas de tendências: (anterior, recente, ramo, ordem, termo)
+#
+# O memo da matriz fica desligado (max_memo = 0): cada consulta é calculada de novo.
+def _tendencias(matriz, rng, quantidade):
+    matriz.max_memo = 0
+    anos = matriz.anos()
+    ramos = [None] * 4 + matriz.ramos[:8]
+    parametros = []
+    for _ in range(quantidade):
+        anterior, recente = sorted(rng.choice(anos, 2, replace=False).tolist())
+        parametros.append((
+            (f"{anterior}-01", f"{anterior}-12"), (f"{recente}-01", f"{recente}-12"),
+            ramos[rng.integers(0, len(ramos))], [None, 1, 2][rng.integers(0, 3)],
+            matriz.termo(TERMOS[rng.integers(0, len(TERMOS))]),
+        ))
+    return parametros
+
+
+def medir_escala(fator, repeticoes, semente=0):
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    from agregacoes import CuboAgregacoes
+    from assertivas import GeradorAssertivas
+    from dados import ler_snapshot, montar_dataframe
+    from filtros import MotorFiltros
+    from incremental import RegistroIncremental
+    from nucleo import Nucleo
+    from pesquisa import IndicePesquisa
+    from recuperacao import IndiceBM25
+    from semantica import IndiceSemantico
+    from sintetico import corpus_dataframe
+    from tendencias import MatrizTendencias
+
+    inicio = time.perf_counter()
+    tabela, df = corpus_dataframe(fator, semente)
+    resultado = {"linhas": len(df), "geracao_s": time.perf_counter() - inicio}
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "sintetico.arrow")
+        with pa.OSFile(caminho, "wb") as saida:
+            with ipc.new_file(saida, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+        del tabela
+
+        sha256 = df.attrs["versao"]
+        caminhos = {
+            "carregar_dados": medir(lambda i: montar_dataframe(ler_snapshot(caminho), sha256),
+                                    max(5, repeticoes // 5)),
+        }
+
+    # Construção das estruturas derivadas (uma vez por versão do dataset)
+    construidos = {}
+    construcao = {}
+    construtores = {
+        "filtros": lambda: MotorFiltros.construir(df),
+        "cubo": lambda: CuboAgregacoes.construir(construidos["filtros"]),
+        "pesquisa": lambda: IndicePesquisa.construir(df),
+        "bm25": lambda: IndiceBM25.construir(df),
+        "assertivas": lambda: GeradorAssertivas.construir(df),
+        "semantica": lambda: IndiceSemantico.construir(df),
+        "tendencias": lambda: MatrizTendencias.construir(df),
+    }
+    for nome, construtor in construtores.items():
+        construidos[nome], construcao[nome] = _construir(construtor)
+    resultado["construcao"] = construcao
+
+    # O núcleo usa as estruturas já construídas (mesmo mecanismo do modo de serviço)
+    nucleo = Nucleo(df, RegistroIncremental(publicados=lambda nome, _df: construidos.get(nome)))
+    rng = np.random.default_rng(semente)
+    total = repeticoes + AQUECIMENTO
+    selecoes = _selecoes(nucleo.filtros, rng, total)
+    termos = [TERMOS[i] for i in rng.integers(0, len(TERMOS), total)]
+    consultas = [CONSULTAS[i] for i in rng.integers(0, len(CONSULTAS), total)]
+    tendencias = _tendencias(nucleo.tendencias, rng, total)
+
+    caminhos.update({
+        "filtros": lambda i: nucleo.filtrar(*selecoes[i]),
+        "pesquisa_indice": lambda i: nucleo.filtrar(*selecoes[i], termos[i]),
+        "pesquisa_literal": lambda i: nucleo.filtrar(*selecoes[i], termos[i], busca_literal=True),
+        "registros_palavras": lambda i: nucleo.registros_relevantes(consultas[i], modo="palavras"),
+        "registros_semantica": lambda i: nucleo.registros_relevantes(consultas[i], modo="semantica"),
+        "registros_hibrida": lambda i: nucleo.registros_relevantes(consultas[i], modo="hibrida"),
+        "assertivas": lambda i: nucleo.gerar_assertivas(5),
+        "estatisticas": lambda i: nucleo.estatisticas(*selecoes[i]),
+        "estatisticas_termo": lambda i: nucleo.estatisticas(*selecoes[i], termos[i]),
+        "tendencias": lambda i: nucleo.tendencias.variacoes(*tendencias[i][:4]),
+        "tendencias_termo": lambda i: (nucleo.tendencias.serie(tendencias[i][-1]), nucleo.tendencias.por_ramo(tendencias[i][-1])),
+    })
+    resultado["caminhos"] = {
+        nome: operacao if isinstance(operacao, dict) else medir(operacao, repeticoes)
+        for nome, operacao in caminhos.items()
+    }
+    resultado["pico_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return resultado
+
+
+def _commit():
+    try:
+        saida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True)
+        commit = saida.stdout.strip() or None
+        sujo = subprocess.run(["git", "diff", "--quiet", "HEAD"], cwd=RAIZ).returncode != 0
+        return f"{commit}-sujo" if commit and sujo else commit
+    except OSError:
+        return None
+
+
+# Razão das medianas (atual / anterior) de cada caminho: > 1 é regressão
+def comparar(atual, anterior):
+    razoes = {}
+    for escala, dados in atual["escalas"].items():
+        base = anterior.get("escalas", {}).get(escala, {}).get("caminhos", {})
+        razoes[escala] = {
+            nome: round(medidas["p50_ms"] / base[nome]["p50_ms"], 3)
+            for nome, medidas in dados["caminhos"].items()
+            if nome in base and base[nome]["p50_ms"]
+        }
+    return razoes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dos caminhos quentes do dashboard")
+    parser.add_argument("--fatores", type=float, nargs="+", default=FATORES)
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida")
+    parser.add_argument("--comparar")
+    parser.add_argument("--escala", type=float, help=argparse.SUPPRESS)
+    argumentos = parser.parse_args()
+    os.chdir(RAIZ)
+
+    # Processo worker: mede uma escala e devolve o JSON na última linha
+    if argumentos.escala is not None:
+        print(json.dumps(medir_escala(argumentos.escala, argumentos.repeticoes, argumentos.semente)))
+        sys.exit(0)
+
+    resultado = {
+        "commit": _commit(),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "maquina": platform.machine(),
+        "repeticoes": argumentos.repeticoes,
+        "escalas": {},
+    }
+    for fator in argumentos.fatores:
+        saida = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--escala", str(fator),
+             "--repeticoes", str(argumentos.repeticoes), "--semente", str(argumentos.semente)],
+            cwd=RAIZ, capture_output=True, text=True, check=True,
+        )
+        resultado["escalas"][f"{fator:g}x"] = json.loads(saida.stdout.strip().splitlines()[-1])
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding="utf-8") as arquivo:
+            resultado["comparacao"] = comparar(resultado, json.load(arquivo))
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if argumentos.saida:
+        with open(argumentos.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto)
+    print(texto)
@@ -0,0 +1,52 @@
+# Benchmark de partida a frio: planilha (pd.read_excel) x snapshot Arrow
+#
+# Uso: python benchmarks/bench_carregamento.py [repeticoes]
+# Cada medição roda em um processo novo, como um worker recém-iniciado.
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Os imports ficam fora da medição: o custo de importar pandas/pyarrow é igual nos dois caminhos
+CODIGO = {
+    "planilha": "ler_planilha(ARQUIVO_ORIGEM)",
+    "snapshot": "carregar_informativos()",
+}
+
+MEDIR = """
+import time
+from dados import ARQUIVO_ORIGEM, carregar_informativos, ler_planilha
+import openpyxl
+inicio = time.perf_counter()
+{codigo}
+print(time.perf_counter() - inicio)
+"""
+
+
+def medir(nome, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", MEDIR.format(codigo=CODIGO[nome])],
+            cwd=RAIZ, capture_output=True, text=True, check=True,
+        )
+        tempos.append(float(saida.stdout.strip().splitlines()[-1]))
+    return {
+        "mediana_s": statistics.median(tempos),
+        "min_s": min(tempos),
+        "max_s": max(tempos),
+    }
+
+
+if __name__ == "__main__":
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    # Garantir que o snapshot exista antes de medir o caminho rápido
+    subprocess.run([sys.executable, "dados.py"], cwd=RAIZ, check=True, capture_output=True)
+
+    resultado = {nome: medir(nome, repeticoes) for nome in CODIGO}
+    resultado["aceleracao"] = resultado["planilha"]["mediana_s"] / resultado["snapshot"]["mediana_s"]
+    print(json.dumps(resultado, indent=2))
@@ -0,0 +1,143 @@
+# Benchmark da detecção de quase-duplicatas (MinHash/LSH) contra a comparação par a par
+#
+# Uso: python benchmarks/bench_duplicatas.py [--fatores 10 100] [--duplicatas 0.1]
+#                                            [--amostra 2000] [--saida resultado.json]
+# Cada escala roda em um processo novo com um corpus sintético em que uma fração das
+# linhas é quase-duplicata de outra (benchmarks/sintetico.py). Mede as etapas do
+# IndiceDuplicatas (shingles, assinaturas, LSH e agrupamento) e a comparação ingênua:
+# Jaccard exato dos conjuntos de shingles em todos os pares de uma amostra, com o
+# tempo extrapolado para os n(n-1)/2 pares do corpus. Na amostra, os pares com
+# Jaccard >= limiar são a referência para a revocação dos grupos do LSH.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_caminhos import _commit, _construir  # noqa: E402
+
+FATORES = [10, 100]
+FRACAO_DUPLICATAS = 0.1
+AMOSTRA = 2000
+
+
+# Comparação ingênua: Jaccard exato de todos os pares da amostra
+def _par_a_par(conjuntos, limiar):
+    pares = []
+    inicio = time.perf_counter()
+    for i in range(len(conjuntos)):
+        a = conjuntos[i]
+        for j in range(i + 1, len(conjuntos)):
+            b = conjuntos[j]
+            if a and b:
+                comuns = len(a & b)
+                if comuns / (len(a) + len(b) - comuns) >= limiar:
+                    pares.append((i, j))
+    return pares, time.perf_counter() - inicio
+
+
+# Função que roda uma escala inteira (processo worker)
+def medir_escala(fator, fracao_duplicatas, amostra, semente=0):
+    from duplicatas import (
+        LIMIAR_SIMILARIDADE, IndiceDuplicatas, _textos, agrupar, assinaturas_minhash, pares_candidatos, shingles,
+    )
+    from sintetico import corpus_dataframe
+
+    inicio = time.perf_counter()
+    _, df = corpus_dataframe(fator, semente, fracao_duplicatas=fracao_duplicatas)
+    textos = _textos(df)
+    n = len(df)
+    resultado = {"linhas": n, "geracao_s": time.perf_counter() - inicio}
+
+    # Etapas medidas separadamente e o índice completo (tempo e pico de RSS)
+    inicio = time.perf_counter()
+    shingles(textos)
+    etapas = {"shingles_s": time.perf_counter() - inicio}
+    inicio = time.perf_counter()
+    assinaturas, vazios = assinaturas_minhash(textos)
+    etapas["assinaturas_s"] = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    candidatos = pares_candidatos(assinaturas, vazios)
+    etapas["lsh_s"] = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    agrupar(assinaturas, vazios)
+    etapas["agrupamento_s"] = time.perf_counter() - inicio
+    indice, construcao = _construir(lambda: IndiceDuplicatas.construir(df))
+
+    grupos = indice.grupos
+    resultado["minhash_lsh"] = {
+        **etapas,
+        **construcao,
+        "pares_candidatos": int(candidatos.shape[1]),
+        "grupos": indice.num_grupos,
+        "linhas_em_grupos": int(np.count_nonzero(np.bincount(grupos, minlength=n)[grupos] > 1)),
+    }
+
+    # Comparação ingênua numa amostra, extrapolada para o corpus
+    rng = np.random.default_rng(semente)
+    selecionadas = np.sort(rng.choice(n, min(amostra, n), replace=False))
+    documentos, valores = shingles([textos[i] for i in selecionadas])
+    conjuntos = [set() for _ in selecionadas]
+    for documento, valor in zip(documentos.tolist(), valores.tolist()):
+        conjuntos[documento].add(valor)
+    referencia, tempo = _par_a_par(conjuntos, LIMIAR_SIMILARIDADE)
+
+    pares_amostra = len(selecionadas) * (len(selecionadas) - 1) / 2
+    encontrados = sum(grupos[selecionadas[i]] == grupos[selecionadas[j]] for i, j in referencia)
+    resultado["par_a_par"] = {
+        "amostra": len(selecionadas),
+        "tempo_amostra_s": tempo,
+        "tempo_por_par_us": tempo / pares_amostra * 1e6,
+        "tempo_estimado_s": tempo / pares_amostra * n * (n - 1) / 2,
+        "pares_acima_limiar": len(referencia),
+        "revocacao_lsh": encontrados / len(referencia) if referencia else None,
+    }
+    resultado["aceleracao_estimada"] = resultado["par_a_par"]["tempo_estimado_s"] / construcao["tempo_s"]
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da detecção de quase-duplicatas")
+    parser.add_argument("--fatores", type=float, nargs="+", default=FATORES)
+    parser.add_argument("--duplicatas", type=float, default=FRACAO_DUPLICATAS)
+    parser.add_argument("--amostra", type=int, default=AMOSTRA)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida")
+    parser.add_argument("--escala", type=float, help=argparse.SUPPRESS)
+    argumentos = parser.parse_args()
+    os.chdir(RAIZ)
+
+    # Processo worker: mede uma escala e devolve o JSON na última linha
+    if argumentos.escala is not None:
+        print(json.dumps(medir_escala(argumentos.escala, argumentos.duplicatas, argumentos.amostra, argumentos.semente)))
+        sys.exit(0)
+
+    resultado = {
+        "commit": _commit(),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "maquina": platform.machine(),
+        "fracao_duplicatas": argumentos.duplicatas,
+        "escalas": {},
+    }
+    for fator in argumentos.fatores:
+        saida = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--escala", str(fator), "--duplicatas", str(argumentos.duplicatas),
+             "--amostra", str(argumentos.amostra), "--semente", str(argumentos.semente)],
+            cwd=RAIZ, capture_output=True, text=True, check=True,
+        )
+        resultado["escalas"][f"{fator:g}x"] = json.loads(saida.stdout.strip().splitlines()[-1])
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if argumentos.saida:
+        with open(argumentos.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto)
+    print(texto)
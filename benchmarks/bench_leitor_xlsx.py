@@ -0,0 +1,80 @@
+# Benchmark do leitor da planilha: pd.read_excel (openpyxl) x leitor em streaming
+#
+# Uso: python benchmarks/bench_leitor_xlsx.py [fator_sintetico]
+# Mede tempo e pico de memória (RSS) de ler_planilha_arrow, o caminho usado para
+# montar o snapshot, na planilha do repositório e numa planilha sintética com as
+# mesmas linhas repetidas N vezes (padrão: 100x). Cada medição roda em um processo novo.
+# "streaming_lotes" só percorre os lotes do leitor, sem montar a tabela final: mostra
+# o custo do leitor em si, que não cresce com o tamanho do arquivo.
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CODIGO = {
+    "pandas": "linhas = ler_planilha_arrow(caminho, 'pandas').num_rows",
+    "streaming": "linhas = ler_planilha_arrow(caminho, 'streaming').num_rows",
+    "streaming_lotes": "linhas = sum(len(lote) for lote in ler_lotes(caminho))",
+}
+
+# O RSS de base (depois dos imports) é descontado para isolar o custo da leitura
+MEDIR = """
+import resource, time
+import openpyxl
+from dados import ler_planilha_arrow
+from leitor_xlsx import ler_lotes
+caminho = {caminho!r}
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+inicio = time.perf_counter()
+{codigo}
+tempo = time.perf_counter() - inicio
+pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(tempo, pico - base, linhas)
+"""
+
+
+# Função para gerar a planilha sintética (modo write_only: não guarda as linhas em memória)
+def gerar_planilha_sintetica(origem, destino, fator):
+    import openpyxl
+
+    origem_wb = openpyxl.load_workbook(origem, read_only=True)
+    linhas = list(origem_wb.active.iter_rows(values_only=True))
+    origem_wb.close()
+
+    destino_wb = openpyxl.Workbook(write_only=True)
+    planilha = destino_wb.create_sheet()
+    planilha.append(linhas[0])
+    for _ in range(fator):
+        for linha in linhas[1:]:
+            planilha.append(linha)
+    destino_wb.save(destino)
+
+
+def medir(caminho, nome):
+    saida = subprocess.run(
+        [sys.executable, "-c", MEDIR.format(caminho=caminho, codigo=CODIGO[nome])],
+        cwd=RAIZ, capture_output=True, text=True, check=True,
+    )
+    tempo, pico_kb, linhas = saida.stdout.strip().splitlines()[-1].split()
+    return {"tempo_s": float(tempo), "pico_rss_mb": int(pico_kb) / 1024, "linhas": int(linhas)}
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, RAIZ)
+    from dados import ARQUIVO_ORIGEM
+
+    fator = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    origem = os.path.join(RAIZ, ARQUIVO_ORIGEM)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        sintetica = os.path.join(pasta, f"informativos_{fator}x.xlsx")
+        gerar_planilha_sintetica(origem, sintetica, fator)
+
+        resultado = {}
+        for nome, caminho in [("original", origem), (f"sintetica_{fator}x", sintetica)]:
+            resultado[nome] = {motor: medir(caminho, motor) for motor in CODIGO}
+
+    print(json.dumps(resultado, indent=2))
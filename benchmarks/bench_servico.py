@@ -0,0 +1,86 @@
+# Benchmark do modo de serviço: N workers com dados/índices privados x mapeados
+#
+# Uso: python benchmarks/bench_servico.py [workers]
+# Cada worker é um processo que carrega o dataset e todos os índices e fica vivo até
+# todos terminarem; aí cada um reporta o tempo de partida e a memória. O PSS
+# (proportional set size, Linux) divide as páginas compartilhadas entre os processos
+# que as mapeiam, então a soma dos PSS é a memória real ocupada pelos N workers
+# (inclui o interpretador e as bibliotecas). rss_carga é o quanto cada worker cresceu
+# ao carregar dados e índices.
+import json
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Os imports ficam fora da medição (custo igual nos dois modos)
+CODIGO = {
+    "privado": "df = carregar_informativos(); indices = construir_indices(df)",
+    "servico": "df = carregar_publicado(); indices = {n: indice_publicado(n, df) for n in NOMES}",
+}
+
+WORKER = """
+import sys, time
+from dados import carregar_informativos
+from servico import carregar_publicado, construir_indices, indice_publicado
+import agregacoes, assertivas, filtros, pesquisa, recuperacao, semantica
+NOMES = ["bm25", "filtros", "cubo", "pesquisa", "assertivas", "semantica"]
+
+def memoria():
+    valores = {{}}
+    with open("/proc/self/smaps_rollup") as arquivo:
+        for linha in arquivo:
+            partes = linha.split()
+            if partes[0] in ("Rss:", "Pss:"):
+                valores[partes[0][:-1].lower()] = int(partes[1]) / 1024
+    return valores
+
+base = memoria()
+inicio = time.perf_counter()
+{codigo}
+tempo = time.perf_counter() - inicio
+print("pronto", flush=True)
+sys.stdin.readline()
+final = memoria()
+print(tempo, final["rss"] - base["rss"], final["pss"], flush=True)
+sys.stdin.readline()
+"""
+
+
+def medir(modo, workers):
+    processos = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER.format(codigo=CODIGO[modo])],
+            cwd=RAIZ, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        for _ in range(workers)
+    ]
+
+    # Esperar todos ficarem prontos antes de medir (as páginas compartilhadas já mapeadas)
+    for processo in processos:
+        processo.stdout.readline()
+    # Medir com todos vivos (o PSS depende de quantos processos mapeiam cada página)
+    for processo in processos:
+        processo.stdin.write("\n")
+        processo.stdin.flush()
+    resultados = [[float(v) for v in processo.stdout.readline().split()] for processo in processos]
+    for processo in processos:
+        processo.communicate("\n")
+
+    return {
+        "partida_media_s": sum(r[0] for r in resultados) / workers,
+        "rss_carga_por_worker_mb": sum(r[1] for r in resultados) / workers,
+        "pss_total_mb": sum(r[2] for r in resultados),
+    }
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+    # Publicar a versão atual antes de medir o modo de serviço
+    subprocess.run([sys.executable, "servico.py"], cwd=RAIZ, check=True, capture_output=True)
+
+    resultado = {modo: medir(modo, workers) for modo in CODIGO}
+    resultado["workers"] = workers
+    print(json.dumps(resultado, indent=2))
@@ -0,0 +1,76 @@
+# Benchmark de sessões concorrentes: DataFrame via st.cache_data x st.cache_resource
+#
+# Uso: python benchmarks/bench_sessoes.py [sessoes] [reruns]
+# Simula N sessões (threads) fazendo reruns. Com cache_data cada chamada a
+# carregar_dados() devolve uma cópia desserializada (pickle) do DataFrame; com
+# cache_resource todas recebem o mesmo objeto somente leitura.
+import json
+import os
+import pickle
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dados import carregar_informativos  # noqa: E402
+from filtros import MotorFiltros  # noqa: E402
+
+
+def simular(modo, df, motor, sessoes, reruns, medir_memoria):
+    serializado = pickle.dumps(df)
+    tempos = []
+    trava = threading.Lock()
+    barreira = threading.Barrier(sessoes)
+    vivos = []
+
+    def sessao():
+        barreira.wait()
+        locais = []
+        for _ in range(reruns):
+            inicio = time.perf_counter()
+            dados = pickle.loads(serializado) if modo == "cache_data" else df
+            linhas = motor.filtrar({"Classe Processo": "ADI"})
+            selecionado = dados.iloc[linhas]
+            locais.append(time.perf_counter() - inicio)
+        with trava:
+            tempos.extend(locais)
+            # Cada sessão mantém o último resultado vivo, como o script do Streamlit
+            vivos.append((dados, selecionado))
+
+    if medir_memoria:
+        tracemalloc.start()
+    threads = [threading.Thread(target=sessao) for _ in range(sessoes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if medir_memoria:
+        atual, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {"memoria_por_sessao_kb": atual / sessoes / 1024, "pico_total_mb": pico / 1024 / 1024}
+
+    tempos.sort()
+    return {
+        "rerun_p50_ms": statistics.median(tempos) * 1000,
+        "rerun_p95_ms": tempos[int(len(tempos) * 0.95)] * 1000,
+    }
+
+
+if __name__ == "__main__":
+    sessoes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    reruns = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    df = carregar_informativos()
+    motor = MotorFiltros.construir(df)
+
+    # Latência e memória em passadas separadas (o tracemalloc distorce os tempos)
+    resultado = {"sessoes": sessoes, "reruns": reruns}
+    for modo in ("cache_data", "cache_resource"):
+        resultado[modo] = simular(modo, df, motor, sessoes, reruns, medir_memoria=False)
+        resultado[modo].update(simular(modo, df, motor, sessoes, reruns, medir_memoria=True))
+    print(json.dumps(resultado, indent=2))
@@ -0,0 +1,198 @@
+# Gerador de corpus sintético com o formato dos informativos (para benchmarks)
+#
+# Uso: python benchmarks/sintetico.py fator [destino.arrow] [semente]
+# Cada linha sintética copia os metadados de uma linha sorteada da planilha real
+# (classe, ramo, repercussão geral, data/informativo e quais campos são nulos), o
+# que preserva as distribuições e correlações das facetas. Os textos (título, tese,
+# resumo) são gerados por uma cadeia de Markov de palavras treinada no próprio
+# corpus, com o mesmo número de palavras do campo sorteado: vocabulário, frequência
+# dos termos e tamanho dos textos parecidos com os reais, sem repetir os registros.
+# A matéria é uma lista de palavras-chave sorteadas das matérias reais.
+# Com fracao_duplicatas > 0, essa fração das linhas repete a tese e o resumo de outra
+# linha com algumas palavras trocadas (quase-duplicatas, como o mesmo julgamento
+# noticiado em mais de um informativo).
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from dados import ARQUIVO_ORIGEM, carregar_informativos, montar_dataframe, para_tabela_arrow  # noqa: E402
+
+CAMPOS_GERADOS = ["Título", "Tese Julgado", "Resumo"]
+
+# Linhas geradas por vez (limita a matriz de palavras em memória)
+LINHAS_POR_BLOCO = 10_000
+
+# Marcador de início/fim de texto na cadeia
+_FIM = 0
+
+# Fração das palavras trocadas em cada quase-duplicata
+PALAVRAS_TROCADAS = 0.03
+
+
+# Cadeia de Markov de palavras (ordem 1) com as transições numa matriz esparsa (CSR)
+#
+# Os sorteios são vetorizados: as probabilidades acumuladas de cada estado ficam
+# deslocadas pelo número do estado (estado s ocupa o intervalo [s, s + 1)), então
+# uma única busca binária sorteia a próxima palavra de todas as linhas de uma vez.
+class CadeiaMarkov:
+    def __init__(self, palavras, inicio, destinos, acumuladas):
+        self.palavras = palavras
+        self.inicio = inicio
+        self.destinos = destinos
+        self.acumuladas = acumuladas
+
+    @classmethod
+    def treinar(cls, textos):
+        vocabulario = {"": _FIM}
+        origens = []
+        destinos = []
+        for texto in textos:
+            anterior = _FIM
+            for palavra in texto.split():
+                codigo = vocabulario.setdefault(palavra, len(vocabulario))
+                origens.append(anterior)
+                destinos.append(codigo)
+                anterior = codigo
+            origens.append(anterior)
+            destinos.append(_FIM)
+
+        # Contagem de cada par (origem, destino), ordenada por origem
+        pares = np.unique(np.array(origens, dtype=np.int64) * len(vocabulario) + np.array(destinos), return_counts=True)
+        origem, destino = np.divmod(pares[0], len(vocabulario))
+        contagens = pares[1].astype(np.float64)
+
+        inicio = np.searchsorted(origem, np.arange(len(vocabulario) + 1))
+        acumuladas = np.cumsum(contagens)
+        anteriores = np.concatenate([[0.0], acumuladas[inicio[1:] - 1]])[:len(vocabulario)]
+        totais = np.diff(np.concatenate([[0.0], acumuladas[inicio[1:] - 1]]))
+        totais[totais == 0] = 1.0
+        relativas = (acumuladas - np.repeat(anteriores, np.diff(inicio))) / np.repeat(totais, np.diff(inicio))
+
+        palavras = np.empty(len(vocabulario), dtype=object)
+        for palavra, codigo in vocabulario.items():
+            palavras[codigo] = palavra
+        return cls(palavras, inicio, destino.astype(np.int32), relativas + origem)
+
+    def _proximas(self, estados, rng):
+        sorteio = estados + rng.random(len(estados)) * (1 - 1e-12)
+        return self.destinos[np.searchsorted(self.acumuladas, sorteio, side="right")]
+
+    # Função para gerar textos com o número de palavras pedido para cada um
+    def gerar(self, tamanhos, rng):
+        tamanhos = np.asarray(tamanhos)
+        maximo = int(tamanhos.max()) if len(tamanhos) else 0
+        matriz = np.empty((len(tamanhos), maximo), dtype=np.int32)
+
+        # Linhas em ordem decrescente de tamanho: a cada passo só o prefixo ainda ativo avança
+        ordem = np.argsort(-tamanhos, kind="stable")
+        restantes = np.searchsorted(-tamanhos[ordem], -np.arange(maximo), side="left")
+        estados = np.full(len(tamanhos), _FIM, dtype=np.int64)
+        for passo in range(maximo):
+            ativos = estados[:restantes[passo]]
+            ativos = self._proximas(ativos, rng)
+            # Fim de texto antes do tamanho pedido: recomeçar uma frase nova
+            fins = ativos == _FIM
+            if fins.any():
+                ativos[fins] = self._proximas(np.zeros(fins.sum(), dtype=np.int64), rng)
+            estados[:len(ativos)] = ativos
+            matriz[ordem[:len(ativos)], passo] = ativos
+
+        return [" ".join(self.palavras[matriz[i, :tamanho]]) for i, tamanho in enumerate(tamanhos)]
+
+
+def _palavras(serie):
+    return serie.fillna("").astype(str).str.split().str.len().to_numpy()
+
+
+# Função para copiar os textos de outras linhas com algumas palavras trocadas
+def _duplicar(df, fracao, rng):
+    copias = np.flatnonzero(rng.random(len(df)) < fracao)
+    originais = rng.integers(0, len(df), len(copias))
+    for campo in ("Tese Julgado", "Resumo"):
+        textos = df[campo].to_numpy(dtype=object, na_value=None)
+        for copia, original in zip(copias, originais):
+            if textos[original] is None:
+                continue
+            palavras = textos[original].split()
+            trocas = rng.random(len(palavras)) < PALAVRAS_TROCADAS
+            for i in np.flatnonzero(trocas):
+                palavras[i] = palavras[rng.integers(0, len(palavras))]
+            textos[copia] = " ".join(palavras)
+        df[campo] = pd.array(textos, dtype="string")
+    return df
+
+
+# Função para gerar o corpus sintético: fator x o número de linhas da planilha
+def gerar_corpus(fator, semente=0, base=None, fracao_duplicatas=0.0):
+    base = base if base is not None else carregar_informativos()
+    rng = np.random.default_rng(semente)
+    total = int(round(len(base) * fator))
+
+    cadeias = {campo: CadeiaMarkov.treinar(base[campo].dropna().astype(str)) for campo in CAMPOS_GERADOS}
+    tamanhos = {campo: _palavras(base[campo]) for campo in CAMPOS_GERADOS}
+    materias = base["Matéria"].dropna().astype(str).str.split(";").explode().str.strip()
+    materias = materias[materias != ""].to_numpy()
+    termos_materia = base["Matéria"].fillna("").astype(str).str.count(";").to_numpy() + 1
+
+    partes = []
+    for inicio in range(0, total, LINHAS_POR_BLOCO):
+        sorteadas = rng.integers(0, len(base), min(LINHAS_POR_BLOCO, total - inicio))
+        bloco = base.iloc[sorteadas].reset_index(drop=True)
+
+        for campo in CAMPOS_GERADOS:
+            nulos = bloco[campo].isna().to_numpy()
+            textos = cadeias[campo].gerar(np.where(nulos, 0, tamanhos[campo][sorteadas]), rng)
+            bloco[campo] = pd.array([None if nulo else texto for texto, nulo in zip(textos, nulos)], dtype="string")
+
+        nulos = bloco["Matéria"].isna().to_numpy()
+        bloco["Matéria"] = pd.array([
+            None if nulo else "; ".join(rng.choice(materias, quantidade))
+            for nulo, quantidade in zip(nulos, termos_materia[sorteadas])
+        ], dtype="string")
+        partes.append(bloco)
+
+    # Ordem cronológica decrescente, como na planilha
+    df = pd.concat(partes, ignore_index=True)
+    if fracao_duplicatas:
+        df = _duplicar(df, fracao_duplicatas, rng)
+    df = df.sort_values("Data Julgamento", ascending=False, kind="stable", ignore_index=True)
+    return df
+
+
+# Função para montar o DataFrame do app (tipos e versão) a partir do corpus gerado
+def corpus_dataframe(fator, semente=0, base=None, fracao_duplicatas=0.0):
+    tabela = para_tabela_arrow(gerar_corpus(fator, semente, base, fracao_duplicatas))
+    sha256 = hashlib.sha256(
+        f"sintetico|{ARQUIVO_ORIGEM}|{fator}|{semente}|{fracao_duplicatas}".encode()
+    ).hexdigest()
+    return tabela, montar_dataframe(tabela, sha256)
+
+
+if __name__ == "__main__":
+    import time
+
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    os.chdir(RAIZ)
+    fator = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    destino = sys.argv[2] if len(sys.argv) > 2 else None
+    semente = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+    inicio = time.perf_counter()
+    tabela, df = corpus_dataframe(fator, semente)
+    print(f"{len(df)} linhas geradas em {time.perf_counter() - inicio:.1f}s")
+
+    if destino:
+        with pa.OSFile(destino, "wb") as saida:
+            with ipc.new_file(saida, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+        print(f"Gravado em {destino}")
+    else:
+        print(df.head().to_string())
@@ -0,0 +1,266 @@
+import bisect
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+
+# Lista de textos somente leitura em dois arrays, como uma coluna string do Arrow:
+# os bytes UTF-8 de todos os textos e o início de cada um. Quando os arrays vêm de
+# um mmap, os textos não ocupam memória própria no processo; cada acesso decodifica
+# só o texto pedido. forma guarda a forma de uma matriz de textos (os índices de
+# uma tupla de arrays são convertidos para a posição na lista).
+class Textos(Sequence):
+    def __init__(self, valores, inicios, forma=None):
+        self.valores = valores
+        self.inicios = inicios
+        self.forma = tuple(forma) if forma is not None else (len(inicios) - 1,)
+
+    @classmethod
+    def de_lista(cls, textos, forma=None):
+        codificados = []
+        for texto in textos:
+            if not isinstance(texto, str):
+                raise TypeError(f"Textos só guarda str (recebeu {type(texto).__name__})")
+            codificados.append(texto.encode("utf-8"))
+        inicios = np.zeros(len(codificados) + 1, dtype=np.int64)
+        np.cumsum([len(c) for c in codificados], out=inicios[1:])
+        return cls(np.frombuffer(b"".join(codificados), dtype=np.uint8), inicios, forma)
+
+    # Função para converter um array de objetos (str) de qualquer forma
+    @classmethod
+    def de_array(cls, array):
+        return cls.de_lista(np.asarray(array, dtype=object).ravel().tolist(), np.shape(array))
+
+    def _texto(self, i):
+        return self.valores[self.inicios[i]:self.inicios[i + 1]].tobytes().decode("utf-8")
+
+    def _varios(self, indices):
+        indices = np.asarray(indices, dtype=np.int64)
+        resultado = np.empty(indices.shape, dtype=object)
+        for posicao, i in enumerate(indices.ravel().tolist()):
+            resultado.flat[posicao] = self._texto(i)
+        return resultado
+
+    def __len__(self):
+        return self.forma[0]
+
+    # textos[i] -> str; textos[array] -> array de objetos; textos[linhas, colunas] (matriz)
+    def __getitem__(self, chave):
+        if isinstance(chave, tuple):
+            return self._varios(np.ravel_multi_index(chave, self.forma))
+        if isinstance(chave, slice):
+            return [self._texto(i) for i in range(*chave.indices(len(self)))]
+        if isinstance(chave, (int, np.integer)):
+            if chave < 0:
+                chave += len(self)
+            if not 0 <= chave < len(self):
+                raise IndexError(chave)
+            return self._texto(chave)
+        return self._varios(chave)
+
+    def __iter__(self):
+        dados = self.valores.tobytes()
+        inicios = self.inicios.tolist()
+        for inicio, fim in zip(inicios[:-1], inicios[1:]):
+            yield dados[inicio:fim].decode("utf-8")
+
+    def tolist(self):
+        return list(self)
+
+    def __array__(self, dtype=None, copy=None):
+        array = np.empty(len(self.inicios) - 1, dtype=object)
+        array[:] = list(self)
+        return array.reshape(self.forma)
+
+    def __add__(self, outros):
+        return list(self) + list(outros)
+
+
+# Função para montar o array de chaves de um dicionário ordenado: Textos para
+# textos, array numérico para números
+def array_valores(valores):
+    valores = list(valores)
+    if all(isinstance(v, str) for v in valores):
+        return Textos.de_lista(valores)
+    array = np.array(valores)
+    if array.dtype.kind not in "biuf":
+        raise TypeError(f"valores devem ser todos texto ou todos números (tipo {array.dtype})")
+    return array
+
+
+# Posição de uma chave nas chaves ordenadas (Textos ou array numérico), ou None
+def _buscar(chaves, chave):
+    if isinstance(chaves, Textos):
+        if not isinstance(chave, str):
+            return None
+        i = bisect.bisect_left(chaves, chave)
+    else:
+        if isinstance(chave, (str, bytes, bool)) or not isinstance(chave, (int, float, np.number)):
+            return None
+        i = int(np.searchsorted(chaves, chave))
+    if i < len(chaves) and chaves[i] == chave:
+        return i
+    return None
+
+
+# Dicionário somente leitura chave -> código (vocabulários, posições de valores)
+#
+# As chaves ficam ordenadas num array e os códigos em outro, na mesma ordem: a busca
+# é binária, O(log n), e nada é recriado no heap ao mapear os arrays do disco.
+class Posicoes(Mapping):
+    def __init__(self, chaves, codigos):
+        self.chaves = chaves
+        self.codigos = codigos
+
+    @classmethod
+    def de_dict(cls, dicionario):
+        chaves = sorted(dicionario)
+        return cls(array_valores(chaves), np.array([dicionario[c] for c in chaves], dtype=np.int64))
+
+    def __getitem__(self, chave):
+        i = _buscar(self.chaves, chave)
+        if i is None:
+            raise KeyError(chave)
+        return int(self.codigos[i])
+
+    def __iter__(self):
+        return iter(self.chaves)
+
+    def __len__(self):
+        return len(self.codigos)
+
+
+# Dicionário somente leitura texto -> array (listas de postagens) em formato CSR:
+# chaves ordenadas, início de cada lista e todos os elementos concatenados
+class Listas(Mapping):
+    def __init__(self, chaves, inicios, dados):
+        self.chaves = chaves
+        self.inicios = inicios
+        self.dados = dados
+
+    @classmethod
+    def de_dict(cls, dicionario, dtype=np.int64):
+        chaves = sorted(dicionario)
+        listas = [np.asarray(dicionario[c], dtype=dtype) for c in chaves]
+        inicios = np.zeros(len(listas) + 1, dtype=np.int64)
+        np.cumsum([len(lista) for lista in listas], out=inicios[1:])
+        dados = np.concatenate(listas) if listas else np.empty(0, dtype=dtype)
+        return cls(Textos.de_lista(chaves), inicios, dados)
+
+    def __getitem__(self, chave):
+        i = _buscar(self.chaves, chave)
+        if i is None:
+            raise KeyError(chave)
+        return self.dados[self.inicios[i]:self.inicios[i + 1]]
+
+    def __iter__(self):
+        return iter(self.chaves)
+
+    def __len__(self):
+        return len(self.chaves)
+
+
+# Função para converter objetos numa estrutura JSON e uma lista de buffers, sem pickle
+#
+# Arrays numéricos viram buffers (bytes contíguos); Textos, Posicoes e Listas viram
+# os seus arrays; objetos, só das classes permitidas (nome -> classe), pelo
+# __getstate__. Arrays de objetos Python são recusados: a classe deve convertê-los
+# (em Textos, Posicoes...) no __getstate__. Objetos repetidos viram referências.
+def codificar(objeto, classes):
+    nomes = {classe: nome for nome, classe in classes.items()}
+    buffers = []
+    vistos = {}
+    mantidos = []
+
+    def array(valor):
+        valor = np.ascontiguousarray(valor)
+        if valor.dtype.hasobject:
+            raise TypeError("arrays de objetos não podem ser gravados (converter para Textos)")
+        buffers.append(valor.reshape(-1).view(np.uint8))
+        return {"array": len(buffers) - 1, "dtype": valor.dtype.str, "forma": list(valor.shape)}
+
+    def converter(valor):
+        if valor is None or isinstance(valor, (bool, int, float, str)):
+            return valor
+        if isinstance(valor, np.generic):
+            return {"escalar": valor.dtype.str, "valor": valor.item()}
+        if isinstance(valor, np.ndarray):
+            return array(valor)
+        if isinstance(valor, list):
+            return {"lista": [converter(v) for v in valor]}
+        if isinstance(valor, tuple):
+            return {"tupla": [converter(v) for v in valor]}
+        if isinstance(valor, dict):
+            if not all(isinstance(chave, str) for chave in valor):
+                raise TypeError("dicionários gravados precisam de chaves texto (converter para Posicoes)")
+            return {"dict": {chave: converter(v) for chave, v in valor.items()}}
+
+        if id(valor) in vistos:
+            return {"ref": vistos[id(valor)]}
+        vistos[id(valor)] = len(vistos)
+        # Os objetos criados no __getstate__ ficam vivos até o fim (o id não é reaproveitado)
+        mantidos.append(valor)
+        codigo = {"id": vistos[id(valor)]}
+        if isinstance(valor, Textos):
+            codigo["textos"] = [array(valor.valores), array(valor.inicios), list(valor.forma)]
+        elif isinstance(valor, Posicoes):
+            codigo["posicoes"] = [converter(valor.chaves), array(valor.codigos)]
+        elif isinstance(valor, Listas):
+            codigo["listas"] = [converter(valor.chaves), array(valor.inicios), array(valor.dados)]
+        elif type(valor) in nomes:
+            codigo["objeto"] = nomes[type(valor)]
+            codigo["estado"] = converter(valor.__getstate__())
+        else:
+            raise TypeError(f"tipo não gravável: {type(valor).__name__}")
+        return codigo
+
+    return converter(objeto), buffers
+
+
+# Função para reconstruir os objetos de codificar a partir dos buffers (ex.: fatias de
+# um mmap somente leitura: os arrays apontam direto para as páginas do arquivo)
+def decodificar(estrutura, buffers, classes):
+    objetos = {}
+
+    def array(codigo):
+        dtype = np.dtype(codigo["dtype"])
+        return np.frombuffer(buffers[codigo["array"]], dtype=dtype).reshape(codigo["forma"])
+
+    def converter(codigo):
+        if not isinstance(codigo, dict):
+            return codigo
+        if "escalar" in codigo:
+            return np.dtype(codigo["escalar"]).type(codigo["valor"])
+        if "array" in codigo:
+            return array(codigo)
+        if "lista" in codigo:
+            return [converter(v) for v in codigo["lista"]]
+        if "tupla" in codigo:
+            return tuple(converter(v) for v in codigo["tupla"])
+        if "dict" in codigo:
+            return {chave: converter(v) for chave, v in codigo["dict"].items()}
+        if "ref" in codigo:
+            return objetos[codigo["ref"]]
+
+        if "textos" in codigo:
+            valores, inicios, forma = codigo["textos"]
+            objeto = Textos(array(valores), array(inicios), forma)
+        elif "posicoes" in codigo:
+            chaves, codigos = codigo["posicoes"]
+            objeto = Posicoes(converter(chaves), array(codigos))
+        elif "listas" in codigo:
+            chaves, inicios, dados = codigo["listas"]
+            objeto = Listas(converter(chaves), array(inicios), array(dados))
+        else:
+            classe = classes[codigo["objeto"]]
+            objeto = classe.__new__(classe)
+            objetos[codigo["id"]] = objeto
+            estado = converter(codigo["estado"])
+            if hasattr(classe, "__setstate__"):
+                objeto.__setstate__(estado)
+            else:
+                objeto.__dict__.update(estado)
+        objetos[codigo["id"]] = objeto
+        return objeto
+
+    return converter(estrutura)
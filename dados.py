@@ -0,0 +1,389 @@
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem travas, as versões antigas são apagadas só pela idade
+    fcntl = None
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+# Arquivo de origem e local do snapshot colunar
+ARQUIVO_ORIGEM = 'data/informativos_stf_2021_2025.xlsx'
+DIRETORIO_SNAPSHOT = 'data/cache'
+
+# Partições Parquet acrescentadas pela ingestão incremental (ver ingestao.py)
+DIRETORIO_PARTICOES = 'data/particoes'
+ARQUIVO_MANIFESTO = 'manifesto.json'
+# O manifesto é trocado atomicamente (novo inode), então a trava fica num arquivo à parte
+ARQUIVO_TRAVA_MANIFESTO = 'manifesto.lock'
+
+# Versão do formato do snapshot (incrementar ao mudar o esquema gravado)
+VERSAO_FORMATO = 2
+
+# Colunas com poucos valores distintos, gravadas como dicionário (categóricas)
+COLUNAS_CATEGORICAS = ["Classe Processo", "Ramo Direito", "Repercussão Geral"]
+
+# Colunas de texto livre
+COLUNAS_TEXTO = ["Título", "Tese Julgado", "Resumo", "Matéria"]
+
+# Motor de leitura da planilha: "pandas" (pd.read_excel/openpyxl) ou "streaming"
+# (leitor_xlsx, memória limitada para exportações grandes)
+MOTOR_LEITURA = os.environ.get("INFORMATIVOS_MOTOR_XLSX", "pandas")
+
+
+# Função para calcular o hash do conteúdo do arquivo de origem
+def calcular_hash(caminho, tamanho_bloco=1 << 20):
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+# Função para ler a planilha original (caminho antigo, sem snapshot)
+def ler_planilha(caminho, motor=None):
+    if (motor or MOTOR_LEITURA) == "streaming":
+        from leitor_xlsx import ler_lotes
+
+        return pd.concat([_tipar_lote(lote) for lote in ler_lotes(caminho)], ignore_index=True)
+
+    df = pd.read_excel(caminho)
+
+    # Converter a coluna de data para datetime
+    df["Data Julgamento"] = pd.to_datetime(df["Data Julgamento"], format="%d/%m/%Y", errors="coerce")
+
+    return adicionar_colunas_derivadas(df)
+
+
+# Função para tipar um lote vindo do leitor em streaming (mesmos tipos do read_excel)
+def _tipar_lote(df):
+    df["Informativo"] = pd.to_numeric(df["Informativo"])
+
+    datas = df["Data Julgamento"]
+    numericas = pd.to_numeric(datas, errors="coerce")
+    df["Data Julgamento"] = pd.to_datetime(datas.where(numericas.isna()), format="%d/%m/%Y", errors="coerce")
+    # Datas gravadas como número de série do Excel
+    if numericas.notna().any():
+        seriais = pd.to_datetime(numericas, unit="D", origin="1899-12-30")
+        df["Data Julgamento"] = df["Data Julgamento"].where(numericas.isna(), seriais)
+
+    return adicionar_colunas_derivadas(df)
+
+
+# Função para ler a planilha direto como tabela Arrow
+#
+# No motor "streaming" cada lote de linhas é tipado e convertido para Arrow assim
+# que é lido, então nunca existe a planilha inteira como objetos Python.
+def ler_planilha_arrow(caminho, motor=None):
+    if (motor or MOTOR_LEITURA) != "streaming":
+        return para_tabela_arrow(ler_planilha(caminho, "pandas"))
+
+    from leitor_xlsx import ler_lotes
+
+    lotes = [para_tabela_arrow(_tipar_lote(lote)) for lote in ler_lotes(caminho)]
+    if not lotes:
+        # Planilha sem linhas de dados: deixar o read_excel montar o esquema
+        return para_tabela_arrow(ler_planilha(caminho, "pandas"))
+    # Mesmos dicionários em todos os lotes (exigido pelo formato de arquivo IPC)
+    return pa.concat_tables(lotes).unify_dictionaries()
+
+
+# Colunas derivadas, calculadas uma vez na carga (e gravadas no snapshot), nunca nas reruns
+def adicionar_colunas_derivadas(df):
+    df["Ano"] = df["Data Julgamento"].dt.year.astype("Int16")
+    return df
+
+
+# Função para converter o DataFrame em uma tabela Arrow tipada
+def para_tabela_arrow(df):
+    campos = []
+    colunas = []
+
+    for coluna in df.columns:
+        serie = df[coluna]
+        if coluna in COLUNAS_CATEGORICAS:
+            valores = serie.astype("string").astype(object).where(serie.notna(), None)
+            array = pa.array(valores, type=pa.string()).dictionary_encode()
+        elif coluna == "Data Julgamento":
+            array = pa.array(serie, type=pa.timestamp("ns"))
+        elif coluna in COLUNAS_TEXTO:
+            valores = serie.astype(object).where(serie.notna(), None)
+            array = pa.array(valores, type=pa.large_string())
+        else:
+            array = pa.array(serie)
+        campos.append(pa.field(coluna, array.type))
+        colunas.append(array)
+
+    return pa.Table.from_arrays(colunas, schema=pa.schema(campos))
+
+
+# Caminhos do snapshot e do arquivo de metadados
+def caminhos_snapshot(origem, diretorio=DIRETORIO_SNAPSHOT):
+    nome = os.path.splitext(os.path.basename(origem))[0]
+    return (
+        os.path.join(diretorio, f"{nome}.arrow"),
+        os.path.join(diretorio, f"{nome}.meta.json"),
+    )
+
+
+# Função para gravar um arquivo de forma atômica (escreve em temporário e renomeia)
+def gravar_atomico(destino, escrever):
+    temporario = f"{destino}.tmp-{os.getpid()}"
+    try:
+        escrever(temporario)
+        os.replace(temporario, destino)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+# Versões (diretórios) em uso por este processo: caminho -> [arquivo travado, usos]
+_em_uso = {}
+_trava_uso = threading.Lock()
+
+
+# Função para marcar uma versão gravada como em uso (trava compartilhada no arquivo de
+# meta): enquanto algum processo a tiver, apagar_se_livre não remove o diretório.
+# Devolve a função que libera o uso.
+def travar_uso(caminho_meta):
+    chave = os.path.abspath(caminho_meta)
+    with _trava_uso:
+        uso = _em_uso.get(chave)
+        if uso is None:
+            arquivo = open(chave, "rb")
+            if fcntl is not None:
+                fcntl.flock(arquivo, fcntl.LOCK_SH)
+            # Apagada entre a leitura do nome e a trava
+            if not os.path.exists(chave):
+                arquivo.close()
+                raise FileNotFoundError(chave)
+            uso = _em_uso[chave] = [arquivo, 0]
+        uso[1] += 1
+
+    def liberar():
+        with _trava_uso:
+            uso[1] -= 1
+            if uso[1] == 0:
+                del _em_uso[chave]
+                uso[0].close()
+
+    return liberar
+
+
+# Função para apagar o diretório de uma versão, se nenhum processo a estiver usando
+def apagar_se_livre(diretorio, caminho_meta):
+    try:
+        arquivo = open(caminho_meta, "rb")
+    except OSError:
+        shutil.rmtree(diretorio, ignore_errors=True)
+        return False
+    with arquivo:
+        if fcntl is not None:
+            try:
+                fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return False
+        shutil.rmtree(diretorio, ignore_errors=True)
+    return True
+
+
+def _ler_metadados(caminho_meta):
+    try:
+        with open(caminho_meta, encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+
+
+def _gravar_metadados(caminho_meta, metadados):
+    def escrever(caminho):
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(metadados, arquivo, ensure_ascii=False, indent=2)
+
+    gravar_atomico(caminho_meta, escrever)
+
+
+# Função para construir o snapshot a partir da planilha (etapa de build)
+def construir_snapshot(origem=ARQUIVO_ORIGEM, diretorio=DIRETORIO_SNAPSHOT, sha256=None):
+    os.makedirs(diretorio, exist_ok=True)
+    caminho_arrow, caminho_meta = caminhos_snapshot(origem, diretorio)
+
+    estado = os.stat(origem)
+    if sha256 is None:
+        sha256 = calcular_hash(origem)
+
+    tabela = ler_planilha_arrow(origem)
+
+    # Arrow IPC sem compressão, para permitir leitura via memory map sem cópia
+    def escrever(caminho):
+        with pa.OSFile(caminho, "wb") as saida:
+            with ipc.new_file(saida, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+
+    gravar_atomico(caminho_arrow, escrever)
+    _gravar_metadados(caminho_meta, {
+        "versao_formato": VERSAO_FORMATO,
+        "origem": os.path.basename(origem),
+        "origem_mtime_ns": estado.st_mtime_ns,
+        "origem_tamanho": estado.st_size,
+        "sha256": sha256,
+        "linhas": tabela.num_rows,
+    })
+
+    return caminho_arrow
+
+
+# Função para verificar se o snapshot ainda corresponde à planilha de origem
+def snapshot_valido(origem=ARQUIVO_ORIGEM, diretorio=DIRETORIO_SNAPSHOT):
+    caminho_arrow, caminho_meta = caminhos_snapshot(origem, diretorio)
+    metadados = _ler_metadados(caminho_meta)
+
+    if not metadados or not os.path.exists(caminho_arrow):
+        return False, None
+    if metadados.get("versao_formato") != VERSAO_FORMATO:
+        return False, None
+
+    estado = os.stat(origem)
+
+    # Caminho rápido: mtime e tamanho iguais aos registrados
+    if (metadados.get("origem_mtime_ns") == estado.st_mtime_ns
+            and metadados.get("origem_tamanho") == estado.st_size):
+        return True, metadados["sha256"]
+
+    # mtime mudou: confirmar pelo hash do conteúdo antes de invalidar
+    sha256 = calcular_hash(origem)
+    if sha256 != metadados.get("sha256"):
+        return False, sha256
+
+    metadados["origem_mtime_ns"] = estado.st_mtime_ns
+    metadados["origem_tamanho"] = estado.st_size
+    try:
+        _gravar_metadados(caminho_meta, metadados)
+    except OSError:
+        pass
+    return True, sha256
+
+
+# Função para mapear tipos Arrow em dtypes do pandas sem copiar o texto
+def _mapear_tipos(tipo):
+    if pa.types.is_string(tipo) or pa.types.is_large_string(tipo):
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+# Função para ler o snapshot via memory map (tabela Arrow, sem cópia)
+def ler_snapshot(caminho_arrow):
+    with pa.memory_map(caminho_arrow, "r") as fonte:
+        return ipc.open_file(fonte).read_all()
+
+
+# Função para obter a tabela base (snapshot da planilha) e o hash da planilha
+def carregar_tabela_base(origem=ARQUIVO_ORIGEM, diretorio=DIRETORIO_SNAPSHOT):
+    valido, sha256 = snapshot_valido(origem, diretorio)
+
+    if not valido:
+        try:
+            construir_snapshot(origem, diretorio, sha256=sha256)
+        except OSError:
+            # Diretório sem permissão de escrita: usar a planilha diretamente
+            return ler_planilha_arrow(origem), sha256 or calcular_hash(origem)
+        sha256 = _ler_metadados(caminhos_snapshot(origem, diretorio)[1])["sha256"]
+
+    return ler_snapshot(caminhos_snapshot(origem, diretorio)[0]), sha256
+
+
+# Função para ler a lista de partições já ingeridas (em ordem de chegada)
+def ler_manifesto(particoes=DIRETORIO_PARTICOES):
+    metadados = _ler_metadados(os.path.join(particoes, ARQUIVO_MANIFESTO))
+    return list(metadados["particoes"]) if metadados else []
+
+
+def gravar_manifesto(nomes, particoes=DIRETORIO_PARTICOES):
+    _gravar_metadados(os.path.join(particoes, ARQUIVO_MANIFESTO), {"particoes": list(nomes)})
+
+
+# Função para travar o manifesto com exclusividade (entre processos) durante o bloco:
+# duas ingestões simultâneas não perdem a partição uma da outra ao regravar a lista
+@contextlib.contextmanager
+def travar_manifesto(particoes=DIRETORIO_PARTICOES):
+    os.makedirs(particoes, exist_ok=True)
+    with open(os.path.join(particoes, ARQUIVO_TRAVA_MANIFESTO), "a+b") as arquivo:
+        if fcntl is not None:
+            fcntl.flock(arquivo, fcntl.LOCK_EX)
+        yield
+
+
+# Função para obter uma assinatura barata das fontes (mtime/tamanho), usada como chave de cache
+def assinatura_fontes(origem=ARQUIVO_ORIGEM, particoes=DIRETORIO_PARTICOES):
+    assinatura = []
+    for caminho in (origem, os.path.join(particoes, ARQUIVO_MANIFESTO)):
+        try:
+            estado = os.stat(caminho)
+            assinatura.append((estado.st_mtime_ns, estado.st_size))
+        except OSError:
+            assinatura.append(None)
+    return tuple(assinatura)
+
+
+# Função para obter a tabela completa: snapshot da planilha + partições ingeridas
+def carregar_tabela(origem=ARQUIVO_ORIGEM, diretorio=DIRETORIO_SNAPSHOT, particoes=DIRETORIO_PARTICOES):
+    tabela, sha256 = carregar_tabela_base(origem, diretorio)
+
+    nomes = ler_manifesto(particoes)
+    if nomes:
+        partes = [
+            pq.read_table(os.path.join(particoes, nome), memory_map=True).cast(tabela.schema)
+            for nome in nomes
+        ]
+        tabela = pa.concat_tables([tabela] + partes)
+
+    return tabela, sha256, nomes
+
+
+# Função para converter a tabela Arrow no DataFrame do app (com a versão nos attrs)
+def montar_dataframe(tabela, sha256, particoes=()):
+    df = tabela.to_pandas(types_mapper=_mapear_tipos, split_blocks=True)
+    return _marcar_versao(df, sha256, particoes)
+
+
+# Função para carregar os informativos: snapshot da planilha + partições ingeridas
+def carregar_informativos(origem=ARQUIVO_ORIGEM, diretorio=DIRETORIO_SNAPSHOT, particoes=DIRETORIO_PARTICOES):
+    tabela, sha256, nomes = carregar_tabela(origem, diretorio, particoes)
+    return montar_dataframe(tabela, sha256, nomes)
+
+
+# Função para registrar a versão no DataFrame carregado
+#
+# A "linhagem" (hash da planilha + partições em ordem) permite reconhecer quando
+# uma versão nova é só a anterior com registros acrescentados no fim.
+def _marcar_versao(df, sha256, particoes=()):
+    versao = sha256 if not particoes else hashlib.sha256("|".join([sha256, *particoes]).encode()).hexdigest()
+    df.attrs["versao"] = versao[:16]
+    df.attrs["linhas"] = len(df)
+    df.attrs["linhagem"] = [sha256[:16], *particoes]
+    return df
+
+
+# Função para obter a versão do dataset (usada como chave de cache dos índices)
+def versao_dataset(df):
+    # O pandas propaga attrs em fatias; só confiar na versão se o número de linhas bater
+    versao = df.attrs.get("versao")
+    if versao is None or df.attrs.get("linhas") != len(df):
+        versao = format(int(pd.util.hash_pandas_object(df, index=True).sum()) & (2**64 - 1), "016x")
+    return versao
+
+
+if __name__ == "__main__":
+    import sys
+
+    origem = sys.argv[1] if len(sys.argv) > 1 else ARQUIVO_ORIGEM
+    caminho = construir_snapshot(origem)
+    print(f"Snapshot gravado em: {caminho}")
@@ -0,0 +1,202 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from texto import tokenizar_lote
+
+# Campos comparados na detecção de duplicatas
+CAMPOS_DUPLICATAS = ["Resumo", "Tese Julgado"]
+
+# MinHash: NUM_PERMUTACOES = FAIXAS x LINHAS_POR_FAIXA. Com 16 faixas de 8 linhas, um par
+# com Jaccard s vira candidato com probabilidade 1 - (1 - s^8)^16 (~50% em s = 0,7 e
+# ~99,6% em s = 0,85); os candidatos são confirmados pela similaridade estimada
+NUM_PERMUTACOES = 128
+FAIXAS = 16
+LINHAS_POR_FAIXA = 8
+LIMIAR_SIMILARIDADE = 0.8
+
+# Tamanho dos shingles (palavras consecutivas)
+TAMANHO_SHINGLE = 3
+
+# Vizinhos comparados dentro de um balde da faixa (baldes enormes não viram O(n²))
+JANELA_BALDE = 32
+
+# Textos processados por vez e shingles por bloco do hash (limitam a memória)
+TEXTOS_POR_BLOCO = 8192
+SHINGLES_POR_BLOCO = 1 << 15
+
+SEMENTE = 20210101
+
+_MASCARA_32 = np.uint64(0xFFFFFFFF)
+_VAZIA = np.iinfo(np.uint32).max
+
+
+def _parametros(num_permutacoes=NUM_PERMUTACOES, semente=SEMENTE):
+    # Hash multiplica-soma-desloca: h(x) = (a * x + b) >> 32, com a ímpar (64 bits)
+    rng = np.random.default_rng(semente)
+    a = rng.integers(1, 2**63, num_permutacoes, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, num_permutacoes, dtype=np.uint64)
+    return a, b
+
+
+def _misturar(x):
+    # Finalizador do splitmix64 (uint64, com overflow)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _textos(df):
+    colunas = [df[c].astype(object).where(df[c].notna(), None).tolist() for c in CAMPOS_DUPLICATAS]
+    return [" ".join(valor for valor in valores if valor) for valores in zip(*colunas)]
+
+
+# Função para obter os shingles (hash de 32 bits, sem repetição) de cada texto
+#
+# Devolve (documentos, shingles) ordenados por documento; textos com menos de
+# TAMANHO_SHINGLE palavras não têm shingles.
+def shingles(textos, tamanho=TAMANHO_SHINGLE):
+    tokens = tokenizar_lote(textos)
+    contagens = np.array([len(t) for t in tokens], dtype=np.int64)
+    if not contagens.sum():
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64)
+
+    # Hash estável (entre processos e versões) de cada palavra distinta
+    codigos, vocabulario = pd.factorize(np.array([token for t in tokens for token in t], dtype=object))
+    hashes = np.array([zlib.crc32(palavra.encode()) for palavra in vocabulario], dtype=np.uint64)[codigos]
+
+    # Shingle i do documento d: palavras i..i+tamanho-1, todas no mesmo documento
+    documento = np.repeat(np.arange(len(textos)), contagens)
+    validos = np.flatnonzero(documento[:len(documento) - tamanho + 1] == documento[tamanho - 1:])
+    valores = np.zeros(len(validos), dtype=np.uint64)
+    for deslocamento in range(tamanho):
+        valores = _misturar(valores * np.uint64(0x9E3779B97F4A7C15) + hashes[validos + deslocamento])
+    valores &= _MASCARA_32
+
+    # Sem repetição dentro do documento (chave: documento nos 32 bits altos)
+    chaves = np.unique((documento[validos].astype(np.uint64) << np.uint64(32)) | valores)
+    return (chaves >> np.uint64(32)).astype(np.int64), chaves & _MASCARA_32
+
+
+# Função para calcular as assinaturas MinHash (uint32, uma linha por texto)
+#
+# Devolve também a máscara dos textos sem shingles (não entram no agrupamento).
+def assinaturas_minhash(textos, num_permutacoes=NUM_PERMUTACOES):
+    a, b = _parametros(num_permutacoes)
+    assinaturas = np.full((len(textos), num_permutacoes), _VAZIA, dtype=np.uint32)
+    vazios = np.ones(len(textos), dtype=bool)
+    for inicio in range(0, len(textos), TEXTOS_POR_BLOCO):
+        documentos, valores = shingles(textos[inicio:inicio + TEXTOS_POR_BLOCO])
+        if len(valores):
+            _minhash(documentos + inicio, valores, a, b, assinaturas, vazios)
+    return assinaturas, vazios
+
+
+def _minhash(documentos, valores, a, b, assinaturas, vazios):
+    # Blocos de shingles que não cortam documentos ao meio
+    inicios = np.flatnonzero(np.r_[True, documentos[1:] != documentos[:-1]])
+    marcos = np.searchsorted(inicios, np.arange(0, len(valores), SHINGLES_POR_BLOCO))
+    cortes = np.unique(np.minimum(marcos, len(inicios) - 1))
+    for primeiro, ultimo in zip(cortes, np.r_[cortes[1:], len(inicios)]):
+        segmentos = inicios[primeiro:ultimo]
+        inicio, fim = segmentos[0], inicios[ultimo] if ultimo < len(inicios) else len(valores)
+        hashes = (a[:, None] * valores[None, inicio:fim] + b[:, None]) >> np.uint64(32)
+        assinaturas[documentos[segmentos]] = np.minimum.reduceat(hashes, segmentos - inicio, axis=1).T
+    vazios[documentos[inicios]] = False
+
+
+# Função para encontrar os pares candidatos por LSH (faixas da assinatura)
+def pares_candidatos(assinaturas, vazios, faixas=FAIXAS, linhas_por_faixa=LINHAS_POR_FAIXA, janela=JANELA_BALDE):
+    indices = np.flatnonzero(~vazios)
+    pares = []
+    for faixa in range(faixas):
+        bloco = assinaturas[indices, faixa * linhas_por_faixa:(faixa + 1) * linhas_por_faixa].astype(np.uint64)
+        balde = np.full(len(indices), np.uint64(faixa), dtype=np.uint64)
+        for coluna in range(linhas_por_faixa):
+            balde = _misturar(balde ^ bloco[:, coluna])
+
+        # Documentos do mesmo balde ficam vizinhos na ordenação
+        ordem = np.argsort(balde, kind="stable")
+        baldes = balde[ordem]
+        for distancia in range(1, min(janela, len(ordem) - 1) + 1):
+            iguais = np.flatnonzero(baldes[distancia:] == baldes[:-distancia])
+            if len(iguais) == 0:
+                break
+            pares.append(np.stack([indices[ordem[iguais]], indices[ordem[iguais + distancia]]]))
+
+    if not pares:
+        return np.empty((2, 0), dtype=np.int64)
+    pares = np.sort(np.concatenate(pares, axis=1), axis=0)
+    return np.stack(np.divmod(np.unique(pares[0] * len(assinaturas) + pares[1]), len(assinaturas)))
+
+
+# Função para agrupar os registros: componentes conexos dos pares confirmados
+#
+# O grupo de cada registro é a menor posição do seu componente (registros sem
+# duplicatas formam o próprio grupo).
+def agrupar(assinaturas, vazios, limiar=LIMIAR_SIMILARIDADE):
+    grupos = np.arange(len(assinaturas))
+    pares = pares_candidatos(assinaturas, vazios)
+    if pares.shape[1] == 0:
+        return grupos
+
+    similaridades = np.empty(pares.shape[1])
+    for inicio in range(0, pares.shape[1], 1 << 16):
+        u, v = pares[:, inicio:inicio + (1 << 16)]
+        similaridades[inicio:inicio + len(u)] = (assinaturas[u] == assinaturas[v]).mean(axis=1)
+    u, v = pares[:, similaridades >= limiar]
+
+    # Propagação do menor rótulo com salto de ponteiros até estabilizar
+    while True:
+        menores = np.minimum(grupos[u], grupos[v])
+        anteriores = grupos.copy()
+        np.minimum.at(grupos, u, menores)
+        np.minimum.at(grupos, v, menores)
+        grupos = grupos[grupos]
+        if np.array_equal(grupos, anteriores):
+            return grupos
+
+
+# Detecção de quase-duplicatas (mesmo julgamento em vários informativos)
+#
+# Assinaturas MinHash dos shingles de Resumo e Tese Julgado e LSH por faixas: só os
+# pares que coincidem em alguma faixa são comparados, em vez de todos os n² pares.
+# grupos[i] é o grupo de duplicatas da linha i (a menor posição do grupo).
+class IndiceDuplicatas:
+    def __init__(self, assinaturas, vazios):
+        self.assinaturas = assinaturas
+        self.vazios = vazios
+        self.grupos = agrupar(assinaturas, vazios)
+
+    @classmethod
+    def construir(cls, df):
+        return cls(*assinaturas_minhash(_textos(df)))
+
+    # Função para criar um novo índice com os registros adicionais (o atual não muda)
+    #
+    # Só as assinaturas dos registros novos são calculadas; os grupos são refeitos
+    # porque um registro novo pode ligar grupos antigos.
+    def estendido(self, df_novos):
+        assinaturas, vazios = assinaturas_minhash(_textos(df_novos))
+        return IndiceDuplicatas(
+            np.concatenate([self.assinaturas, assinaturas]), np.concatenate([self.vazios, vazios])
+        )
+
+    def __len__(self):
+        return len(self.grupos)
+
+    @property
+    def num_grupos(self):
+        return int(np.count_nonzero(self.grupos == np.arange(len(self.grupos))))
+
+    # Função para manter só a primeira linha de cada grupo, na ordem recebida
+    def unicos(self, linhas):
+        linhas = np.asarray(linhas, dtype=np.int64)
+        _, primeiras = np.unique(self.grupos[linhas], return_index=True)
+        return linhas[np.sort(primeiras)]
+
+    # Posições das outras linhas do mesmo grupo
+    def duplicatas(self, posicao):
+        membros = np.flatnonzero(self.grupos == self.grupos[posicao])
+        return membros[membros != posicao]
@@ -0,0 +1,302 @@
+import contextlib
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Banco de estudo (repetição espaçada): um arquivo SQLite compartilhado pelos processos
+ARQUIVO_ESTUDO = os.environ.get("INFORMATIVOS_BANCO_ESTUDO", "data/estudo/estudo.sqlite")
+
+# Parâmetros do SM-2
+FACILIDADE_INICIAL = 2.5
+FACILIDADE_MINIMA = 1.3
+QUALIDADE_ACERTO = 4
+QUALIDADE_ERRO = 1
+UM_DIA = 86400
+
+# Registros novos conferidos no banco por consulta (chave primária de cartoes)
+JANELA_NOVOS = 64
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS cartoes (
+    usuario TEXT NOT NULL,
+    registro TEXT NOT NULL,
+    facilidade REAL NOT NULL,
+    intervalo_dias INTEGER NOT NULL,
+    repeticoes INTEGER NOT NULL,
+    vencimento REAL NOT NULL,
+    acertos INTEGER NOT NULL DEFAULT 0,
+    erros INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (usuario, registro)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cartoes_vencimento ON cartoes (usuario, vencimento);
+
+CREATE TABLE IF NOT EXISTS estudantes (
+    usuario TEXT PRIMARY KEY,
+    acertos INTEGER NOT NULL DEFAULT 0,
+    respostas INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS lote_atual (
+    usuario TEXT NOT NULL,
+    ordem INTEGER NOT NULL,
+    registro TEXT NOT NULL,
+    texto TEXT NOT NULL,
+    resposta INTEGER NOT NULL,
+    explicacao TEXT NOT NULL,
+    resposta_usuario INTEGER,
+    PRIMARY KEY (usuario, ordem)
+);
+"""
+
+
+# Função para obter uma chave estável de cada registro (não muda quando partições
+# são acrescentadas nem quando a planilha é reordenada)
+def chaves_registros(df):
+    hashes = pd.util.hash_pandas_object(df[["Informativo", "Título", "Resumo"]], index=False).to_numpy()
+    return np.array([format(h, "016x") for h in hashes.tolist()], dtype=object)
+
+
+# Função para atualizar um cartão pelo SM-2: qualidade de 0 a 5 (>= 3 é acerto)
+def sm2(facilidade, intervalo_dias, repeticoes, qualidade):
+    if qualidade >= 3:
+        if repeticoes == 0:
+            intervalo_dias = 1
+        elif repeticoes == 1:
+            intervalo_dias = 6
+        else:
+            intervalo_dias = round(intervalo_dias * facilidade)
+        repeticoes += 1
+    else:
+        repeticoes = 0
+        intervalo_dias = 1
+
+    facilidade += 0.1 - (5 - qualidade) * (0.08 + (5 - qualidade) * 0.02)
+    return max(FACILIDADE_MINIMA, facilidade), intervalo_dias, repeticoes
+
+
+# Repositório de estudo: cartões por (usuário, registro), placar e lote em andamento
+#
+# A fila de prioridade é o índice (usuario, vencimento): os próximos cartões vencidos
+# saem de uma busca na árvore B, O(log n + lote), sem varrer nem sortear de novo.
+# Registros ainda não estudados vêm da FilaNovos do usuário: só uma janela a partir
+# do início dela é conferida no banco. O placar é mantido por contadores atualizados a cada resposta.
+class RepositorioEstudo:
+    def __init__(self, caminho=ARQUIVO_ESTUDO):
+        self.caminho = caminho
+        self._trava = threading.Lock()
+        if caminho != ":memory:":
+            os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        self._memoria = sqlite3.connect(caminho, check_same_thread=False) if caminho == ":memory:" else None
+        with self._conexao() as conexao:
+            conexao.executescript(_ESQUEMA)
+
+    @contextlib.contextmanager
+    def _conexao(self):
+        # Uma conexão por operação (sessões em threads e processos diferentes); WAL
+        # deixa leituras e a escrita de outro processo acontecerem ao mesmo tempo
+        if self._memoria is not None:
+            with self._trava, self._memoria:
+                yield self._memoria
+            return
+
+        conexao = sqlite3.connect(self.caminho, timeout=10)
+        try:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()
+
+    # Função para escolher os próximos registros: vencidos, depois novos, depois os que vencem antes
+    def proximos(self, usuario, quantidade, fila_novos=None, agora=None):
+        agora = time.time() if agora is None else agora
+        escolhidos = []
+
+        with self._conexao() as conexao:
+            conexao.execute("INSERT OR IGNORE INTO estudantes (usuario) VALUES (?)", (usuario,))
+            escolhidos += [linha[0] for linha in conexao.execute(
+                "SELECT registro FROM cartoes WHERE usuario = ? AND vencimento <= ? ORDER BY vencimento LIMIT ?",
+                (usuario, agora, quantidade),
+            )]
+
+            # Novos: os primeiros da ordem do usuário que ainda não têm cartão
+            if len(escolhidos) < quantidade and fila_novos is not None:
+                escolhidos += self._novos(conexao, usuario, quantidade - len(escolhidos), fila_novos, escolhidos)
+
+            if len(escolhidos) < quantidade:
+                for (registro,) in conexao.execute(
+                    "SELECT registro FROM cartoes WHERE usuario = ? AND vencimento > ? ORDER BY vencimento LIMIT ?",
+                    (usuario, agora, quantidade),
+                ):
+                    if len(escolhidos) < quantidade and registro not in escolhidos:
+                        escolhidos.append(registro)
+
+        return escolhidos
+
+    def _novos(self, conexao, usuario, quantidade, fila, ignorar):
+        novos = []
+        inicio = fila.inicio
+        prefixo = True
+        while len(novos) < quantidade and inicio < len(fila.chaves):
+            janela = fila.chaves[inicio:inicio + JANELA_NOVOS].tolist()
+            estudados = {linha[0] for linha in conexao.execute(
+                f"SELECT registro FROM cartoes WHERE usuario = ? AND registro IN ({', '.join('?' * len(janela))})",
+                (usuario, *janela),
+            )}
+            for registro in janela:
+                if registro in estudados:
+                    # Já estudados no início da fila não precisam ser conferidos de novo
+                    if prefixo:
+                        fila.avancar(inicio + 1)
+                else:
+                    prefixo = False
+                    if len(novos) < quantidade and registro not in ignorar and registro not in novos:
+                        novos.append(registro)
+                inicio += 1
+        return novos
+
+    # Função para registrar uma resposta: SM-2 do cartão, placar e lote, numa transação
+    # (devolve se acertou; None se a assertiva não existe ou já foi respondida)
+    def responder(self, usuario, ordem, resposta_usuario, agora=None):
+        agora = time.time() if agora is None else agora
+
+        with self._conexao() as conexao:
+            linha = conexao.execute(
+                "SELECT registro, resposta, resposta_usuario FROM lote_atual WHERE usuario = ? AND ordem = ?",
+                (usuario, ordem),
+            ).fetchone()
+            # Só a primeira resposta de cada assertiva conta
+            if linha is None or linha[2] is not None:
+                return None
+            registro = linha[0]
+            acertou = bool(resposta_usuario) == bool(linha[1])
+
+            cartao = conexao.execute(
+                "SELECT facilidade, intervalo_dias, repeticoes FROM cartoes WHERE usuario = ? AND registro = ?",
+                (usuario, registro),
+            ).fetchone() or (FACILIDADE_INICIAL, 0, 0)
+            facilidade, intervalo_dias, repeticoes = sm2(*cartao, QUALIDADE_ACERTO if acertou else QUALIDADE_ERRO)
+
+            conexao.execute(
+                """INSERT INTO cartoes (usuario, registro, facilidade, intervalo_dias, repeticoes, vencimento, acertos, erros)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (usuario, registro) DO UPDATE SET
+                       facilidade = excluded.facilidade, intervalo_dias = excluded.intervalo_dias,
+                       repeticoes = excluded.repeticoes, vencimento = excluded.vencimento,
+                       acertos = acertos + excluded.acertos, erros = erros + excluded.erros""",
+                (usuario, registro, facilidade, intervalo_dias, repeticoes, agora + intervalo_dias * UM_DIA,
+                 int(acertou), int(not acertou)),
+            )
+            conexao.execute(
+                "UPDATE estudantes SET acertos = acertos + ?, respostas = respostas + 1 WHERE usuario = ?",
+                (int(acertou), usuario),
+            )
+            conexao.execute(
+                "UPDATE lote_atual SET resposta_usuario = ? WHERE usuario = ? AND ordem = ?",
+                (int(bool(resposta_usuario)), usuario, ordem),
+            )
+        return acertou
+
+    # Função para trocar o lote em andamento (assertivas: dicts com registro, texto, resposta, explicacao)
+    def salvar_lote(self, usuario, assertivas):
+        with self._conexao() as conexao:
+            conexao.execute("INSERT OR IGNORE INTO estudantes (usuario) VALUES (?)", (usuario,))
+            conexao.execute("DELETE FROM lote_atual WHERE usuario = ?", (usuario,))
+            conexao.executemany(
+                "INSERT INTO lote_atual (usuario, ordem, registro, texto, resposta, explicacao) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (usuario, ordem, a["registro"], a["texto"], int(bool(a["resposta"])), a["explicacao"])
+                    for ordem, a in enumerate(assertivas)
+                ],
+            )
+
+    def lote(self, usuario):
+        with self._conexao() as conexao:
+            linhas = conexao.execute(
+                "SELECT ordem, registro, texto, resposta, explicacao, resposta_usuario FROM lote_atual "
+                "WHERE usuario = ? ORDER BY ordem",
+                (usuario,),
+            ).fetchall()
+
+        # resposta_usuario: a resposta dada (True/False) ou None se ainda não respondida
+        return [
+            {
+                "ordem": ordem, "registro": registro, "texto": texto, "resposta": bool(resposta),
+                "explicacao": explicacao, "resposta_usuario": None if dada is None else bool(dada),
+            }
+            for ordem, registro, texto, resposta, explicacao, dada in linhas
+        ]
+
+    def placar(self, usuario, agora=None):
+        agora = time.time() if agora is None else agora
+        with self._conexao() as conexao:
+            linha = conexao.execute(
+                "SELECT acertos, respostas FROM estudantes WHERE usuario = ?", (usuario,)
+            ).fetchone() or (0, 0)
+            estudados, vencidos = conexao.execute(
+                "SELECT COUNT(*), COALESCE(SUM(vencimento <= ?), 0) FROM cartoes WHERE usuario = ?", (agora, usuario)
+            ).fetchone()
+        return {"acertos": linha[0], "respostas": linha[1], "estudados": estudados, "vencidos": vencidos}
+
+
+# Função para ordenar as chaves dos registros na ordem de estudo do usuário
+#
+# A ordem vem de um hash de (usuário, chave) de cada registro, e não da posição: é a
+# mesma em qualquer versão dos dados, e registros acrescentados por uma ingestão só
+# se intercalam entre os existentes, sem mudar a ordem relativa deles.
+def ordem_novos(usuario, chaves):
+    chaves = np.asarray(chaves, dtype=object)
+    semente = np.uint64(int.from_bytes(hashlib.sha256(usuario.encode()).digest()[:8], "little"))
+    valores = _valores_chaves(chaves) ^ semente
+    # Finalizador do splitmix64: embaralha os bits da chave combinada com o usuário
+    valores = (valores ^ (valores >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    valores = (valores ^ (valores >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    valores ^= valores >> np.uint64(31)
+    return chaves[np.argsort(valores, kind="stable")]
+
+
+# Função para converter as chaves (16 dígitos hexadecimais) em uint64, sem laço em Python
+def _valores_chaves(chaves):
+    digitos = np.asarray(chaves, dtype="U16").view(np.uint32).reshape(len(chaves), 16)
+    digitos = np.where(digitos >= ord("a"), digitos - (ord("a") - 10), digitos - ord("0")).astype(np.uint64)
+    return np.bitwise_or.reduce(digitos << np.arange(60, -1, -4, dtype=np.uint64), axis=1)
+
+
+# Registros novos de um usuário numa versão dos dados, na ordem dele (ordem_novos)
+#
+# Cartões nunca são apagados, então os registros do início da fila que já têm cartão
+# continuam tendo: "inicio" só avança, e cada lote confere a partir dele.
+class FilaNovos:
+    def __init__(self, chaves):
+        self.chaves = chaves
+        self.inicio = 0
+
+    def avancar(self, inicio):
+        # Sessões simultâneas do mesmo usuário: fica a maior posição conferida
+        self.inicio = max(self.inicio, inicio)
+
+
+# Função para montar um novo lote de assertivas para o usuário
+#
+# chaves: chave de cada linha do DataFrame; posicao_por_chave: o inverso (só das linhas
+# com assertivas); fila_novos: FilaNovos do usuário (guardada pelo chamador por versão);
+# gerar(quantidade, semente, linhas) -> DataFrame do GeradorAssertivas.
+def novo_lote(repositorio, usuario, chaves, posicao_por_chave, fila_novos, gerar, quantidade=5, semente=None):
+    escolhidos = repositorio.proximos(usuario, quantidade, fila_novos)
+
+    posicoes = [posicao_por_chave[c] for c in escolhidos if c in posicao_por_chave]
+    if not posicoes:
+        repositorio.salvar_lote(usuario, [])
+        return []
+
+    assertivas = gerar(len(posicoes), semente, np.array(posicoes)).to_dict("records")
+    for assertiva in assertivas:
+        assertiva["registro"] = chaves[assertiva["posicao"]]
+    repositorio.salvar_lote(usuario, assertivas)
+    return repositorio.lote(usuario)
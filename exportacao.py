@@ -0,0 +1,215 @@
+import csv
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pyarrow as pa
+
+from dados import gravar_atomico
+
+# Exportação da seleção filtrada (PDF, CSV e XLSX), gerada em processos separados
+#
+# Os arquivos ficam em disco com nome derivado da versão dos dados, da assinatura do
+# filtro e do formato: a mesma exportação pedida de novo (por qualquer sessão ou
+# processo) é servida do arquivo já gerado.
+DIRETORIO_EXPORTACAO = os.environ.get("INFORMATIVOS_DIRETORIO_EXPORTACAO", "data/exportacao")
+PROCESSOS_EXPORTACAO = int(os.environ.get("INFORMATIVOS_PROCESSOS_EXPORTACAO", "2"))
+
+# Arquivos guardados no diretório (os mais antigos são apagados)
+ARQUIVOS_MANTIDOS = 64
+
+# Registros lidos por vez da tabela Arrow no worker (memória constante por bloco)
+LINHAS_POR_BLOCO = 256
+
+COLUNAS_EXPORTACAO = [
+    "Informativo", "Data Julgamento", "Classe Processo", "Ramo Direito", "Matéria",
+    "Repercussão Geral", "Título", "Tese Julgado", "Resumo",
+]
+
+TIPOS = {
+    "pdf": "application/pdf",
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+# Valor como texto (CSV e PDF)
+def _valor(valor):
+    if valor is None:
+        return ""
+    if hasattr(valor, "strftime"):
+        return valor.strftime("%d/%m/%Y")
+    return str(valor)
+
+
+# Valor tipado para a planilha: números seguem como números e a data vira uma
+# célula de data (formatada como dd/mm/aaaa), para ordenar e filtrar no Excel
+def _celula(planilha, valor):
+    from openpyxl.cell import WriteOnlyCell
+
+    if hasattr(valor, "strftime"):
+        celula = WriteOnlyCell(planilha, valor.date() if hasattr(valor, "date") else valor)
+        celula.number_format = "DD/MM/YYYY"
+        return celula
+    if valor is None or isinstance(valor, (int, float, str)):
+        return valor
+    return str(valor)
+
+
+# Registros da tabela em blocos: só um bloco vira objetos Python de cada vez
+def _registros(tabela):
+    for lote in tabela.to_batches(max_chunksize=LINHAS_POR_BLOCO):
+        yield from lote.to_pylist()
+
+
+def escrever_csv(tabela, destino):
+    # utf-8-sig: o Excel reconhece a codificação ao abrir o arquivo
+    with open(destino, "w", encoding="utf-8-sig", newline="") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(tabela.column_names)
+        for registro in _registros(tabela):
+            escritor.writerow([_valor(valor) for valor in registro.values()])
+
+
+def escrever_xlsx(tabela, destino):
+    from openpyxl import Workbook
+
+    # write_only: as linhas vão direto para o arquivo temporário da planilha
+    livro = Workbook(write_only=True)
+    planilha = livro.create_sheet("Informativos")
+    planilha.append(tabela.column_names)
+    for registro in _registros(tabela):
+        planilha.append([_celula(planilha, valor) for valor in registro.values()])
+    livro.save(destino)
+
+
+def escrever_pdf(tabela, destino):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.lib.utils import simpleSplit
+    from reportlab.pdfgen.canvas import Canvas
+
+    largura, altura = A4
+    margem = 2 * cm
+    largura_texto = largura - 2 * margem
+
+    # Página a página: cada página é fechada (showPage) assim que enche
+    documento = Canvas(destino, pagesize=A4, pageCompression=1)
+    documento.setTitle("Informativos do STF")
+    y = altura - margem
+
+    def escrever(texto, fonte, tamanho, espaco_depois=0):
+        nonlocal y
+        entrelinha = tamanho * 1.3
+        for paragrafo in texto.splitlines() or [""]:
+            for linha in simpleSplit(paragrafo, fonte, tamanho, largura_texto) or [""]:
+                if y - entrelinha < margem:
+                    documento.showPage()
+                    y = altura - margem
+                documento.setFont(fonte, tamanho)
+                documento.drawString(margem, y - tamanho, linha)
+                y -= entrelinha
+        y -= espaco_depois
+
+    for registro in _registros(tabela):
+        escrever(_valor(registro["Título"]) or "Sem título", "Helvetica-Bold", 12, 4)
+        escrever(
+            f"Informativo {_valor(registro['Informativo'])} | {_valor(registro['Data Julgamento'])} | "
+            f"{_valor(registro['Classe Processo'])} | {_valor(registro['Ramo Direito']) or 'Não especificado'}",
+            "Helvetica-Oblique", 9, 2,
+        )
+        if registro["Matéria"]:
+            escrever(f"Matéria: {registro['Matéria']}", "Helvetica-Oblique", 9, 2)
+        for coluna, rotulo in (("Tese Julgado", "Tese Julgada"), ("Resumo", "Resumo")):
+            if registro[coluna]:
+                escrever(f"{rotulo}:", "Helvetica-Bold", 10)
+                escrever(str(registro[coluna]), "Helvetica", 10, 4)
+        y -= 10
+
+    documento.save()
+
+
+ESCRITORES = {
+    "pdf": escrever_pdf,
+    "csv": escrever_csv,
+    "xlsx": escrever_xlsx,
+}
+
+
+# Função executada no processo worker: gera o arquivo de forma atômica
+def gerar_arquivo(tabela, formato, destino):
+    gravar_atomico(destino, lambda temporario: ESCRITORES[formato](tabela, temporario))
+    return destino
+
+
+# Exportações do processo: pool de processos (criado no primeiro uso) e as
+# exportações em andamento, para que pedidos iguais compartilhem o mesmo trabalho
+class Exportador:
+    def __init__(self, diretorio=DIRETORIO_EXPORTACAO, processos=PROCESSOS_EXPORTACAO):
+        self.diretorio = diretorio
+        self.processos = processos
+        self._pool = None
+        self._em_andamento = {}
+        self._trava = threading.Lock()
+
+    def _executor(self):
+        # spawn: o processo do Streamlit tem várias threads, e fork copiaria travas presas
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.processos, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def caminho(self, versao, assinatura_filtros, formato):
+        chave = hashlib.sha256(repr((versao, assinatura_filtros)).encode()).hexdigest()[:32]
+        return os.path.join(self.diretorio, f"{chave}.{formato}")
+
+    # Estado de uma exportação: ("pronto", caminho), ("gerando", None), ("erro", exceção) ou (None, None)
+    def estado(self, versao, assinatura_filtros, formato):
+        destino = self.caminho(versao, assinatura_filtros, formato)
+        with self._trava:
+            futuro = self._em_andamento.get(destino)
+            if futuro is not None:
+                if not futuro.done():
+                    return "gerando", None
+                del self._em_andamento[destino]
+                if futuro.exception() is not None:
+                    return "erro", futuro.exception()
+        if os.path.exists(destino):
+            return "pronto", destino
+        return None, None
+
+    # Função para agendar a exportação das linhas (na ordem dada) de df
+    def exportar(self, df, linhas, versao, assinatura_filtros, formato):
+        if formato not in ESCRITORES:
+            raise ValueError(f"Formato desconhecido: {formato} (use {', '.join(ESCRITORES)})")
+        destino = self.caminho(versao, assinatura_filtros, formato)
+        with self._trava:
+            if destino in self._em_andamento or os.path.exists(destino):
+                return destino
+
+        # Só as colunas exportadas das linhas selecionadas seguem para o worker
+        tabela = pa.Table.from_pandas(df.iloc[linhas][COLUNAS_EXPORTACAO], preserve_index=False)
+        os.makedirs(self.diretorio, exist_ok=True)
+        with self._trava:
+            if destino not in self._em_andamento:
+                futuro = self._executor().submit(gerar_arquivo, tabela, formato, destino)
+                futuro.add_done_callback(lambda _futuro: self._limpar())
+                self._em_andamento[destino] = futuro
+        return destino
+
+    def _limpar(self):
+        try:
+            arquivos = [entrada for entrada in os.scandir(self.diretorio) if entrada.is_file() and ".tmp-" not in entrada.name]
+            arquivos.sort(key=lambda entrada: entrada.stat().st_mtime, reverse=True)
+            for entrada in arquivos[ARQUIVOS_MANTIDOS:]:
+                os.remove(entrada.path)
+        except OSError:
+            pass
+
+
+_exportador = Exportador()
+
+
+def exportador():
+    return _exportador
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+
+from colunar import Posicoes, array_valores
+
+# Colunas usadas como facetas nos filtros da barra lateral
+COLUNAS_FACETAS = ["Informativo", "Ramo Direito", "Classe Processo", "Repercussão Geral"]
+
+COLUNA_DATA = "Data Julgamento"
+
+_UM_DIA = np.timedelta64(1, "D")
+
+
+def _faceta_vazia():
+    return {"codigos": np.empty(0, dtype=np.int32), "valores": [], "posicao": {}, "bitsets": np.zeros((0, 0), dtype=np.uint8)}
+
+
+# Função para montar os bitsets (como np.packbits) das linhas a partir de "inicio"
+# (múltiplo de 8): cada linha liga o seu bit no byte do seu código, sem matriz densa
+def _bitsets(codigos, num_valores, inicio):
+    codigos = codigos[inicio:]
+    bitsets = np.zeros((num_valores, (len(codigos) + 7) // 8), dtype=np.uint8)
+    linhas = np.flatnonzero(codigos >= 0)
+    np.bitwise_or.at(bitsets, (codigos[linhas], linhas >> 3), (0x80 >> (linhas & 7)).astype(np.uint8))
+    return bitsets
+
+
+# Motor de filtros com códigos categóricos e bitsets pré-calculados
+#
+# Para cada faceta guardamos um bitset (np.packbits) por valor distinto. Filtrar é
+# um AND bit a bit entre os bitsets selecionados; o intervalo de datas vira uma
+# busca binária sobre as datas ordenadas. O resultado é um único array de posições.
+class MotorFiltros:
+    def __init__(self, num_linhas, facetas, datas_ordenadas, ordem_datas, coluna_data=COLUNA_DATA):
+        self.num_linhas = num_linhas
+        self.coluna_data = coluna_data
+        self.facetas = facetas
+        self.datas_ordenadas = datas_ordenadas
+        self.ordem_datas = ordem_datas
+
+    # Serialização (modo de serviço): valores e posições das facetas viram arrays
+    # (os valores ordenados são as próprias chaves das posições)
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        estado["facetas"] = {
+            coluna: {
+                "codigos": faceta["codigos"],
+                "valores": array_valores(faceta["valores"]),
+                "posicao": Posicoes.de_dict(faceta["posicao"]),
+                "bitsets": faceta["bitsets"],
+            }
+            for coluna, faceta in self.facetas.items()
+        }
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        for faceta in self.facetas.values():
+            faceta["ordenados"] = faceta["posicao"].chaves
+
+    @classmethod
+    def construir(cls, df, colunas=COLUNAS_FACETAS, coluna_data=COLUNA_DATA):
+        vazio = cls(0, {c: _faceta_vazia() for c in colunas},
+                    np.empty(0, dtype="datetime64[ns]"), np.empty(0, dtype=np.int64), coluna_data)
+        return vazio.estendido(df)
+
+    # Função para criar um novo motor com os registros adicionais (o atual não muda)
+    #
+    # Os códigos seguem a ordem de chegada dos valores, então os códigos antigos
+    # continuam válidos; valores novos só acrescentam códigos no fim. Dos bitsets, só
+    # os bytes das linhas novas (a partir do último byte incompleto) são montados.
+    def estendido(self, df_novos):
+        num_linhas = self.num_linhas + len(df_novos)
+        completos = self.num_linhas // 8
+        facetas = {}
+
+        for coluna, faceta in self.facetas.items():
+            posicao = dict(faceta["posicao"])
+            valores = list(faceta["valores"])
+
+            # Códigos dos novos registros; valores ausentes recebem -1
+            novos, unicos = pd.factorize(df_novos[coluna], sort=False)
+            traducao = np.empty(len(unicos) + 1, dtype=np.int32)
+            traducao[-1] = -1
+            for i, valor in enumerate(unicos):
+                if valor not in posicao:
+                    posicao[valor] = len(valores)
+                    valores.append(valor)
+                traducao[i] = posicao[valor]
+            codigos = np.concatenate([faceta["codigos"], traducao[novos]])
+
+            # Um bitset por valor: linha k da matriz = linhas com código k
+            anteriores = faceta["bitsets"]
+            novos_bits = _bitsets(codigos, len(valores), completos * 8)
+            bitsets = np.zeros((len(valores), completos + novos_bits.shape[1]), dtype=np.uint8)
+            bitsets[:len(anteriores), :completos] = anteriores[:, :completos]
+            bitsets[:, completos:] = novos_bits
+
+            facetas[coluna] = {
+                "codigos": codigos,
+                "valores": valores,
+                "ordenados": sorted(valores),
+                "posicao": posicao,
+                "bitsets": bitsets,
+            }
+
+        # Intercalar as novas datas no array ordenado (o NumPy coloca NaT no fim,
+        # fora de qualquer intervalo válido)
+        datas_novas = df_novos[self.coluna_data].to_numpy(dtype="datetime64[ns]")
+        ordem_novas = np.argsort(datas_novas, kind="stable")
+        datas_novas = datas_novas[ordem_novas]
+        insercao = np.searchsorted(self.datas_ordenadas, datas_novas, side="right")
+
+        return MotorFiltros(
+            num_linhas, facetas,
+            np.insert(self.datas_ordenadas, insercao, datas_novas),
+            np.insert(self.ordem_datas, insercao, ordem_novas + self.num_linhas),
+            self.coluna_data,
+        )
+
+    # Valores disponíveis para uma faceta, já ordenados
+    def opcoes(self, coluna):
+        return self.facetas[coluna]["ordenados"]
+
+    # Menor e maior data válidas do conjunto
+    def intervalo_datas(self):
+        validas = self.datas_ordenadas[~np.isnat(self.datas_ordenadas)]
+        if not len(validas):
+            return None, None
+        return pd.Timestamp(validas[0]).date(), pd.Timestamp(validas[-1]).date()
+
+    def _bitset_vazio(self, valor):
+        return np.full((self.num_linhas + 7) // 8, valor, dtype=np.uint8)
+
+    # Bitset das linhas cuja data está em [inicio, fim] (datas inclusivas)
+    def bitset_datas(self, inicio, fim):
+        inicio = np.datetime64(inicio, "ns")
+        fim = np.datetime64(fim, "D") + _UM_DIA
+        esquerda = np.searchsorted(self.datas_ordenadas, inicio, side="left")
+        direita = np.searchsorted(self.datas_ordenadas, fim.astype("datetime64[ns]"), side="left")
+
+        marcacoes = np.zeros(self.num_linhas, dtype=bool)
+        marcacoes[self.ordem_datas[esquerda:direita]] = True
+        return np.packbits(marcacoes)
+
+    # Função para filtrar: selecoes = {coluna: valor ou None}, intervalo = (inicio, fim) ou None
+    def filtrar(self, selecoes, intervalo=None):
+        resultado = self._bitset_vazio(0xFF)
+
+        for coluna, valor in selecoes.items():
+            if valor is None:
+                continue
+            faceta = self.facetas[coluna]
+            codigo = faceta["posicao"].get(valor)
+            if codigo is None:
+                return np.empty(0, dtype=np.int64)
+            np.bitwise_and(resultado, faceta["bitsets"][codigo], out=resultado)
+
+        if intervalo is not None:
+            np.bitwise_and(resultado, self.bitset_datas(*intervalo), out=resultado)
+
+        return np.flatnonzero(np.unpackbits(resultado, count=self.num_linhas))
@@ -0,0 +1,154 @@
+import os
+
+import plotly.express as px
+
+# Renderizador dos gráficos simples (barras e linha): "plotly" ou "altair" (Vega-Lite,
+# mais leve para montar e enviar). A pizza de repercussão geral é sempre plotly.
+RENDERIZADOR = os.environ.get("INFORMATIVOS_RENDERIZADOR_GRAFICOS", "plotly")
+RENDERIZADORES = ("plotly", "altair")
+
+
+def _contagens(serie, rotulo, limite=None):
+    contagens = serie.reset_index()
+    contagens.columns = [rotulo, "Quantidade"]
+    return contagens.head(limite) if limite else contagens
+
+
+# Especificação Vega-Lite (dict) de um gráfico de barras com os dados embutidos
+def _barras_vega(contagens, categoria, titulo, horizontal, altura=None):
+    import altair as alt
+
+    eixo_categoria = alt.Y(categoria, sort="-x", title=categoria) if horizontal else alt.X(categoria, sort="-y", title=categoria)
+    eixo_valor = alt.X("Quantidade", title="Quantidade") if horizontal else alt.Y("Quantidade", title="Quantidade")
+    grafico = alt.Chart(contagens, title=titulo).mark_bar().encode(
+        eixo_valor, eixo_categoria,
+        color=alt.Color("Quantidade", scale=alt.Scale(scheme="blues"), legend=None),
+        tooltip=[categoria, "Quantidade"],
+    )
+    if altura:
+        grafico = grafico.properties(height=altura)
+    return grafico.to_dict()
+
+
+# Gráfico de distribuição por Ramo do Direito (top 10)
+def grafico_ramos(estatisticas, renderizador=RENDERIZADOR):
+    top_ramos = _contagens(estatisticas["Ramo Direito"], "Ramo do Direito", 10)
+    if renderizador == "altair":
+        return _barras_vega(top_ramos, "Ramo do Direito", "Top 10 Ramos do Direito", horizontal=True, altura=500)
+
+    fig = px.bar(
+        top_ramos,
+        x="Quantidade",
+        y="Ramo do Direito",
+        orientation="h",
+        color="Quantidade",
+        color_continuous_scale="Blues",
+        title="Top 10 Ramos do Direito"
+    )
+    fig.update_layout(height=500)
+    return fig
+
+
+# Gráfico de pizza da repercussão geral
+def grafico_repercussao(estatisticas, renderizador=RENDERIZADOR):
+    repercussao_counts = _contagens(estatisticas["Repercussão Geral"], "Repercussão Geral")
+    fig = px.pie(
+        repercussao_counts,
+        values="Quantidade",
+        names="Repercussão Geral",
+        hole=0.4,
+        color_discrete_sequence=px.colors.sequential.Blues_r
+    )
+    fig.update_layout(height=500)
+    return fig
+
+
+# Gráfico das classes processuais mais frequentes (top 15)
+def grafico_classes(estatisticas, renderizador=RENDERIZADOR):
+    top_classes = _contagens(estatisticas["Classe Processo"], "Classe Processual", 15)
+    if renderizador == "altair":
+        return _barras_vega(top_classes, "Classe Processual", "Top 15 Classes Processuais", horizontal=False)
+
+    return px.bar(
+        top_classes,
+        x="Classe Processual",
+        y="Quantidade",
+        color="Quantidade",
+        color_continuous_scale="Blues",
+        title="Top 15 Classes Processuais"
+    )
+
+
+# Gráfico da evolução anual
+def grafico_anos(estatisticas, renderizador=RENDERIZADOR):
+    ano_counts = _contagens(estatisticas["Ano"], "Ano")
+    if renderizador == "altair":
+        import altair as alt
+
+        return alt.Chart(ano_counts, title="Evolução Anual dos Informativos").mark_line(point=True).encode(
+            x=alt.X("Ano:O", title="Ano", axis=alt.Axis(labelAngle=0)),
+            y=alt.Y("Quantidade", title="Quantidade"),
+            tooltip=["Ano", "Quantidade"],
+        ).to_dict()
+
+    fig = px.line(
+        ano_counts,
+        x="Ano",
+        y="Quantidade",
+        markers=True,
+        line_shape="linear",
+        title="Evolução Anual dos Informativos"
+    )
+    fig.update_layout(xaxis=dict(tickmode="linear", dtick=1))
+    return fig
+
+
+# Gráfico da evolução mensal de um termo (registros com o termo por mês)
+def grafico_serie_termo(serie, termo, renderizador=RENDERIZADOR):
+    contagens = _contagens(serie, "Mês")
+    titulo = f"Evolução de “{termo}”"
+    if renderizador == "altair":
+        import altair as alt
+
+        return alt.Chart(contagens, title=titulo).mark_line(point=True).encode(
+            x=alt.X("Mês:T", title="Mês"),
+            y=alt.Y("Quantidade", title="Registros"),
+            tooltip=[alt.Tooltip("Mês:T", format="%m/%Y"), "Quantidade"],
+        ).to_dict()
+
+    fig = px.line(contagens, x="Mês", y="Quantidade", markers=True, title=titulo)
+    fig.update_layout(yaxis_title="Registros")
+    return fig
+
+
+# Gráfico dos ramos do direito em que um termo aparece (top 10)
+def grafico_termo_ramos(serie, termo, renderizador=RENDERIZADOR):
+    top_ramos = _contagens(serie, "Ramo do Direito", 10)
+    titulo = f"“{termo}” por Ramo do Direito"
+    if renderizador == "altair":
+        return _barras_vega(top_ramos, "Ramo do Direito", titulo, horizontal=True)
+
+    return px.bar(
+        top_ramos,
+        x="Quantidade",
+        y="Ramo do Direito",
+        orientation="h",
+        color="Quantidade",
+        color_continuous_scale="Blues",
+        title=titulo
+    )
+
+
+GRAFICOS = {
+    "ramos": grafico_ramos,
+    "repercussao": grafico_repercussao,
+    "classes": grafico_classes,
+    "anos": grafico_anos,
+}
+
+
+# Função para montar um gráfico: figura plotly ou especificação Vega-Lite (dict)
+def montar_grafico(nome, estatisticas, renderizador=RENDERIZADOR):
+    if renderizador not in RENDERIZADORES:
+        raise ValueError(f"Renderizador desconhecido: {renderizador} (use {', '.join(RENDERIZADORES)})")
+    return GRAFICOS[nome](estatisticas, renderizador)
@@ -0,0 +1,42 @@
+import threading
+
+
+# Registro dos últimos índices construídos, para atualização incremental
+#
+# Cada estrutura derivada (índices, motor de filtros, cubo) é guardada com a
+# linhagem do dataset que a gerou. Se a linhagem nova só acrescenta partições à
+# anterior, as linhas novas estão no fim do DataFrame e basta estender a estrutura;
+# caso contrário (ex.: planilha base substituída) ela é reconstruída do zero.
+# publicados: função opcional (nome, df) -> estrutura já pronta (modo de serviço).
+class RegistroIncremental:
+    def __init__(self, publicados=None):
+        self._ultimos = {}
+        self._trava = threading.Lock()
+        self.publicados = publicados
+
+    def obter(self, nome, df, construir, estender):
+        if self.publicados is not None:
+            publicado = self.publicados(nome, df)
+            if publicado is not None:
+                return publicado
+
+        linhagem = tuple(df.attrs.get("linhagem") or ())
+
+        with self._trava:
+            anterior = self._ultimos.get(nome)
+
+        resultado = None
+        if anterior is not None and linhagem:
+            linhagem_anterior, linhas_anteriores, objeto = anterior
+            if linhagem[:len(linhagem_anterior)] == linhagem_anterior and len(df) >= linhas_anteriores:
+                if len(df) == linhas_anteriores:
+                    resultado = objeto
+                else:
+                    resultado = estender(objeto, df.iloc[linhas_anteriores:])
+
+        if resultado is None:
+            resultado = construir(df)
+
+        with self._trava:
+            self._ultimos[nome] = (linhagem, len(df), resultado)
+        return resultado
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import time
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from dados import (
+    ARQUIVO_ORIGEM,
+    DIRETORIO_PARTICOES,
+    DIRETORIO_SNAPSHOT,
+    adicionar_colunas_derivadas,
+    carregar_informativos,
+    gravar_atomico,
+    gravar_manifesto,
+    ler_manifesto,
+    para_tabela_arrow,
+    travar_manifesto,
+)
+from texto import normalizar
+
+# Colunas esperadas em cada arquivo de entrada (mesmas da planilha original)
+COLUNAS_OBRIGATORIAS = [
+    "Informativo", "Classe Processo", "Data Julgamento", "Título", "Tese Julgado",
+    "Resumo", "Ramo Direito", "Matéria", "Repercussão Geral",
+]
+
+# Registros com a mesma chave são considerados duplicados
+COLUNAS_CHAVE = ["Informativo", "Classe Processo", "Título"]
+
+VALORES_REPERCUSSAO = {"Sim", "Não"}
+
+
+# Função para ler um arquivo de entrada (CSV, JSONL ou XLSX de um informativo)
+def ler_registros(caminho):
+    extensao = os.path.splitext(caminho)[1].lower()
+
+    if extensao == ".csv":
+        return pd.read_csv(caminho, dtype=str)
+    if extensao in (".jsonl", ".ndjson"):
+        return pd.read_json(caminho, lines=True, dtype=False)
+    if extensao in (".xlsx", ".xlsm"):
+        return pd.read_excel(caminho)
+
+    raise ValueError(f"Formato não suportado: {caminho} (use .csv, .jsonl ou .xlsx)")
+
+
+def _texto_ou_nulo(serie):
+    serie = serie.astype(object).where(serie.notna(), None)
+    return serie.map(lambda v: (str(v).strip() or None) if v is not None else None)
+
+
+# Função para validar o esquema e normalizar os tipos de um lote de registros
+def validar_registros(df, origem="entrada"):
+    faltantes = [c for c in COLUNAS_OBRIGATORIAS if c not in df.columns]
+    if faltantes:
+        raise ValueError(f"{origem}: colunas ausentes: {', '.join(faltantes)}")
+
+    df = df[COLUNAS_OBRIGATORIAS].copy()
+    erros = []
+
+    for coluna in COLUNAS_OBRIGATORIAS:
+        if coluna not in ("Informativo", "Data Julgamento"):
+            df[coluna] = _texto_ou_nulo(df[coluna])
+
+    # Número do informativo: inteiro obrigatório
+    informativos = pd.to_numeric(df["Informativo"], errors="coerce")
+    invalidos = informativos.isna() | (informativos % 1 != 0)
+    if invalidos.any():
+        erros.append(f"Informativo inválido nas linhas {_linhas(invalidos)}")
+    df["Informativo"] = informativos.fillna(0).astype("int64")
+
+    # Data no formato dd/mm/aaaa (ou já como data, no caso do XLSX/JSONL)
+    datas = df["Data Julgamento"]
+    if not pd.api.types.is_datetime64_any_dtype(datas):
+        datas = pd.to_datetime(datas.astype("string").str.strip(), format="%d/%m/%Y", errors="coerce")
+    if datas.isna().any():
+        erros.append(f"Data Julgamento inválida (esperado dd/mm/aaaa) nas linhas {_linhas(datas.isna())}")
+    df["Data Julgamento"] = datas
+
+    for coluna in ("Classe Processo", "Título"):
+        if df[coluna].isna().any():
+            erros.append(f"{coluna} vazio nas linhas {_linhas(df[coluna].isna())}")
+
+    fora = ~df["Repercussão Geral"].isin(VALORES_REPERCUSSAO)
+    if fora.any():
+        erros.append(f"Repercussão Geral deve ser 'Sim' ou 'Não' (linhas {_linhas(fora)})")
+
+    if erros:
+        raise ValueError(f"{origem}: " + "; ".join(erros))
+
+    return adicionar_colunas_derivadas(df)
+
+
+def _linhas(mascara, limite=10):
+    # Linhas numeradas como no arquivo (cabeçalho = linha 1)
+    numeros = [str(i + 2) for i in mascara.to_numpy().nonzero()[0][:limite]]
+    return ", ".join(numeros) + (" ..." if mascara.sum() > limite else "")
+
+
+# Função para gerar a chave de deduplicação (Informativo + Classe Processo + Título)
+def chaves_registros(df):
+    return list(zip(
+        df["Informativo"].astype("int64").tolist(),
+        (normalizar(v).strip() for v in df["Classe Processo"].astype(object).tolist()),
+        (" ".join(normalizar(v).split()) for v in df["Título"].astype(object).where(df["Título"].notna(), "").tolist()),
+    ))
+
+
+# Função para ingerir novos arquivos como uma partição Parquet (somente acréscimo)
+#
+# A trava do manifesto cobre da leitura da base até a gravação: a deduplicação vê as
+# partições de uma ingestão simultânea e nenhuma delas some do manifesto.
+def ingerir(caminhos, origem=ARQUIVO_ORIGEM, diretorio=DIRETORIO_SNAPSHOT, particoes=DIRETORIO_PARTICOES):
+    with travar_manifesto(particoes):
+        return _ingerir(caminhos, origem, diretorio, particoes)
+
+
+def _ingerir(caminhos, origem, diretorio, particoes):
+    existente = carregar_informativos(origem, diretorio, particoes)
+    conhecidas = set(chaves_registros(existente))
+
+    lotes = []
+    lidos = 0
+    for caminho in caminhos:
+        df = validar_registros(ler_registros(caminho), origem=caminho)
+        lidos += len(df)
+
+        # Descartar duplicados (contra a base e dentro do próprio lote)
+        manter = []
+        for chave in chaves_registros(df):
+            manter.append(chave not in conhecidas)
+            conhecidas.add(chave)
+        lotes.append(df[manter])
+
+    novos = pd.concat(lotes, ignore_index=True) if lotes else pd.DataFrame(columns=COLUNAS_OBRIGATORIAS)
+    resumo = {"lidos": lidos, "novos": len(novos), "duplicados": lidos - len(novos), "particao": None}
+    if novos.empty:
+        return resumo
+
+    # Gravar a partição e só então acrescentá-la ao manifesto (troca atômica)
+    os.makedirs(particoes, exist_ok=True)
+    tabela = para_tabela_arrow(novos[existente.columns.tolist()])
+    nomes = ler_manifesto(particoes)
+    assinatura = hashlib.sha256(f"{time.time_ns()}|{len(novos)}".encode()).hexdigest()[:8]
+    nome = f"parte-{len(nomes) + 1:05d}-{assinatura}.parquet"
+
+    gravar_atomico(os.path.join(particoes, nome), lambda caminho: pq.write_table(tabela, caminho))
+    gravar_manifesto(nomes + [nome], particoes)
+
+    resumo["particao"] = nome
+    return resumo
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Uso: python ingestao.py arquivo1.csv [arquivo2.jsonl arquivo3.xlsx ...]")
+        sys.exit(1)
+
+    try:
+        resumo = ingerir(sys.argv[1:])
+    except ValueError as e:
+        print(f"Erro de validação: {e}")
+        sys.exit(1)
+
+    print(f"{resumo['lidos']} registros lidos, {resumo['novos']} novos, {resumo['duplicados']} duplicados.")
+    if resumo["particao"]:
+        print(f"Partição gravada: {resumo['particao']}")
@@ -0,0 +1,242 @@
+import bisect
+import collections
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+# Diagnóstico das reruns: tempo (e, opcionalmente, alocações) de cada etapa do script
+#
+# INFORMATIVOS_DIAGNOSTICO_MEMORIA=1 liga o tracemalloc no processo para medir a
+# alocação líquida de cada etapa (deixa tudo mais lento; o valor inclui o que outras
+# sessões alocaram ao mesmo tempo). INFORMATIVOS_LOG_METRICAS=arquivo.jsonl grava uma
+# linha por etapa medida. INFORMATIVOS_PERFILADOR=arquivo.folded liga o perfilador por
+# amostragem em todas as reruns e grava as pilhas no formato do flamegraph.pl.
+MEDIR_MEMORIA = os.environ.get("INFORMATIVOS_DIAGNOSTICO_MEMORIA") == "1"
+ARQUIVO_LOG = os.environ.get("INFORMATIVOS_LOG_METRICAS")
+ARQUIVO_PILHAS = os.environ.get("INFORMATIVOS_PERFILADOR")
+
+# Limites dos baldes do histograma (segundos), no padrão do Prometheus
+LIMITES = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Medições recentes guardadas por etapa (percentis do painel)
+JANELA = 500
+
+# Intervalo entre amostras do perfilador (segundos)
+INTERVALO_AMOSTRAGEM = 0.005
+
+if MEDIR_MEMORIA and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+# Histograma de uma etapa: baldes acumulados desde o início (Prometheus) e uma
+# janela com as últimas medições (percentis do painel)
+class Histograma:
+    def __init__(self, janela=JANELA):
+        self.baldes = [0] * (len(LIMITES) + 1)
+        self.soma = 0.0
+        self.total = 0
+        self.alocacao = 0
+        self.recentes = collections.deque(maxlen=janela)
+
+    def registrar(self, duracao, alocacao=None):
+        self.baldes[bisect.bisect_left(LIMITES, duracao)] += 1
+        self.soma += duracao
+        self.total += 1
+        if alocacao is not None:
+            self.alocacao += alocacao
+        self.recentes.append((duracao, alocacao))
+
+    def resumo(self):
+        duracoes = sorted(duracao for duracao, _ in self.recentes)
+        alocacoes = [alocacao for _, alocacao in self.recentes if alocacao is not None]
+
+        def percentil(p):
+            return duracoes[min(len(duracoes) - 1, int(p * len(duracoes)))] * 1000 if duracoes else None
+
+        return {
+            "execucoes": self.total,
+            "p50_ms": percentil(0.5),
+            "p95_ms": percentil(0.95),
+            "max_ms": duracoes[-1] * 1000 if duracoes else None,
+            "alocacao_media_kb": sum(alocacoes) / len(alocacoes) / 1024 if alocacoes else None,
+        }
+
+
+# Métricas do processo (todas as sessões), por etapa
+class Metricas:
+    def __init__(self, arquivo_log=ARQUIVO_LOG):
+        self._histogramas = {}
+        self._trava = threading.Lock()
+        self._log = open(arquivo_log, "a", encoding="utf-8", buffering=1) if arquivo_log else None
+        self._local = threading.local()
+
+    # Função para medir uma etapa: with metricas.medir("filtros"): ...
+    @contextlib.contextmanager
+    def medir(self, etapa):
+        # Etapas aninhadas ficam com o caminho completo (ex.: "aba_estatisticas/graficos")
+        pilha = self._local.__dict__.setdefault("pilha", [])
+        pilha.append(etapa)
+        nome = "/".join(pilha)
+
+        memoria = tracemalloc.is_tracing()
+        antes = tracemalloc.get_traced_memory()[0] if memoria else None
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracao = time.perf_counter() - inicio
+            alocacao = tracemalloc.get_traced_memory()[0] - antes if memoria and tracemalloc.is_tracing() else None
+            pilha.pop()
+            self.registrar(nome, duracao, alocacao)
+
+    def registrar(self, etapa, duracao, alocacao=None):
+        with self._trava:
+            histograma = self._histogramas.get(etapa)
+            if histograma is None:
+                histograma = self._histogramas[etapa] = Histograma()
+            histograma.registrar(duracao, alocacao)
+            if self._log is not None:
+                self._log.write(json.dumps({
+                    "instante": time.time(), "etapa": etapa,
+                    "duracao_ms": duracao * 1000, "alocacao_bytes": alocacao,
+                }) + "\n")
+
+    def resumo(self):
+        with self._trava:
+            return {etapa: histograma.resumo() for etapa, histograma in sorted(self._histogramas.items())}
+
+    # Função para exportar as métricas no formato texto do Prometheus
+    def prometheus(self, prefixo="informativos"):
+        linhas = [
+            f"# HELP {prefixo}_etapa_segundos Duração das etapas do dashboard e da API",
+            f"# TYPE {prefixo}_etapa_segundos histogram",
+        ]
+        alocacoes = []
+        with self._trava:
+            for etapa, histograma in sorted(self._histogramas.items()):
+                rotulo = etapa.replace("\\", "\\\\").replace('"', '\\"')
+                acumulado = 0
+                for limite, quantidade in zip(LIMITES + ("+Inf",), histograma.baldes):
+                    acumulado += quantidade
+                    linhas.append(f'{prefixo}_etapa_segundos_bucket{{etapa="{rotulo}",le="{limite}"}} {acumulado}')
+                linhas.append(f'{prefixo}_etapa_segundos_sum{{etapa="{rotulo}"}} {histograma.soma}')
+                linhas.append(f'{prefixo}_etapa_segundos_count{{etapa="{rotulo}"}} {histograma.total}')
+                if tracemalloc.is_tracing():
+                    alocacoes.append(f'{prefixo}_etapa_alocacao_bytes_total{{etapa="{rotulo}"}} {histograma.alocacao}')
+
+        if alocacoes:
+            linhas += [
+                f"# HELP {prefixo}_etapa_alocacao_bytes_total Alocação líquida acumulada por etapa (tracemalloc)",
+                f"# TYPE {prefixo}_etapa_alocacao_bytes_total counter",
+                *alocacoes,
+            ]
+        return "\n".join(linhas) + "\n"
+
+    # Função para exportar as medições recentes em JSONL (uma linha por medição)
+    def jsonl(self):
+        with self._trava:
+            return "".join(
+                json.dumps({"etapa": etapa, "duracao_ms": duracao * 1000, "alocacao_bytes": alocacao}) + "\n"
+                for etapa, histograma in sorted(self._histogramas.items())
+                for duracao, alocacao in histograma.recentes
+            )
+
+    def limpar(self):
+        with self._trava:
+            self._histogramas.clear()
+
+
+# Perfilador por amostragem: a cada intervalo lê a pilha das threads acompanhadas
+# (sys._current_frames) e conta as pilhas no formato "colapsado" (raiz;...;folha N),
+# que o flamegraph.pl, o speedscope e o inferno leem diretamente
+class PerfiladorAmostragem:
+    def __init__(self, intervalo=INTERVALO_AMOSTRAGEM):
+        self.intervalo = intervalo
+        self.pilhas = collections.Counter()
+        self.amostras = 0
+        self._alvos = collections.Counter()
+        self._trava = threading.Lock()
+        # Avisada quando surge um alvo: sem alvos a thread dorme sem acordar a cada intervalo
+        self._com_alvos = threading.Condition(self._trava)
+        self._thread = None
+
+    @staticmethod
+    def _pilha(quadro):
+        nomes = []
+        while quadro is not None:
+            codigo = quadro.f_code
+            nomes.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+            quadro = quadro.f_back
+        return ";".join(reversed(nomes))
+
+    def _amostrar(self):
+        while True:
+            with self._com_alvos:
+                self._com_alvos.wait_for(lambda: self._alvos)
+            time.sleep(self.intervalo)
+            with self._trava:
+                alvos = list(self._alvos)
+            quadros = sys._current_frames()
+            pilhas = [self._pilha(quadros[alvo]) for alvo in alvos if alvo in quadros]
+            with self._trava:
+                self.pilhas.update(pilhas)
+                self.amostras += len(pilhas)
+
+    # Função para amostrar a thread atual enquanto o bloco roda
+    @contextlib.contextmanager
+    def acompanhar(self):
+        alvo = threading.get_ident()
+        with self._trava:
+            self._alvos[alvo] += 1
+            self._com_alvos.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._amostrar, name="perfilador", daemon=True)
+                self._thread.start()
+        try:
+            yield
+        finally:
+            with self._trava:
+                self._alvos[alvo] -= 1
+                if self._alvos[alvo] <= 0:
+                    del self._alvos[alvo]
+
+    def colapsadas(self):
+        with self._trava:
+            return "".join(f"{pilha} {quantidade}\n" for pilha, quantidade in self.pilhas.most_common())
+
+    def gravar(self, caminho):
+        from dados import gravar_atomico
+
+        conteudo = self.colapsadas()
+
+        def escrever(destino):
+            with open(destino, "w", encoding="utf-8") as arquivo:
+                arquivo.write(conteudo)
+
+        gravar_atomico(caminho, escrever)
+
+    def limpar(self):
+        with self._trava:
+            self.pilhas.clear()
+            self.amostras = 0
+
+
+_metricas = Metricas()
+_perfilador = PerfiladorAmostragem()
+
+
+def metricas():
+    return _metricas
+
+
+def perfilador():
+    return _perfilador
+
+
+# Função para medir uma etapa nas métricas do processo
+def medir(etapa):
+    return _metricas.medir(etapa)
@@ -0,0 +1,114 @@
+import zipfile
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+
+# Namespace principal do SpreadsheetML
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+PLANILHA_PADRAO = "xl/worksheets/sheet1.xml"
+
+# Linhas por lote entregue pelo leitor
+LINHAS_POR_LOTE = 5000
+
+
+# Função para converter a referência da coluna ("A", "AB", ...) em índice (0, 27, ...)
+def _indice_coluna(referencia):
+    indice = 0
+    for caractere in referencia:
+        if caractere.isdigit():
+            break
+        indice = indice * 26 + (ord(caractere) - 64)
+    return indice - 1
+
+
+def _texto_rico(elemento):
+    # Texto de <is> ou <si>: junta todos os <t> (inclusive os de trechos formatados)
+    return "".join(t.text or "" for t in elemento.iter(f"{_NS}t"))
+
+
+# Função para ler a tabela de strings compartilhadas (quando o arquivo usa t="s")
+def _ler_strings_compartilhadas(arquivo_zip):
+    try:
+        fonte = arquivo_zip.open("xl/sharedStrings.xml")
+    except KeyError:
+        return []
+
+    strings = []
+    with fonte:
+        for _, elemento in ET.iterparse(fonte, events=("end",)):
+            if elemento.tag == f"{_NS}si":
+                strings.append(_texto_rico(elemento))
+                elemento.clear()
+    return strings
+
+
+def _valor_celula(celula, strings):
+    tipo = celula.get("t", "n")
+
+    if tipo == "inlineStr":
+        rico = celula.find(f"{_NS}is")
+        return _texto_rico(rico) if rico is not None else None
+
+    valor = celula.findtext(f"{_NS}v")
+    if valor is None:
+        return None
+    if tipo == "s":
+        return strings[int(valor)]
+    if tipo in ("str", "e"):
+        return valor
+    if tipo == "b":
+        return valor == "1"
+
+    numero = float(valor)
+    return int(numero) if numero.is_integer() else numero
+
+
+# Função para ler a planilha em lotes de linhas, com memória limitada
+#
+# Usa iterparse sobre o XML da planilha: cada <row> é convertida e descartada logo
+# em seguida, então o pico de memória depende do tamanho do lote (e da tabela de
+# strings compartilhadas, se houver), não do tamanho do arquivo.
+def ler_lotes(caminho, planilha=PLANILHA_PADRAO, linhas_por_lote=LINHAS_POR_LOTE):
+    with zipfile.ZipFile(caminho) as arquivo_zip:
+        strings = _ler_strings_compartilhadas(arquivo_zip)
+
+        with arquivo_zip.open(planilha) as fonte:
+            cabecalho = None
+            linhas = []
+            dados_planilha = None
+
+            for evento, elemento in ET.iterparse(fonte, events=("start", "end")):
+                if evento == "start":
+                    if elemento.tag == f"{_NS}sheetData":
+                        dados_planilha = elemento
+                    continue
+                if elemento.tag != f"{_NS}row":
+                    continue
+
+                # Sem o atributo r (opcional no formato), a célula fica na coluna seguinte à anterior
+                valores = {}
+                coluna = 0
+                for celula in elemento.iter(f"{_NS}c"):
+                    referencia = celula.get("r")
+                    if referencia:
+                        coluna = _indice_coluna(referencia)
+                    valores[coluna] = _valor_celula(celula, strings)
+                    coluna += 1
+
+                # Descartar a linha já lida (inclusive a referência no elemento pai)
+                elemento.clear()
+                if dados_planilha is not None:
+                    dados_planilha.remove(elemento)
+
+                if cabecalho is None:
+                    cabecalho = [valores.get(i) for i in range(max(valores) + 1)] if valores else []
+                    continue
+
+                linhas.append([valores.get(i) for i in range(len(cabecalho))])
+                if len(linhas) >= linhas_por_lote:
+                    yield pd.DataFrame(linhas, columns=cabecalho)
+                    linhas = []
+
+            if linhas:
+                yield pd.DataFrame(linhas, columns=cabecalho)
@@ -0,0 +1,329 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from agregacoes import CuboAgregacoes
+from assertivas import GeradorAssertivas
+from dados import assinatura_fontes, carregar_informativos, versao_dataset
+from duplicatas import IndiceDuplicatas
+from estudo import FilaNovos, chaves_registros, novo_lote, ordem_novos
+from filtros import MotorFiltros
+from incremental import RegistroIncremental
+from pesquisa import IndicePesquisa, mascara_literal
+from recuperacao import IndiceBM25
+from relacionados import carregar_ou_construir_grafo
+from respostas import CacheRespostas
+from semantica import BuscaHibrida, carregar_ou_construir
+from servico import MODO_SERVICO, assinatura_publicacao, carregar_publicado, indice_publicado, versao_publicada
+from tendencias import MatrizTendencias
+
+# Modos de busca das respostas
+MODOS_BUSCA = ("hibrida", "semantica", "palavras")
+
+# Candidatos pedidos ao índice por registro de resposta (sobra para descartar duplicatas)
+CANDIDATOS_POR_REGISTRO = 3
+
+# Usuários com a ordem de registros novos guardada por núcleo (uma referência por registro elegível)
+FILAS_MANTIDAS = 256
+
+MENSAGEM_SEM_RESULTADOS = (
+    "Não encontrei informações específicas sobre essa pergunta nos informativos do STF entre 2021 e 2025."
+)
+
+# Cache de respostas do processo (compartilhado pelo app e pela API)
+_cache_respostas = CacheRespostas()
+
+
+def cache_respostas():
+    return _cache_respostas
+
+
+def _data(valor):
+    return valor.strftime("%d/%m/%Y") if pd.notna(valor) else "data não especificada"
+
+
+# Função para criar um contexto baseado nos registros relevantes
+def criar_contexto(registros_relevantes):
+    if not registros_relevantes:
+        return ""
+
+    contexto = "Contexto dos informativos do STF:\n\n"
+
+    for registro in registros_relevantes:
+        titulo = registro["Título"] if pd.notna(registro["Título"]) else "Título não disponível"
+        contexto += f"Informativo {registro['Informativo']} ({_data(registro['Data Julgamento'])}): {titulo}\n"
+
+        if pd.notna(registro["Resumo"]):
+            contexto += f"Resumo: {registro['Resumo']}\n"
+
+        if pd.notna(registro["Tese Julgado"]):
+            contexto += f"Tese: {registro['Tese Julgado']}\n"
+
+        contexto += "\n"
+
+    return contexto
+
+
+# Função para produzir a resposta em trechos (cabeçalho e um trecho por informativo)
+def trechos_resposta(registros_relevantes):
+    if not registros_relevantes:
+        yield MENSAGEM_SEM_RESULTADOS
+        return
+
+    yield "Com base nos informativos do STF, posso informar que:\n\n"
+
+    for i, registro in enumerate(registros_relevantes):
+        titulo = registro["Título"] if pd.notna(registro["Título"]) else "Título não disponível"
+        trecho = f"**Informativo {registro['Informativo']} ({_data(registro['Data Julgamento'])})**: {titulo}\n\n"
+
+        if pd.notna(registro["Resumo"]):
+            trecho += f"{registro['Resumo']}\n\n"
+        elif pd.notna(registro["Tese Julgado"]):
+            trecho += f"**Tese**: {registro['Tese Julgado']}\n\n"
+
+        if i < len(registros_relevantes) - 1:
+            trecho += "---\n\n"
+
+        yield trecho
+
+
+# Função para converter linhas do DataFrame em dicionários prontos para JSON
+def registros_json(df):
+    saida = df.copy()
+    for coluna in saida.columns:
+        if pd.api.types.is_datetime64_any_dtype(saida[coluna]):
+            saida[coluna] = saida[coluna].dt.strftime("%Y-%m-%d")
+    saida = saida.astype(object)
+    return saida.where(saida.notna(), None).to_dict("records")
+
+
+# Núcleo de consultas sobre uma versão do dataset, sem dependência da interface
+#
+# Reúne as estruturas derivadas (filtros, cubo, índices de pesquisa e de resposta,
+# gerador de assertivas), construídas sob demanda uma vez por versão, e as consultas
+# que o dashboard e a API fazem sobre elas. As estruturas vêm do RegistroIncremental
+# (extensão incremental e, no modo de serviço, os índices publicados).
+class Nucleo:
+    def __init__(self, df, registro=None):
+        self.df = df
+        self.versao = versao_dataset(df)
+        self.registro = registro if registro is not None else RegistroIncremental(
+            publicados=indice_publicado if MODO_SERVICO else None
+        )
+        self._estruturas = {}
+        self._filas = OrderedDict()
+        self._trava = threading.RLock()
+
+    def _obter(self, nome, construir, estender):
+        # Uma construção por estrutura, mesmo com várias requisições simultâneas
+        with self._trava:
+            if nome not in self._estruturas:
+                self._estruturas[nome] = self.registro.obter(nome, self.df, construir, estender)
+            return self._estruturas[nome]
+
+    @property
+    def filtros(self):
+        return self._obter("filtros", MotorFiltros.construir, lambda motor, novos: motor.estendido(novos))
+
+    @property
+    def cubo(self):
+        motor = self.filtros
+        return self._obter(
+            "cubo", lambda df: CuboAgregacoes.construir(motor), lambda cubo, novos: cubo.estendido(motor)
+        )
+
+    @property
+    def bm25(self):
+        return self._obter("bm25", IndiceBM25.construir, lambda indice, novos: indice.estendido(novos))
+
+    @property
+    def pesquisa(self):
+        return self._obter("pesquisa", IndicePesquisa.construir, lambda indice, novos: indice.estendido(novos))
+
+    @property
+    def assertivas(self):
+        return self._obter(
+            "assertivas", GeradorAssertivas.construir, lambda gerador, novos: gerador.estendido(novos)
+        )
+
+    # Grupos de quase-duplicatas (mesmo julgamento em vários informativos)
+    @property
+    def duplicatas(self):
+        return self._obter(
+            "duplicatas", IndiceDuplicatas.construir, lambda indice, novos: indice.estendido(novos)
+        )
+
+    # Grafo dos informativos relacionados (k vizinhos por TF-IDF, gravado junto do snapshot)
+    @property
+    def relacionados(self):
+        return self._obter(
+            "relacionados", lambda df: carregar_ou_construir_grafo(df, self.versao),
+            lambda grafo, novos: grafo.estendido(novos),
+        )
+
+    # Matriz termo × mês (por ramo) das tendências de temas
+    @property
+    def tendencias(self):
+        return self._obter(
+            "tendencias", MatrizTendencias.construir, lambda matriz, novos: matriz.estendido(novos)
+        )
+
+    # Chave estável de cada registro (repetição espaçada)
+    @property
+    def chaves(self):
+        return self._obter(
+            "chaves", chaves_registros, lambda chaves, novos: np.concatenate([chaves, chaves_registros(novos)])
+        )
+
+    @property
+    def posicao_por_chave(self):
+        chaves = self.chaves
+        elegiveis = self.assertivas.trechos["posicoes"]
+        with self._trava:
+            if "posicao_por_chave" not in self._estruturas:
+                self._estruturas["posicao_por_chave"] = dict(zip(chaves[elegiveis], elegiveis.tolist()))
+            return self._estruturas["posicao_por_chave"]
+
+    @property
+    def semantica(self):
+        return self._obter(
+            "semantica", lambda df: carregar_ou_construir(df, self.versao), lambda indice, novos: indice.estendido(novos)
+        )
+
+    # Função para filtrar: facetas (AND), intervalo de datas e termo de pesquisa
+    def filtrar(self, selecoes=None, intervalo=None, termo=None, busca_literal=False):
+        linhas = self.filtros.filtrar(selecoes or {}, intervalo)
+
+        # Termo de pesquisa: índice de trigramas ou, no modo literal, str.contains
+        if termo:
+            if busca_literal:
+                linhas = linhas[mascara_literal(self.df.iloc[linhas], termo)]
+            else:
+                linhas = self.pesquisa.buscar(termo, linhas)
+        return linhas
+
+    # Função para obter as estatísticas (contagens por faceta, mês e ano) de um filtro
+    def estatisticas(self, selecoes=None, intervalo=None, termo=None, busca_literal=False, linhas=None):
+        selecoes = selecoes or {}
+        if termo and linhas is None:
+            linhas = self.filtrar(selecoes, intervalo, termo, busca_literal)
+        return self.cubo.estatisticas(
+            selecoes, intervalo,
+            linhas=linhas if termo else None,
+            termo=(termo, busca_literal) if termo else None,
+        )
+
+    # Função para obter o índice usado nas respostas, conforme o modo de busca
+    def indice_respostas(self, modo="palavras"):
+        if modo == "palavras":
+            return self.bm25
+        if modo == "semantica":
+            return self.semantica
+        if modo == "hibrida":
+            return BuscaHibrida(self.bm25, self.semantica)
+        raise ValueError(f"Modo de busca desconhecido: {modo} (use {', '.join(MODOS_BUSCA)})")
+
+    # Função para buscar as posições (iloc) mais relevantes para uma consulta
+    #
+    # Quase-duplicatas contam uma vez só: fica o registro mais relevante de cada grupo.
+    def buscar(self, consulta, max_registros=3, modo="palavras", indice=None):
+        indice = indice if indice is not None else self.indice_respostas(modo)
+        posicoes = indice.buscar(consulta, max_registros * CANDIDATOS_POR_REGISTRO)
+        return self.duplicatas.unicos(posicoes)[:max_registros].tolist()
+
+    # Função para encontrar registros relevantes para a pergunta
+    def registros_relevantes(self, pergunta, max_registros=3, modo="palavras", indice=None):
+        return [self.df.iloc[posicao] for posicao in self.buscar(pergunta, max_registros, modo, indice)]
+
+    def trechos_resposta(self, pergunta, modo="palavras", indice=None):
+        return trechos_resposta(self.registros_relevantes(pergunta, modo=modo, indice=indice))
+
+    # Função para responder uma pergunta (com cache por pergunta normalizada)
+    def responder(self, pergunta, modo="palavras"):
+        return cache_respostas().obter(
+            f"resposta-{modo}", self.versao, pergunta, lambda: "".join(self.trechos_resposta(pergunta, modo))
+        )
+
+    # Função para obter o contexto de uma pergunta (com cache por pergunta normalizada)
+    def contexto(self, pergunta, modo="palavras", indice=None):
+        return cache_respostas().obter(
+            f"contexto-{modo}", self.versao, pergunta,
+            lambda: criar_contexto(self.registros_relevantes(pergunta, modo=modo, indice=indice)),
+        )
+
+    # Função para obter os informativos relacionados a um registro: (posições, similaridades)
+    #
+    # As duplicatas do próprio registro ficam de fora e cada grupo de duplicatas aparece uma vez.
+    def informativos_relacionados(self, posicao, max_registros=10):
+        vizinhos, similaridades = self.relacionados.relacionados(posicao)
+        grupos = self.duplicatas.grupos
+        outros = grupos[vizinhos] != grupos[posicao]
+        vizinhos, similaridades = vizinhos[outros], similaridades[outros]
+        _, primeiros = np.unique(grupos[vizinhos], return_index=True)
+        manter = np.sort(primeiros)[:max_registros]
+        return vizinhos[manter], similaridades[manter]
+
+    # Função para gerar assertivas de verdadeiro ou falso (reprodutíveis pela semente)
+    def gerar_assertivas(self, quantidade=5, semente=None, linhas=None):
+        return self.assertivas.gerar(quantidade, semente, linhas)
+
+    # Função para obter a fila de registros novos do usuário (ordenada uma vez por versão)
+    def fila_novos(self, usuario):
+        with self._trava:
+            if usuario in self._filas:
+                self._filas.move_to_end(usuario)
+                return self._filas[usuario]
+
+        elegiveis = self.assertivas.trechos["posicoes"]
+        fila = FilaNovos(ordem_novos(usuario, self.chaves[elegiveis]))
+        with self._trava:
+            fila = self._filas.setdefault(usuario, fila)
+            while len(self._filas) > FILAS_MANTIDAS:
+                self._filas.popitem(last=False)
+        return fila
+
+    # Função para montar o próximo lote de estudo do usuário (vencidos pelo SM-2, depois novos)
+    def lote_estudo(self, repositorio, usuario, quantidade=5, semente=None):
+        return novo_lote(
+            repositorio, usuario, self.chaves, self.posicao_por_chave, self.fila_novos(usuario),
+            self.gerar_assertivas, quantidade, semente,
+        )
+
+
+# Núcleo atual do processo, recarregado quando as fontes de dados mudam
+#
+# Usado por quem roda fora do Streamlit (API): a assinatura das fontes é conferida
+# no máximo uma vez por intervalo, e uma versão nova reaproveita o mesmo registro
+# (índices estendidos quando só chegaram partições novas).
+class FonteNucleo:
+    def __init__(self, intervalo=1.0):
+        self.intervalo = intervalo
+        self.registro = RegistroIncremental(publicados=indice_publicado if MODO_SERVICO else None)
+        self._nucleo = None
+        self._assinatura = None
+        self._verificado = 0.0
+        self._trava = threading.Lock()
+
+    def _assinatura_atual(self):
+        return assinatura_publicacao() if MODO_SERVICO else assinatura_fontes()
+
+    def _carregar(self):
+        if MODO_SERVICO and versao_publicada() is not None:
+            return carregar_publicado()
+        return carregar_informativos()
+
+    def atual(self):
+        agora = time.monotonic()
+        if self._nucleo is not None and agora - self._verificado < self.intervalo:
+            return self._nucleo
+
+        with self._trava:
+            assinatura = self._assinatura_atual()
+            if self._nucleo is None or assinatura != self._assinatura:
+                self._nucleo = Nucleo(self._carregar(), self.registro)
+                self._assinatura = assinatura
+            self._verificado = agora
+            return self._nucleo
@@ -0,0 +1,119 @@
+import html
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+ITENS_POR_PAGINA = 5
+
+# Pool compartilhado para pré-montar a próxima página em segundo plano
+_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="paginacao")
+
+
+def _texto(valor, padrao):
+    return html.escape(str(valor)) if pd.notna(valor) else padrao
+
+
+# Função para montar o HTML de um card de leitura
+def html_card(registro):
+    data = registro["Data Julgamento"]
+    data = data.strftime("%d/%m/%Y") if pd.notna(data) else "Data não disponível"
+
+    partes = [
+        '<div class="reading-card">',
+        f"<h3>{_texto(registro['Título'], 'Sem título')}</h3>",
+        '<div class="reading-card-meta">',
+        f"<strong>Informativo:</strong> {_texto(registro['Informativo'], '')} | ",
+        f"<strong>Data:</strong> {data} | ",
+        f"<strong>Classe:</strong> {_texto(registro['Classe Processo'], '')} | ",
+        f"<strong>Ramo:</strong> {_texto(registro['Ramo Direito'], 'Não especificado')}",
+        "</div>",
+        '<div class="reading-card-content">',
+    ]
+
+    # Tese julgada e resumo, quando existirem
+    for coluna, rotulo in (("Tese Julgado", "Tese Julgada"), ("Resumo", "Resumo")):
+        if pd.notna(registro[coluna]):
+            texto = html.escape(str(registro[coluna])).replace("\n", "<br>")
+            partes.append(f"<p><strong>{rotulo}:</strong><br>{texto}</p>")
+
+    partes.append("</div></div>")
+    # Sem indentação: linhas com 4 espaços virariam bloco de código no markdown
+    return "\n".join(partes)
+
+
+# Paginador dos cards de leitura
+#
+# A ordem "mais recente primeiro" é calculada uma vez por versão dos dados; para
+# um filtro basta reordenar as posições filtradas pelo rank global. O HTML de cada
+# página fica em um LRU compartilhado e a página seguinte é montada em segundo plano.
+class PaginadorCards:
+    def __init__(self, df, itens_por_pagina=ITENS_POR_PAGINA, max_paginas=512, max_ordens=64):
+        self.df = df
+        self.itens_por_pagina = itens_por_pagina
+        self.max_paginas = max_paginas
+        self.max_ordens = max_ordens
+
+        # Ordem global por data decrescente (NaT no fim) e o rank de cada linha nela
+        datas = df["Data Julgamento"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        chave = np.where(df["Data Julgamento"].isna().to_numpy(), np.iinfo(np.int64).max, -datas)
+        self.ordem = np.argsort(chave, kind="stable")
+        self.rank = np.empty_like(self.ordem)
+        self.rank[self.ordem] = np.arange(len(self.ordem))
+
+        self._ordens = OrderedDict()
+        self._paginas = OrderedDict()
+        self._trava = threading.Lock()
+
+    def _lembrar(self, cache, chave, valor, limite):
+        with self._trava:
+            cache[chave] = valor
+            cache.move_to_end(chave)
+            if len(cache) > limite:
+                cache.popitem(last=False)
+
+    def _recuperar(self, cache, chave):
+        with self._trava:
+            valor = cache.get(chave)
+            if valor is not None:
+                cache.move_to_end(chave)
+            return valor
+
+    # Posições filtradas na ordem de exibição (memoizadas pela assinatura do filtro)
+    def ordenar(self, linhas, assinatura):
+        ordenadas = self._recuperar(self._ordens, assinatura)
+        if ordenadas is None:
+            linhas = np.asarray(linhas)
+            ordenadas = linhas[np.argsort(self.rank[linhas], kind="stable")]
+            self._lembrar(self._ordens, assinatura, ordenadas, self.max_ordens)
+        return ordenadas
+
+    def num_paginas(self, total):
+        return max(1, (total + self.itens_por_pagina - 1) // self.itens_por_pagina)
+
+    def _montar(self, ordenadas, pagina):
+        inicio = pagina * self.itens_por_pagina
+        posicoes = ordenadas[inicio:inicio + self.itens_por_pagina]
+        registros = self.df.iloc[posicoes]
+        return "\n".join(html_card(registro) for _, registro in registros.iterrows())
+
+    # HTML de uma página (um único bloco); agenda a montagem da página seguinte
+    def pagina_html(self, linhas, assinatura, pagina):
+        ordenadas = self.ordenar(linhas, assinatura)
+        chave = (assinatura, pagina)
+
+        conteudo = self._recuperar(self._paginas, chave)
+        if conteudo is None:
+            conteudo = self._montar(ordenadas, pagina)
+            self._lembrar(self._paginas, chave, conteudo, self.max_paginas)
+
+        proxima = pagina + 1
+        if proxima < self.num_paginas(len(ordenadas)) and self._recuperar(self._paginas, (assinatura, proxima)) is None:
+            _EXECUTOR.submit(self._pre_montar, ordenadas, assinatura, proxima)
+
+        return conteudo
+
+    def _pre_montar(self, ordenadas, assinatura, pagina):
+        self._lembrar(self._paginas, (assinatura, pagina), self._montar(ordenadas, pagina), self.max_paginas)
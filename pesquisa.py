@@ -0,0 +1,135 @@
+import re
+
+import numpy as np
+
+from colunar import Listas, Textos
+from texto import tokenizar
+
+# Campos consultados pela caixa "Pesquisar termo"
+CAMPOS_PESQUISA = ["Título", "Resumo", "Matéria", "Tese Julgado"]
+
+# Trechos entre aspas são tratados como frase exata
+_PADRAO_FRASE = re.compile(r'"([^"]*)"')
+
+_VAZIO = np.empty(0, dtype=np.int64)
+
+
+# Função para separar a consulta em frases (entre aspas) e palavras soltas
+def interpretar_consulta(consulta):
+    frases = [f for f in (" ".join(tokenizar(t)) for t in _PADRAO_FRASE.findall(consulta)) if f]
+    palavras = []
+    for trecho in _PADRAO_FRASE.sub(" ", consulta).split():
+        tokens = tokenizar(trecho)
+        # "ICMS-comunicação" vira a frase "icms comunicacao"
+        if len(tokens) > 1:
+            frases.append(" ".join(tokens))
+        elif tokens:
+            palavras.append(tokens[0])
+    return frases, palavras
+
+
+def _trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+# Índice de texto completo com trigramas
+#
+# Cada registro vira um texto normalizado (sem acentos, minúsculo, um campo por
+# linha, cercado por espaços). Os trigramas desse texto apontam para os registros que os contêm: uma
+# palavra ou frase só é verificada nos registros que têm todos os seus trigramas.
+class IndicePesquisa:
+    def __init__(self, textos, postagens, campos=CAMPOS_PESQUISA):
+        self.textos = textos
+        self.postagens = postagens
+        self.campos = list(campos)
+
+    # Serialização (modo de serviço): textos e postagens viram arrays (ver colunar.py)
+    def __getstate__(self):
+        return {
+            "textos": Textos.de_lista(self.textos),
+            "postagens": Listas.de_dict(self.postagens),
+            "campos": self.campos,
+        }
+
+    @classmethod
+    def construir(cls, df, campos=CAMPOS_PESQUISA):
+        return cls([], {}, campos).estendido(df)
+
+    # Função para criar um novo índice com os registros adicionais (o atual não muda)
+    def estendido(self, df_novos):
+        colunas = [df_novos[c].astype(object).where(df_novos[c].notna(), None).tolist() for c in self.campos]
+        novos = [
+            "\n".join(f" {' '.join(tokenizar(valor))} " for valor in valores if valor)
+            for valores in zip(*colunas)
+        ]
+
+        acrescimos = {}
+        for doc, texto in enumerate(novos, start=len(self.textos)):
+            for trigrama in _trigramas(texto):
+                acrescimos.setdefault(trigrama, []).append(doc)
+
+        # Só as listas dos trigramas tocados são recriadas; as demais são compartilhadas
+        postagens = dict(self.postagens)
+        for trigrama, docs in acrescimos.items():
+            docs = np.array(docs, dtype=np.int64)
+            atual = postagens.get(trigrama)
+            postagens[trigrama] = docs if atual is None else np.concatenate([atual, docs])
+
+        return IndicePesquisa(self.textos + novos, postagens, self.campos)
+
+    # Candidatos que contêm todos os trigramas do trecho (None = sem restrição)
+    def _candidatos(self, trecho, candidatos):
+        trigramas = _trigramas(trecho)
+        if not trigramas:
+            return candidatos
+
+        listas = []
+        for trigrama in trigramas:
+            lista = self.postagens.get(trigrama)
+            if lista is None:
+                return _VAZIO
+            listas.append(lista)
+
+        # Intersectar a partir das listas menores
+        listas.sort(key=len)
+        if candidatos is not None:
+            listas.insert(0, candidatos)
+        resultado = listas[0]
+        for lista in listas[1:]:
+            resultado = np.intersect1d(resultado, lista, assume_unique=True)
+            if not len(resultado):
+                break
+        return resultado
+
+    # Função para buscar registros (posições iloc); linhas restringe a busca a um subconjunto
+    def buscar(self, consulta, linhas=None):
+        frases, palavras = interpretar_consulta(consulta)
+        if not frases and not palavras:
+            return np.arange(len(self.textos)) if linhas is None else linhas
+
+        candidatos = None if linhas is None else np.asarray(linhas, dtype=np.int64)
+
+        # Frases exigem palavras inteiras nas pontas; palavras soltas casam em parte da palavra
+        trechos = [(f" {frase} ", frase) for frase in frases] + [(p, p) for p in palavras]
+        trechos.sort(key=lambda t: -len(t[1]))
+
+        for verificacao, trecho in trechos:
+            candidatos = self._candidatos(trecho, candidatos)
+            if candidatos is None:
+                candidatos = np.arange(len(self.textos))
+            candidatos = np.fromiter(
+                (d for d in candidatos.tolist() if verificacao in self.textos[d]),
+                dtype=np.int64,
+            )
+            if not len(candidatos):
+                break
+
+        return candidatos
+
+
+# Função para a busca literal antiga (str.contains), mantida como modo alternativo
+def mascara_literal(df, termo, campos=CAMPOS_PESQUISA):
+    mascara = np.zeros(len(df), dtype=bool)
+    for campo in campos:
+        mascara |= df[campo].fillna("").str.contains(termo, case=False, regex=False).to_numpy(dtype=bool)
+    return mascara
@@ -0,0 +1,154 @@
+import heapq
+from collections import Counter
+
+import numpy as np
+
+from colunar import Posicoes
+from texto import termos_consulta, tokenizar
+
+# Pesos por campo (mesmo esquema da busca original: título vale mais que o resumo)
+PESOS_CAMPOS = {"Título": 3.0, "Resumo": 2.0, "Matéria": 1.0, "Ramo Direito": 1.0}
+
+
+# Função para montar um segmento do índice a partir de um bloco de registros
+#
+# Cada campo do segmento é guardado em formato CSR: as postagens do termo t ficam
+# em docs[indptr[t]:indptr[t + 1]] (posições globais) com a frequência em tf[...].
+def _montar_segmento(df, inicio, vocabulario, campos):
+    segmento = {}
+    estatisticas = {}
+
+    for campo in campos:
+        textos = df[campo].astype(object).where(df[campo].notna(), None).tolist()
+        contagens = [Counter(tokenizar(t)) if t else Counter() for t in textos]
+
+        # Postagens em formato COO (termo, documento, frequência)
+        termos, docs, frequencias = [], [], []
+        for doc, contagem in enumerate(contagens):
+            for termo, tf in contagem.items():
+                termos.append(vocabulario.setdefault(termo, len(vocabulario)))
+                docs.append(inicio + doc)
+                frequencias.append(tf)
+        termos = np.array(termos, dtype=np.int64)
+
+        # Ordenar por termo (estável, mantendo a ordem dos documentos)
+        ordem = np.argsort(termos, kind="stable")
+        frequencia_docs = np.bincount(termos, minlength=len(vocabulario))
+        indptr = np.zeros(len(frequencia_docs) + 1, dtype=np.int64)
+        np.cumsum(frequencia_docs, out=indptr[1:])
+
+        segmento[campo] = {
+            "indptr": indptr,
+            "docs": np.array(docs, dtype=np.int32)[ordem],
+            "tf": np.array(frequencias, dtype=np.float32)[ordem],
+        }
+        estatisticas[campo] = {
+            "frequencia_docs": frequencia_docs,
+            "comprimentos": np.array([sum(c.values()) for c in contagens], dtype=np.float32),
+        }
+
+    return segmento, estatisticas
+
+
+def _ajustar(array, tamanho):
+    if len(array) >= tamanho:
+        return array
+    return np.concatenate([array, np.zeros(tamanho - len(array), dtype=array.dtype)])
+
+
+# Índice invertido com pontuação BM25 ponderada por campo
+#
+# O índice é uma lista de segmentos imutáveis (um por carga ou ingestão) mais as
+# estatísticas globais (frequência de documentos por termo e comprimento de cada
+# campo). Novos registros viram um novo segmento, sem reconstruir os anteriores;
+# o BM25 é calculado na consulta, só sobre as postagens dos termos pedidos.
+class IndiceBM25:
+    def __init__(self, vocabulario, segmentos, estatisticas, num_docs,
+                 pesos_campos=PESOS_CAMPOS, k1=1.2, b=0.75):
+        self.vocabulario = vocabulario
+        self.segmentos = segmentos
+        self.estatisticas = estatisticas
+        self.num_docs = num_docs
+        self.pesos_campos = pesos_campos
+        self.k1 = k1
+        self.b = b
+
+    # Serialização (modo de serviço): o vocabulário vira arrays ordenados
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        estado["vocabulario"] = Posicoes.de_dict(self.vocabulario)
+        return estado
+
+    @classmethod
+    def construir(cls, df, pesos_campos=PESOS_CAMPOS, k1=1.2, b=0.75):
+        estatisticas = {
+            campo: {"frequencia_docs": np.zeros(0, dtype=np.int64), "comprimentos": np.zeros(0, dtype=np.float32)}
+            for campo in pesos_campos
+        }
+        vazio = cls({}, [], estatisticas, 0, pesos_campos, k1, b)
+        return vazio.estendido(df)
+
+    # Função para criar um novo índice com os registros adicionais (o atual não muda)
+    def estendido(self, df_novos):
+        vocabulario = dict(self.vocabulario)
+        segmento, novas = _montar_segmento(df_novos, self.num_docs, vocabulario, self.pesos_campos)
+
+        estatisticas = {}
+        for campo, atuais in self.estatisticas.items():
+            estatisticas[campo] = {
+                "frequencia_docs": _ajustar(atuais["frequencia_docs"], len(vocabulario))
+                + _ajustar(novas[campo]["frequencia_docs"], len(vocabulario)),
+                "comprimentos": np.concatenate([atuais["comprimentos"], novas[campo]["comprimentos"]]),
+            }
+            comprimentos = estatisticas[campo]["comprimentos"]
+            estatisticas[campo]["media"] = float(comprimentos.mean()) if len(comprimentos) and comprimentos.any() else 1.0
+
+        return IndiceBM25(
+            vocabulario, self.segmentos + [segmento], estatisticas, self.num_docs + len(df_novos),
+            self.pesos_campos, self.k1, self.b,
+        )
+
+    # Função para pontuar todos os documentos para uma lista de termos
+    def pontuar(self, termos):
+        pontuacoes = np.zeros(self.num_docs, dtype=np.float32)
+        k1, b = self.k1, self.b
+
+        for termo in termos:
+            termo_id = self.vocabulario.get(termo)
+            if termo_id is None:
+                continue
+
+            for campo, peso in self.pesos_campos.items():
+                estatisticas = self.estatisticas[campo]
+                frequencia = estatisticas["frequencia_docs"][termo_id]
+                if not frequencia:
+                    continue
+                idf = np.log1p((self.num_docs - frequencia + 0.5) / (frequencia + 0.5))
+                comprimentos = estatisticas["comprimentos"]
+                media = estatisticas["media"]
+
+                for segmento in self.segmentos:
+                    postagens = segmento[campo]
+                    if termo_id + 1 >= len(postagens["indptr"]):
+                        continue
+                    inicio, fim = postagens["indptr"][termo_id], postagens["indptr"][termo_id + 1]
+                    if inicio == fim:
+                        continue
+                    docs = postagens["docs"][inicio:fim]
+                    tf = postagens["tf"][inicio:fim]
+                    normalizacao = k1 * (1 - b + b * comprimentos[docs] / media)
+                    pontuacoes[docs] += peso * idf * tf * (k1 + 1) / (tf + normalizacao)
+
+        return pontuacoes
+
+    # Função para buscar as posições (iloc) dos documentos mais relevantes
+    def buscar(self, consulta, max_registros=3):
+        termos = termos_consulta(consulta)
+        if not termos:
+            return []
+
+        pontuacoes = self.pontuar(termos)
+        candidatos = np.flatnonzero(pontuacoes)
+
+        # Top-k com heap: O(n log k) em vez de ordenar todos os candidatos
+        return heapq.nlargest(max_registros, candidatos.tolist(), key=pontuacoes.__getitem__)
@@ -0,0 +1,291 @@
+import math
+import os
+from collections import Counter
+
+import numpy as np
+
+from colunar import Posicoes
+from dados import DIRETORIO_SNAPSHOT, gravar_atomico
+from texto import STOPWORDS, tokenizar
+
+# Campos dos vetores TF-IDF
+CAMPOS_RELACIONADOS = ["Título", "Resumo", "Tese Julgado"]
+
+# Vizinhos guardados por registro (a tela mostra até 10, depois de tirar as duplicatas)
+VIZINHOS = 16
+
+# Termos presentes em mais desta fração dos registros ficam fora dos vetores (como
+# o max_df do scikit-learn): pesam pouco na similaridade e dominam o custo dos produtos
+FREQUENCIA_MAXIMA = 0.1
+
+# Células da matriz densa de similaridades de um bloco (linhas do bloco x registros)
+CELULAS_POR_BLOCO = 1 << 23
+
+ARQUIVO_GRAFO = "relacionados.npz"
+
+
+def _termos(texto):
+    return [t for t in tokenizar(texto) if len(t) >= 2 and t not in STOPWORDS]
+
+
+def _contagens(df):
+    partes = [df[c].astype(object).where(df[c].notna(), "").tolist() for c in CAMPOS_RELACIONADOS]
+    return [Counter(_termos(" ".join(str(p) for p in linha))) for linha in zip(*partes)]
+
+
+# Função para montar os vetores TF-IDF (tf sublinear, norma L2) como CSR: (linhas, colunas, pesos)
+def _tfidf(contagens, vocabulario, idf):
+    colunas = []
+    pesos = []
+    tamanhos = np.zeros(len(contagens), dtype=np.int64)
+    for linha, contagem in enumerate(contagens):
+        termos = [(vocabulario[t], n) for t, n in contagem.items() if t in vocabulario]
+        tamanhos[linha] = len(termos)
+        colunas += [coluna for coluna, _ in termos]
+        pesos += [1 + math.log(n) for _, n in termos]
+
+    linhas = np.concatenate([[0], np.cumsum(tamanhos)])
+    colunas = np.array(colunas, dtype=np.int32)
+    pesos = np.array(pesos, dtype=np.float32) * idf[colunas]
+    origens = np.repeat(np.arange(len(contagens)), tamanhos)
+    normas = np.sqrt(np.bincount(origens, weights=pesos.astype(np.float64) ** 2, minlength=len(contagens)))
+    pesos /= np.maximum(normas[origens], 1e-12).astype(np.float32)
+    return linhas, colunas, pesos
+
+
+# Função para calcular as similaridades de cosseno de um bloco de consultas com todos
+# os registros: produto esparso (consultas x índice invertido), acumulado numa matriz densa
+def _similaridades(consultas, transposta, num_registros):
+    linhas, colunas, pesos = consultas
+    inicio_termos, registros, pesos_registros = transposta
+
+    tamanhos = inicio_termos[colunas + 1] - inicio_termos[colunas]
+    entradas = np.repeat(np.arange(len(colunas)), tamanhos)
+    posicoes = np.arange(tamanhos.sum()) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+    posicoes += np.repeat(inicio_termos[colunas], tamanhos)
+
+    origem = np.repeat(np.arange(len(linhas) - 1), np.diff(linhas))[entradas]
+    produtos = pesos[entradas] * pesos_registros[posicoes]
+    return np.bincount(
+        origem * num_registros + registros[posicoes], weights=produtos, minlength=(len(linhas) - 1) * num_registros
+    ).reshape(len(linhas) - 1, num_registros)
+
+
+# Índice invertido (termo -> registros) da matriz CSR
+def _transpor(matriz, num_termos):
+    linhas, colunas, pesos = matriz
+    ordem = np.argsort(colunas, kind="stable")
+    registros = np.repeat(np.arange(len(linhas) - 1, dtype=np.int32), np.diff(linhas))[ordem]
+    inicio_termos = np.concatenate([[0], np.cumsum(np.bincount(colunas, minlength=num_termos))])
+    return inicio_termos, registros, pesos[ordem]
+
+
+def _fatia(matriz, inicio, fim):
+    linhas, colunas, pesos = matriz
+    return linhas[inicio:fim + 1] - linhas[inicio], colunas[linhas[inicio]:linhas[fim]], pesos[linhas[inicio]:linhas[fim]]
+
+
+def _concatenar(matriz, outra):
+    return (
+        np.concatenate([matriz[0], outra[0][1:] + matriz[0][-1]]),
+        np.concatenate([matriz[1], outra[1]]),
+        np.concatenate([matriz[2], outra[2]]),
+    )
+
+
+# Função para percorrer as consultas em blocos: (início, similaridades com todos, sem a própria linha)
+def _blocos(consultas, transposta, num_registros, deslocamento=0):
+    tamanho_bloco = max(1, CELULAS_POR_BLOCO // max(num_registros, 1))
+    num_consultas = len(consultas[0]) - 1
+    for inicio in range(0, num_consultas, tamanho_bloco):
+        fim = min(num_consultas, inicio + tamanho_bloco)
+        bloco = _similaridades(_fatia(consultas, inicio, fim), transposta, num_registros)
+        proprias = np.arange(inicio, fim) + deslocamento
+        bloco[np.arange(fim - inicio), proprias] = 0.0
+        yield inicio, bloco
+
+
+# Função para escolher os k maiores de cada linha (só similaridades positivas), como triplas
+def _maiores(bloco, inicio, k):
+    k = min(k, bloco.shape[1])
+    escolhidos = np.argpartition(-bloco, k - 1, axis=1)[:, :k] if k < bloco.shape[1] else np.tile(
+        np.arange(bloco.shape[1]), (len(bloco), 1)
+    )
+    valores = np.take_along_axis(bloco, escolhidos, axis=1)
+    linhas, colunas = np.nonzero(valores > 0)
+    return linhas + inicio, escolhidos[linhas, colunas], valores[linhas, colunas]
+
+
+# Função para montar o CSR do grafo a partir das triplas (origem, vizinho, similaridade)
+# mantendo os k mais similares de cada origem, em ordem decrescente
+def _montar_grafo(origens, vizinhos, similaridades, num_registros, k):
+    ordem = np.lexsort((-similaridades, origens))
+    origens, vizinhos, similaridades = origens[ordem], vizinhos[ordem], similaridades[ordem]
+    contagens = np.bincount(origens, minlength=num_registros)
+    inicio = np.concatenate([[0], np.cumsum(contagens)])
+    manter = np.arange(len(origens)) - inicio[origens] < k
+    contagens = np.bincount(origens[manter], minlength=num_registros)
+    return (
+        np.concatenate([[0], np.cumsum(contagens)]).astype(np.int64),
+        vizinhos[manter].astype(np.int32),
+        similaridades[manter].astype(np.float16),
+    )
+
+
+# Grafo dos informativos relacionados (k vizinhos mais próximos por TF-IDF)
+#
+# Calculado uma vez por versão dos dados (e gravado junto do snapshot): a similaridade
+# de cosseno de todos os pares sai de produtos esparsos em blocos (cada bloco de
+# registros contra o índice invertido dos termos), e só os VIZINHOS mais similares de
+# cada registro ficam, num CSR (inicio, vizinhos, similaridades). Consultar os
+# relacionados de um registro é uma fatia O(k). Registros acrescentados depois são
+# comparados com todos e entram nas listas dos antigos quando superam o último vizinho.
+class GrafoRelacionados:
+    def __init__(self, vocabulario, idf, matriz, inicio, vizinhos, similaridades, k=VIZINHOS):
+        self.vocabulario = vocabulario
+        self.idf = idf
+        self.matriz = matriz
+        self.inicio = inicio
+        self.vizinhos = vizinhos
+        self.similaridades = similaridades
+        self.k = k
+
+    # Serialização (modo de serviço): o vocabulário vira arrays ordenados
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        estado["vocabulario"] = Posicoes.de_dict(self.vocabulario)
+        return estado
+
+    @classmethod
+    def construir(cls, df, k=VIZINHOS):
+        contagens = _contagens(df)
+        frequencia_docs = Counter()
+        for contagem in contagens:
+            frequencia_docs.update(contagem.keys())
+
+        num_registros = len(contagens)
+        limite = max(2, FREQUENCIA_MAXIMA * num_registros)
+        termos = sorted(t for t, n in frequencia_docs.items() if 2 <= n <= limite)
+        vocabulario = {t: i for i, t in enumerate(termos)}
+        idf = np.array(
+            [math.log((1 + num_registros) / (1 + frequencia_docs[t])) + 1 for t in termos], dtype=np.float32
+        )
+
+        matriz = _tfidf(contagens, vocabulario, idf)
+        transposta = _transpor(matriz, len(termos))
+        triplas = [_maiores(bloco, inicio, k) for inicio, bloco in _blocos(matriz, transposta, num_registros)]
+        grafo = _montar_grafo(*(np.concatenate(partes) for partes in zip(*triplas)), num_registros, k) if triplas else (
+            np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float16)
+        )
+        return cls(vocabulario, idf, matriz, *grafo, k=k)
+
+    # Função para criar um novo grafo com os registros adicionais (o atual não muda)
+    #
+    # Os novos registros usam o vocabulário e o IDF atuais (sem recalcular os antigos).
+    def estendido(self, df_novos):
+        novos = _tfidf(_contagens(df_novos), self.vocabulario, self.idf)
+        matriz = _concatenar(self.matriz, novos)
+        num_antigos = len(self)
+        num_registros = len(matriz[0]) - 1
+        transposta = _transpor(matriz, len(self.vocabulario))
+
+        # Similaridade do último vizinho de cada registro antigo (0 se a lista não está cheia)
+        contagens = np.diff(self.inicio)
+        limiares = np.zeros(num_antigos, dtype=np.float32)
+        cheias = np.flatnonzero(contagens >= self.k)
+        limiares[cheias] = self.similaridades[self.inicio[cheias + 1] - 1]
+
+        origens = [np.repeat(np.arange(num_antigos), contagens)]
+        vizinhos = [self.vizinhos.astype(np.int64)]
+        similaridades = [self.similaridades.astype(np.float32)]
+        for inicio, bloco in _blocos(novos, transposta, num_registros, deslocamento=num_antigos):
+            # Vizinhos dos registros novos (entre todos)
+            novas_origens, novos_vizinhos, novas_similaridades = _maiores(bloco, inicio + num_antigos, self.k)
+            origens.append(novas_origens)
+            vizinhos.append(novos_vizinhos)
+            similaridades.append(novas_similaridades)
+
+            # Registros novos que entram na lista de um antigo
+            linhas, antigos = np.nonzero(bloco[:, :num_antigos] > limiares)
+            origens.append(antigos)
+            vizinhos.append(linhas + inicio + num_antigos)
+            similaridades.append(bloco[linhas, antigos])
+
+        grafo = _montar_grafo(
+            np.concatenate(origens), np.concatenate(vizinhos), np.concatenate(similaridades).astype(np.float32),
+            num_registros, self.k,
+        )
+        return GrafoRelacionados(self.vocabulario, self.idf, matriz, *grafo, k=self.k)
+
+    def __len__(self):
+        return len(self.inicio) - 1
+
+    # Função para obter os relacionados de um registro: (posições, similaridades), O(k)
+    def relacionados(self, posicao, max_registros=None):
+        inicio, fim = self.inicio[posicao], self.inicio[posicao + 1]
+        if max_registros is not None:
+            fim = min(fim, inicio + max_registros)
+        return self.vizinhos[inicio:fim], self.similaridades[inicio:fim]
+
+    # Função para gravar o grafo (e o modelo TF-IDF), com a versão e a linhagem dos dados
+    def salvar(self, versao, linhagem=(), diretorio=DIRETORIO_SNAPSHOT):
+        os.makedirs(diretorio, exist_ok=True)
+        termos = sorted(self.vocabulario, key=self.vocabulario.get)
+
+        def escrever(caminho):
+            with open(caminho, "wb") as arquivo:
+                np.savez(
+                    arquivo, versao=np.array(versao), linhagem=np.array(list(linhagem), dtype=str),
+                    termos=np.array(termos, dtype=str), idf=self.idf, k=np.array(self.k),
+                    linhas=self.matriz[0], colunas=self.matriz[1], pesos=self.matriz[2],
+                    inicio=self.inicio, vizinhos=self.vizinhos, similaridades=self.similaridades,
+                )
+
+        gravar_atomico(os.path.join(diretorio, ARQUIVO_GRAFO), escrever)
+
+    # Função para abrir o grafo gravado: (grafo, versão, linhagem) ou (None, None, ())
+    @classmethod
+    def carregar(cls, diretorio=DIRETORIO_SNAPSHOT):
+        try:
+            with np.load(os.path.join(diretorio, ARQUIVO_GRAFO)) as arquivo:
+                dados = {nome: arquivo[nome] for nome in arquivo.files}
+        except (OSError, ValueError, KeyError):
+            return None, None, ()
+
+        vocabulario = {t: i for i, t in enumerate(dados["termos"].tolist())}
+        grafo = cls(
+            vocabulario, dados["idf"], (dados["linhas"], dados["colunas"], dados["pesos"]),
+            dados["inicio"], dados["vizinhos"], dados["similaridades"], k=int(dados["k"]),
+        )
+        return grafo, str(dados["versao"]), tuple(dados["linhagem"].tolist())
+
+
+# Função para abrir o grafo do build offline ou, se não houver, construí-lo e gravá-lo
+#
+# Um grafo gravado para uma versão anterior da mesma linhagem (só com menos partições)
+# é estendido com as linhas acrescentadas, em vez de reconstruído.
+def carregar_ou_construir_grafo(df, versao, diretorio=DIRETORIO_SNAPSHOT):
+    grafo, versao_gravada, linhagem_gravada = GrafoRelacionados.carregar(diretorio)
+    if grafo is not None and versao_gravada == versao and len(grafo) == len(df):
+        return grafo
+
+    linhagem = tuple(df.attrs.get("linhagem") or ())
+    if (grafo is not None and linhagem_gravada and linhagem[:len(linhagem_gravada)] == linhagem_gravada
+            and len(grafo) < len(df)):
+        grafo = grafo.estendido(df.iloc[len(grafo):])
+    else:
+        grafo = GrafoRelacionados.construir(df)
+    try:
+        grafo.salvar(versao, linhagem, diretorio)
+    except OSError:
+        pass
+    return grafo
+
+
+if __name__ == "__main__":
+    from dados import carregar_informativos, versao_dataset
+
+    df = carregar_informativos()
+    versao = versao_dataset(df)
+    GrafoRelacionados.construir(df).salvar(versao, df.attrs.get("linhagem") or ())
+    print(f"Grafo de relacionados gravado em {DIRETORIO_SNAPSHOT} ({len(df)} registros, versão {versao}).")
@@ -0,0 +1,259 @@
+import asyncio
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cachetools import TTLCache
+
+from texto import termos_consulta
+
+# Pool compartilhado (todas as sessões) para a busca e a montagem das respostas
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="respostas")
+
+# Backend LLM opcional: usado só quando a chave da OpenAI está configurada
+MODELO_LLM = os.environ.get("INFORMATIVOS_MODELO_LLM", "gpt-4o-mini")
+
+INSTRUCOES_LLM = (
+    "Você é um assistente que responde perguntas sobre os informativos do STF. "
+    "Responda em português, de forma objetiva, usando apenas o contexto fornecido "
+    "e citando o número do informativo."
+)
+
+# Cache de respostas: memória máxima (bytes dos textos guardados) e validade (segundos)
+MEMORIA_CACHE = 32 * 1024 * 1024
+VALIDADE_CACHE = 3600
+
+# Marca de fim do fluxo de trechos
+_FIM = object()
+
+_loop = None
+_cliente = None
+_trava = threading.Lock()
+
+
+# Resposta em andamento: os trechos chegam por uma fila, na ordem em que são produzidos
+class TarefaResposta:
+    def __init__(self):
+        self.fila = queue.Queue()
+        self.cancelada = threading.Event()
+        self.concluida = threading.Event()
+        self.futuro = None
+
+    # Função para cancelar a resposta (ex.: o usuário fez outra pergunta ou a página recarregou)
+    def cancelar(self):
+        self.cancelada.set()
+        if self.futuro is not None:
+            self.futuro.cancel()
+
+    def _publicar(self, trecho):
+        if not self.cancelada.is_set():
+            self.fila.put(trecho)
+
+    def _encerrar(self, erro=None):
+        if erro is not None:
+            self.fila.put(erro)
+        self.fila.put(_FIM)
+        self.concluida.set()
+
+    # Função para consumir os trechos à medida que ficam prontos
+    #
+    # Se o consumidor for interrompido (rerun do Streamlit), a tarefa é cancelada; se
+    # nenhum trecho chegar em tempo_limite segundos, também, com um TimeoutError.
+    def trechos(self, tempo_limite=60):
+        try:
+            while True:
+                try:
+                    item = self.fila.get(timeout=tempo_limite)
+                except queue.Empty:
+                    self.cancelar()
+                    raise TimeoutError(f"a resposta não ficou pronta em {tempo_limite} segundos") from None
+                if item is _FIM:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if not self.concluida.is_set():
+                self.cancelar()
+
+
+def _produzir(tarefa, produzir_trechos):
+    # Executado no pool: publica cada trecho e para assim que a tarefa é cancelada
+    for trecho in produzir_trechos():
+        if tarefa.cancelada.is_set():
+            return
+        tarefa._publicar(trecho)
+
+
+def _executar_local(tarefa, produzir_trechos):
+    try:
+        _produzir(tarefa, produzir_trechos)
+    except Exception as e:
+        tarefa._encerrar(e)
+    else:
+        tarefa._encerrar()
+
+
+def _loop_assincrono():
+    # Um único event loop em segundo plano para as chamadas ao LLM de todas as sessões
+    global _loop
+    with _trava:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="respostas-llm", daemon=True).start()
+    return _loop
+
+
+# Função para obter o cliente assíncrono da OpenAI (None se não houver chave ou pacote)
+def cliente_llm():
+    global _cliente
+    if _cliente is None and os.environ.get("OPENAI_API_KEY"):
+        try:
+            from openai import AsyncOpenAI
+        except ImportError:
+            return None
+        _cliente = AsyncOpenAI()
+    return _cliente
+
+
+async def _responder_llm(tarefa, pergunta, contexto, produzir_trechos, cliente):
+    publicou = False
+    try:
+        fluxo = await cliente.chat.completions.create(
+            model=MODELO_LLM,
+            stream=True,
+            messages=[
+                {"role": "system", "content": INSTRUCOES_LLM},
+                {"role": "user", "content": f"{contexto}\nPergunta: {pergunta}"},
+            ],
+        )
+        async for evento in fluxo:
+            if tarefa.cancelada.is_set():
+                break
+            delta = evento.choices[0].delta.content if evento.choices else None
+            if delta:
+                tarefa._publicar(delta)
+                publicou = True
+    except asyncio.CancelledError:
+        tarefa._encerrar()
+        raise
+    except Exception as e:
+        # Falha do LLM antes de qualquer trecho: cair para a resposta local
+        if publicou:
+            tarefa._encerrar(e)
+            return
+        try:
+            await asyncio.get_running_loop().run_in_executor(_EXECUTOR, _produzir, tarefa, produzir_trechos)
+        except Exception as erro_local:
+            tarefa._encerrar(erro_local)
+            return
+    tarefa._encerrar()
+
+
+# Função para iniciar uma resposta sem bloquear a thread do script
+#
+# produzir_trechos: função sem argumentos que devolve um gerador de trechos em
+# markdown (resposta local, executada no pool compartilhado). criar_contexto_llm:
+# função que monta o contexto para o LLM; quando há cliente configurado, a resposta
+# vem do LLM em streaming (asyncio) e a local vira o plano B.
+def responder(pergunta, produzir_trechos, criar_contexto_llm=None):
+    tarefa = TarefaResposta()
+    cliente = cliente_llm() if criar_contexto_llm is not None else None
+
+    if cliente is None:
+        tarefa.futuro = _EXECUTOR.submit(_executar_local, tarefa, produzir_trechos)
+        return tarefa
+
+    def _iniciar():
+        # O contexto (busca BM25) também roda fora da thread do script
+        contexto = criar_contexto_llm()
+        return asyncio.run_coroutine_threadsafe(
+            _responder_llm(tarefa, pergunta, contexto, produzir_trechos, cliente), _loop_assincrono()
+        )
+
+    def _encadear(futuro_contexto):
+        if tarefa.cancelada.is_set():
+            tarefa._encerrar()
+            return
+        try:
+            tarefa.futuro = futuro_contexto.result()
+        except Exception as e:
+            tarefa._encerrar(e)
+
+    _EXECUTOR.submit(_iniciar).add_done_callback(_encadear)
+    return tarefa
+
+
+# Função para gerar a chave normalizada de uma pergunta
+# ("Direito Tributário 2023?" e "2023 direito tributario" dão a mesma chave).
+# Termos curtos entram na chave: a busca semântica distingue "IPI" de "ISS".
+def chave_consulta(pergunta):
+    return tuple(sorted(termos_consulta(pergunta, tamanho_minimo=2)))
+
+
+# Cache de respostas compartilhado pelo processo (LRU + validade + limite de memória)
+#
+# As entradas levam a versão dos dados na chave, então versões diferentes (por
+# exemplo, dois workers no meio de uma troca) não se misturam nem se apagam; as
+# da versão antiga saem pela validade ou pelo LRU. O TTLCache já despeja pelo uso
+# menos recente ao atingir o limite; o "tamanho" de cada entrada é o tamanho do
+# texto em bytes.
+class CacheRespostas:
+    def __init__(self, memoria_max=MEMORIA_CACHE, validade=VALIDADE_CACHE):
+        self._cache = TTLCache(maxsize=memoria_max, ttl=validade, getsizeof=sys.getsizeof)
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    @staticmethod
+    def _chave(tipo, versao, pergunta):
+        return (tipo, versao, chave_consulta(pergunta))
+
+    def buscar(self, tipo, versao, pergunta):
+        with self._trava:
+            valor = self._cache.get(self._chave(tipo, versao, pergunta))
+            if valor is None:
+                self.falhas += 1
+            else:
+                self.acertos += 1
+            return valor
+
+    def guardar(self, tipo, versao, pergunta, valor):
+        with self._trava:
+            chave = self._chave(tipo, versao, pergunta)
+            if sys.getsizeof(valor) <= self._cache.maxsize:
+                self._cache[chave] = valor
+
+    # Função para obter um valor do cache ou calculá-lo (e guardá-lo)
+    def obter(self, tipo, versao, pergunta, calcular):
+        valor = self.buscar(tipo, versao, pergunta)
+        if valor is None:
+            valor = calcular()
+            self.guardar(tipo, versao, pergunta, valor)
+        return valor
+
+    # Função para envolver um gerador de trechos: num acerto devolve a resposta
+    # inteira de uma vez; numa falha repassa os trechos e guarda a resposta completa
+    def trechos(self, tipo, versao, pergunta, produzir_trechos):
+        valor = self.buscar(tipo, versao, pergunta)
+        if valor is not None:
+            yield valor
+            return
+
+        partes = []
+        for trecho in produzir_trechos():
+            partes.append(trecho)
+            yield trecho
+        self.guardar(tipo, versao, pergunta, "".join(partes))
+
+    def estatisticas(self):
+        with self._trava:
+            self._cache.expire()
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "itens": len(self._cache),
+                "memoria": self._cache.currsize,
+            }
@@ -0,0 +1,372 @@
+import json
+import math
+import os
+import shutil
+import weakref
+from collections import Counter
+
+import numpy as np
+
+from colunar import Posicoes
+from dados import DIRETORIO_SNAPSHOT, apagar_se_livre, travar_uso
+from texto import STOPWORDS, termos_consulta, tokenizar
+
+# Campos codificados em cada vetor
+CAMPOS_SEMANTICOS = ["Título", "Resumo", "Tese Julgado"]
+
+# Tamanho do vocabulário (termos mais frequentes) e dimensão dos vetores (LSA)
+TAMANHO_VOCABULARIO = 4096
+DIMENSOES = 256
+
+# Linhas processadas por vez na construção e na busca exaustiva
+LINHAS_POR_BLOCO = 8192
+
+# A partir deste número de registros a busca usa o índice IVF (listas invertidas)
+LIMIAR_IVF = 200_000
+LISTAS_VISITADAS = 8
+
+# Peso da similaridade semântica no modo híbrido (o resto vai para o BM25)
+PESO_SEMANTICO = 0.5
+
+# Cada versão do índice fica em <DIRETORIO_SNAPSHOT>/semantica/<versao>/
+DIRETORIO_SEMANTICO = "semantica"
+ARQUIVO_VETORES = "embeddings.npy"
+ARQUIVO_MODELO = "modelo_semantico.npz"
+ARQUIVO_META = "embeddings.meta.json"
+
+
+# Função para extrair os termos de um texto (inclui siglas curtas como "IPI" e "ADI")
+def _termos(texto):
+    return [t for t in tokenizar(texto) if len(t) >= 2 and t not in STOPWORDS]
+
+
+def _textos(df):
+    partes = [df[c].astype(object).where(df[c].notna(), "").tolist() for c in CAMPOS_SEMANTICOS]
+    return [" ".join(str(p) for p in linha) for linha in zip(*partes)]
+
+
+def _normalizar_linhas(matriz):
+    normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+    return matriz / np.maximum(normas, 1e-12)
+
+
+# Codificador TF-IDF -> LSA (SVD truncada), sem rede e sem dependências além do numpy
+#
+# O vocabulário fica limitado aos termos mais frequentes; a projeção são os vetores
+# singulares principais da matriz TF-IDF, calculados por iteração de subespaço
+# aleatória (Halko et al.) percorrendo os documentos em blocos, então a memória da
+# construção não cresce com o número de registros. Termos que aparecem juntos caem
+# nas mesmas direções, e perguntas parafraseadas ficam próximas dos documentos
+# mesmo sem palavras em comum.
+class CodificadorLSA:
+    def __init__(self, vocabulario, idf, projecao):
+        self.vocabulario = vocabulario
+        self.idf = idf
+        self.projecao = projecao
+
+    # Serialização (modo de serviço): o vocabulário vira arrays ordenados
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        estado["vocabulario"] = Posicoes.de_dict(self.vocabulario)
+        return estado
+
+    @classmethod
+    def treinar(cls, textos, tamanho_vocabulario=TAMANHO_VOCABULARIO, dimensoes=DIMENSOES,
+                iteracoes=3, semente=0):
+        frequencia_docs = Counter()
+        for texto in textos:
+            frequencia_docs.update(set(_termos(texto)))
+
+        termos = [t for t, n in frequencia_docs.most_common(tamanho_vocabulario) if n >= 2]
+        vocabulario = {t: i for i, t in enumerate(termos)}
+        num_docs = max(len(textos), 1)
+        idf = np.array(
+            [math.log((1 + num_docs) / (1 + frequencia_docs[t])) + 1 for t in termos], dtype=np.float32
+        )
+
+        codificador = cls(vocabulario, idf, None)
+        dimensoes = max(1, min(dimensoes, len(termos), len(textos)))
+        blocos = [
+            codificador._tfidf(textos[inicio:inicio + LINHAS_POR_BLOCO])
+            for inicio in range(0, len(textos), LINHAS_POR_BLOCO)
+        ] if len(textos) <= LINHAS_POR_BLOCO else None
+
+        def percorrer():
+            # Reaproveita o bloco único em corpora pequenos; senão recalcula bloco a bloco
+            if blocos is not None:
+                yield from blocos
+                return
+            for inicio in range(0, len(textos), LINHAS_POR_BLOCO):
+                yield codificador._tfidf(textos[inicio:inicio + LINHAS_POR_BLOCO])
+
+        # Iteração de subespaço: Q <- orth(Xᵀ X Q), sem formar Xᵀ X
+        rng = np.random.default_rng(semente)
+        largura = min(dimensoes + 16, len(termos))
+        base = np.linalg.qr(rng.standard_normal((len(termos), largura)).astype(np.float32))[0]
+        for _ in range(iteracoes):
+            produto = np.zeros_like(base)
+            for bloco in percorrer():
+                produto += bloco.T @ (bloco @ base)
+            base = np.linalg.qr(produto)[0]
+
+        # Rotação final: autovetores de (XQ)ᵀ(XQ), em ordem decrescente
+        gram = np.zeros((largura, largura), dtype=np.float64)
+        for bloco in percorrer():
+            projetado = bloco @ base
+            gram += projetado.T @ projetado
+        _, autovetores = np.linalg.eigh(gram)
+        rotacao = autovetores[:, ::-1][:, :dimensoes].astype(np.float32)
+        codificador.projecao = np.ascontiguousarray(base @ rotacao)
+        return codificador
+
+    def _tfidf(self, textos):
+        matriz = np.zeros((len(textos), len(self.vocabulario)), dtype=np.float32)
+        for linha, texto in enumerate(textos):
+            contagem = Counter(t for t in _termos(texto) if t in self.vocabulario)
+            if contagem:
+                colunas = np.fromiter((self.vocabulario[t] for t in contagem), dtype=np.int64, count=len(contagem))
+                matriz[linha, colunas] = 1 + np.log(np.fromiter(contagem.values(), dtype=np.float32, count=len(contagem)))
+        return _normalizar_linhas(matriz * self.idf)
+
+    # Função para codificar textos em vetores unitários (float32)
+    def codificar(self, textos):
+        if not len(self.vocabulario):
+            return np.zeros((len(textos), self.projecao.shape[1]), dtype=np.float32)
+        blocos = [
+            self._tfidf(textos[inicio:inicio + LINHAS_POR_BLOCO]) @ self.projecao
+            for inicio in range(0, len(textos), LINHAS_POR_BLOCO)
+        ]
+        if not blocos:
+            return np.zeros((0, self.projecao.shape[1]), dtype=np.float32)
+        return _normalizar_linhas(np.vstack(blocos)).astype(np.float32)
+
+
+# Função para agrupar os vetores com k-means (centróides do IVF)
+def _kmeans(vetores, num_listas, iteracoes=10, semente=0):
+    rng = np.random.default_rng(semente)
+    amostra = vetores[rng.choice(len(vetores), size=min(len(vetores), num_listas * 64), replace=False)]
+    amostra = amostra.astype(np.float32)
+    centroides = amostra[rng.choice(len(amostra), size=num_listas, replace=False)]
+
+    for _ in range(iteracoes):
+        atribuicao = (amostra @ centroides.T).argmax(axis=1)
+        for lista in range(num_listas):
+            membros = amostra[atribuicao == lista]
+            if len(membros):
+                centroides[lista] = membros.mean(axis=0)
+        centroides = _normalizar_linhas(centroides)
+    return centroides
+
+
+# Índice IVF: cada vetor fica na lista do centróide mais próximo; a busca só visita
+# as listas mais próximas da consulta (aproximada, mas sublinear no número de registros)
+class ListasIVF:
+    def __init__(self, centroides, atribuicao):
+        self.centroides = centroides
+        self.atribuicao = atribuicao
+        self.ordem = np.argsort(atribuicao, kind="stable")
+        self.indptr = np.zeros(len(centroides) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(atribuicao, minlength=len(centroides)), out=self.indptr[1:])
+
+    @classmethod
+    def construir(cls, vetores):
+        num_listas = max(1, int(math.sqrt(len(vetores))))
+        centroides = _kmeans(vetores, num_listas)
+        return cls(centroides, cls._atribuir(centroides, vetores))
+
+    @staticmethod
+    def _atribuir(centroides, vetores):
+        return np.concatenate([
+            (vetores[inicio:inicio + LINHAS_POR_BLOCO].astype(np.float32) @ centroides.T).argmax(axis=1)
+            for inicio in range(0, len(vetores), LINHAS_POR_BLOCO)
+        ]) if len(vetores) else np.zeros(0, dtype=np.int64)
+
+    def estendido(self, vetores_novos):
+        return ListasIVF(self.centroides, np.concatenate([self.atribuicao, self._atribuir(self.centroides, vetores_novos)]))
+
+    def candidatos(self, consulta, listas_visitadas=LISTAS_VISITADAS):
+        proximas = np.argsort(self.centroides @ consulta)[::-1][:listas_visitadas]
+        return np.concatenate([self.ordem[self.indptr[l]:self.indptr[l + 1]] for l in proximas])
+
+
+# Índice semântico: vetores float16 (mapeados do disco quando vêm do build offline)
+class IndiceSemantico:
+    def __init__(self, codificador, vetores, ivf=None):
+        self.codificador = codificador
+        self.vetores = vetores
+        self.ivf = ivf
+
+    @classmethod
+    def construir(cls, df, usar_ivf=None):
+        textos = _textos(df)
+        codificador = CodificadorLSA.treinar(textos)
+        vetores = codificador.codificar(textos).astype(np.float16)
+        return cls._com_ivf(codificador, vetores, usar_ivf)
+
+    @classmethod
+    def _com_ivf(cls, codificador, vetores, usar_ivf):
+        if usar_ivf is None:
+            usar_ivf = len(vetores) >= LIMIAR_IVF
+        return cls(codificador, vetores, ListasIVF.construir(vetores) if usar_ivf and len(vetores) else None)
+
+    # Função para criar um novo índice com os registros adicionais (o atual não muda)
+    #
+    # Os novos registros são codificados com o modelo atual (sem retreinar).
+    def estendido(self, df_novos):
+        novos = self.codificador.codificar(_textos(df_novos)).astype(np.float16)
+        ivf = self.ivf.estendido(novos) if self.ivf is not None else None
+        return IndiceSemantico(self.codificador, np.concatenate([self.vetores, novos]), ivf)
+
+    # Função para calcular a similaridade de cosseno da consulta com todos os registros
+    # (registros fora das listas visitadas pelo IVF ficam com 0)
+    def similaridades(self, consulta):
+        vetor = self.codificador.codificar([consulta])[0]
+        resultado = np.zeros(len(self.vetores), dtype=np.float32)
+        if not vetor.any():
+            return resultado
+
+        if self.ivf is not None:
+            candidatos = np.sort(self.ivf.candidatos(vetor))
+            resultado[candidatos] = self.vetores[candidatos].astype(np.float32) @ vetor
+            return resultado
+
+        # float16 não tem BLAS: converter bloco a bloco para float32
+        for inicio in range(0, len(self.vetores), LINHAS_POR_BLOCO):
+            bloco = self.vetores[inicio:inicio + LINHAS_POR_BLOCO]
+            resultado[inicio:inicio + len(bloco)] = bloco.astype(np.float32) @ vetor
+        return resultado
+
+    def buscar(self, consulta, max_registros=3):
+        return _maiores(self.similaridades(consulta), max_registros)
+
+    # Função para gravar o índice (vetores .npy + modelo), para o build offline
+    #
+    # Os três arquivos vão para um diretório temporário, renomeado para <versao>/ de
+    # uma vez: quem carrega nunca vê vetores de uma versão com o modelo de outra.
+    def salvar(self, versao, diretorio=DIRETORIO_SNAPSHOT):
+        raiz = os.path.join(diretorio, DIRETORIO_SEMANTICO)
+        destino = os.path.join(raiz, versao)
+        if os.path.exists(os.path.join(destino, ARQUIVO_META)):
+            return
+
+        temporario = f"{destino}.tmp-{os.getpid()}"
+        shutil.rmtree(temporario, ignore_errors=True)
+        os.makedirs(temporario)
+        try:
+            _gravar_npy(os.path.join(temporario, ARQUIVO_VETORES), np.asarray(self.vetores))
+            # Termos com largura fixa (dtype str): o modelo abre sem pickle
+            termos = sorted(self.codificador.vocabulario, key=self.codificador.vocabulario.get)
+            _gravar_npz(
+                os.path.join(temporario, ARQUIVO_MODELO), termos=np.array(termos, dtype=str),
+                idf=self.codificador.idf, projecao=self.codificador.projecao,
+            )
+            with open(os.path.join(temporario, ARQUIVO_META), "w", encoding="utf-8") as arquivo:
+                json.dump({"versao": versao, "linhas": len(self.vetores)}, arquivo)
+
+            try:
+                os.replace(temporario, destino)
+            except OSError:
+                # Outro processo gravou a mesma versão antes
+                if not os.path.exists(os.path.join(destino, ARQUIVO_META)):
+                    raise
+        finally:
+            shutil.rmtree(temporario, ignore_errors=True)
+        _limpar_versoes(raiz, versao)
+
+    # Função para abrir o índice gravado (vetores via memory map), se for da mesma versão
+    @classmethod
+    def carregar(cls, versao, diretorio=DIRETORIO_SNAPSHOT, usar_ivf=None):
+        origem = os.path.join(diretorio, DIRETORIO_SEMANTICO, versao)
+        try:
+            with open(os.path.join(origem, ARQUIVO_META), encoding="utf-8") as arquivo:
+                meta = json.load(arquivo)
+            if meta.get("versao") != versao:
+                return None
+            liberar = travar_uso(os.path.join(origem, ARQUIVO_META))
+        except (OSError, ValueError):
+            return None
+        try:
+            with np.load(os.path.join(origem, ARQUIVO_MODELO), allow_pickle=False) as modelo:
+                termos, idf, projecao = modelo["termos"].tolist(), modelo["idf"], modelo["projecao"]
+            vetores = np.load(os.path.join(origem, ARQUIVO_VETORES), mmap_mode="r", allow_pickle=False)
+        except (OSError, ValueError, KeyError):
+            liberar()
+            return None
+        if len(vetores) != meta.get("linhas"):
+            liberar()
+            return None
+
+        # Os vetores mapeados ficam travados (não são apagados) enquanto o índice existir
+        codificador = CodificadorLSA({t: i for i, t in enumerate(termos)}, idf, projecao)
+        indice = cls._com_ivf(codificador, vetores, usar_ivf)
+        weakref.finalize(indice, liberar)
+        return indice
+
+
+# Função para apagar os índices de versões antigas (mantém a atual e a anterior;
+# as mais antigas só se nenhum processo estiver com os vetores mapeados)
+def _limpar_versoes(raiz, atual):
+    versoes = [
+        os.path.join(raiz, nome) for nome in os.listdir(raiz)
+        if nome != atual and os.path.isdir(os.path.join(raiz, nome)) and ".tmp-" not in nome
+    ]
+    versoes.sort(key=os.path.getmtime, reverse=True)
+    for caminho in versoes[1:]:
+        apagar_se_livre(caminho, os.path.join(caminho, ARQUIVO_META))
+
+
+def _gravar_npy(caminho, array):
+    with open(caminho, "wb") as arquivo:
+        np.save(arquivo, array)
+
+
+def _gravar_npz(caminho, **arrays):
+    with open(caminho, "wb") as arquivo:
+        np.savez(arquivo, **arrays)
+
+
+def _maiores(pontuacoes, max_registros):
+    # Top-k com argpartition (O(n)) e ordenação só dos k escolhidos
+    candidatos = np.flatnonzero(pontuacoes > 0)
+    if len(candidatos) > max_registros:
+        candidatos = candidatos[np.argpartition(-pontuacoes[candidatos], max_registros - 1)[:max_registros]]
+    return candidatos[np.argsort(-pontuacoes[candidatos], kind="stable")].tolist()
+
+
+# Busca híbrida: combina a similaridade semântica com a pontuação BM25 (normalizada pelo máximo)
+class BuscaHibrida:
+    def __init__(self, bm25, semantico, peso_semantico=PESO_SEMANTICO):
+        self.bm25 = bm25
+        self.semantico = semantico
+        self.peso_semantico = peso_semantico
+
+    def pontuar(self, consulta):
+        similaridades = np.clip(self.semantico.similaridades(consulta), 0, None)
+        palavras = self.bm25.pontuar(termos_consulta(consulta))
+        if palavras.any():
+            palavras = palavras / palavras.max()
+        return self.peso_semantico * similaridades + (1 - self.peso_semantico) * palavras
+
+    def buscar(self, consulta, max_registros=3):
+        return _maiores(self.pontuar(consulta), max_registros)
+
+
+# Função para abrir o índice do build offline ou, se não houver, construí-lo e gravá-lo
+def carregar_ou_construir(df, versao, diretorio=DIRETORIO_SNAPSHOT):
+    indice = IndiceSemantico.carregar(versao, diretorio)
+    if indice is None or len(indice.vetores) != len(df):
+        indice = IndiceSemantico.construir(df)
+        try:
+            indice.salvar(versao, diretorio)
+        except OSError:
+            pass
+    return indice
+
+
+if __name__ == "__main__":
+    from dados import carregar_informativos, versao_dataset
+
+    df = carregar_informativos()
+    versao = versao_dataset(df)
+    IndiceSemantico.construir(df).salvar(versao)
+    print(f"Embeddings gravados em {DIRETORIO_SNAPSHOT} ({len(df)} registros, versão {versao}).")
@@ -0,0 +1,265 @@
+import json
+import mmap
+import os
+import shutil
+import threading
+import weakref
+from collections import OrderedDict
+
+from colunar import codificar, decodificar
+from dados import (
+    ARQUIVO_ORIGEM,
+    DIRETORIO_PARTICOES,
+    DIRETORIO_SNAPSHOT,
+    apagar_se_livre,
+    carregar_tabela,
+    gravar_atomico,
+    ler_snapshot,
+    montar_dataframe,
+    travar_uso,
+)
+
+# Modo de serviço: vários processos do Streamlit no mesmo host mapeiam o dataset e os
+# índices publicados por um processo carregador, em vez de cada um montar os seus
+MODO_SERVICO = os.environ.get("INFORMATIVOS_MODO_SERVICO") == "1"
+DIRETORIO_SERVICO = os.environ.get("INFORMATIVOS_DIRETORIO_SERVICO", "data/servico")
+
+# Arquivo com o nome da versão publicada atual (trocado atomicamente)
+ARQUIVO_ATUAL = "ATUAL"
+
+# Versões mantidas no disco mesmo sem uso (a atual e a anterior). As mais antigas
+# só são apagadas quando nenhum worker as tem abertas (trava no meta.json)
+VERSOES_MANTIDAS = 2
+
+# Formato dos índices gravados (versões publicadas num formato antigo são refeitas)
+FORMATO_INDICES = 2
+
+# Alinhamento dos buffers no arquivo binário (arrays numpy mapeados direto do disco)
+_ALINHAMENTO = 64
+
+_indices_abertos = OrderedDict()
+_trava = threading.Lock()
+
+
+# Classes que podem ser gravadas na publicação (a leitura só instancia estas)
+def _classes_publicadas():
+    from agregacoes import CuboAgregacoes
+    from assertivas import GeradorAssertivas
+    from duplicatas import IndiceDuplicatas
+    from filtros import MotorFiltros
+    from pesquisa import IndicePesquisa
+    from recuperacao import IndiceBM25
+    from relacionados import GrafoRelacionados
+    from semantica import CodificadorLSA, IndiceSemantico, ListasIVF
+    from tendencias import MatrizTendencias
+
+    classes = (
+        CuboAgregacoes, GeradorAssertivas, IndiceDuplicatas, MotorFiltros, IndicePesquisa, IndiceBM25,
+        GrafoRelacionados, CodificadorLSA, IndiceSemantico, ListasIVF, MatrizTendencias,
+    )
+    return {classe.__name__: classe for classe in classes}
+
+
+# Função para construir todas as estruturas derivadas publicadas junto com os dados
+def construir_indices(df):
+    classes = _classes_publicadas()
+
+    motor = classes["MotorFiltros"].construir(df)
+    return {
+        "bm25": classes["IndiceBM25"].construir(df),
+        "filtros": motor,
+        "cubo": classes["CuboAgregacoes"].construir(motor),
+        "pesquisa": classes["IndicePesquisa"].construir(df),
+        "assertivas": classes["GeradorAssertivas"].construir(df),
+        "semantica": classes["IndiceSemantico"].construir(df),
+        "duplicatas": classes["IndiceDuplicatas"].construir(df),
+        "relacionados": classes["GrafoRelacionados"].construir(df),
+        "tendencias": classes["MatrizTendencias"].construir(df),
+    }
+
+
+# Função para gravar as estruturas sem pickle: tudo vira arrays
+#
+# Textos e dicionários já chegam como arrays (Textos, Posicoes, Listas: ver colunar.py);
+# os arrays vão alinhados para um arquivo binário e a estrutura (classes, formas,
+# escalares) para um JSON. Na leitura os arrays são fatias de um mmap somente
+# leitura (as páginas ficam no cache do sistema, compartilhadas entre os processos).
+def _gravar_objetos(diretorio, objetos):
+    estrutura, buffers = codificar(objetos, _classes_publicadas())
+
+    posicoes = []
+    with open(os.path.join(diretorio, "indices.bin"), "wb") as arquivo:
+        posicao = 0
+        for buffer in buffers:
+            preenchimento = -posicao % _ALINHAMENTO
+            arquivo.write(b"\0" * preenchimento)
+            posicao += preenchimento
+            arquivo.write(buffer)
+            posicoes.append([posicao, buffer.nbytes])
+            posicao += buffer.nbytes
+
+    with open(os.path.join(diretorio, "indices.json"), "w", encoding="utf-8") as arquivo:
+        json.dump(estrutura, arquivo)
+    return posicoes
+
+
+def _ler_objetos(diretorio, posicoes):
+    with open(os.path.join(diretorio, "indices.json"), encoding="utf-8") as arquivo:
+        estrutura = json.load(arquivo)
+
+    buffers = []
+    if posicoes:
+        with open(os.path.join(diretorio, "indices.bin"), "rb") as arquivo:
+            # mmap de arquivo vazio não é permitido (só buffers vazios)
+            vazio = os.fstat(arquivo.fileno()).st_size == 0
+            mapa = b"" if vazio else mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        vista = memoryview(mapa)
+        buffers = [vista[inicio:inicio + tamanho] for inicio, tamanho in posicoes]
+    return decodificar(estrutura, buffers, _classes_publicadas())
+
+
+def _ler_json(caminho):
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+
+
+# Função para publicar o dataset e os índices (processo carregador)
+#
+# Tudo é gravado num diretório temporário, renomeado para o nome da versão; só
+# então o arquivo ATUAL passa a apontar para ela (troca atômica). Workers que ainda
+# estão na versão anterior continuam com os arquivos dela mapeados.
+def publicar(origem=ARQUIVO_ORIGEM, diretorio=DIRETORIO_SERVICO, snapshot=DIRETORIO_SNAPSHOT,
+             particoes=DIRETORIO_PARTICOES):
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    tabela, sha256, nomes = carregar_tabela(origem, snapshot, particoes)
+    df = montar_dataframe(tabela, sha256, nomes)
+    versao = df.attrs["versao"]
+    destino = os.path.join(diretorio, versao)
+
+    meta = _ler_json(os.path.join(destino, "meta.json"))
+    if meta is None or meta.get("formato") != FORMATO_INDICES:
+        temporario = f"{destino}.tmp-{os.getpid()}"
+        shutil.rmtree(temporario, ignore_errors=True)
+        os.makedirs(temporario)
+        try:
+            # Arrow IPC sem compressão (memory map sem cópia), já com as partições
+            with pa.OSFile(os.path.join(temporario, "dados.arrow"), "wb") as saida:
+                with ipc.new_file(saida, tabela.schema) as escritor:
+                    escritor.write_table(tabela)
+
+            posicoes = _gravar_objetos(temporario, construir_indices(df))
+            with open(os.path.join(temporario, "meta.json"), "w", encoding="utf-8") as arquivo:
+                json.dump({
+                    "versao": versao, "sha256": sha256, "particoes": nomes,
+                    "linhas": len(df), "buffers": posicoes, "formato": FORMATO_INDICES,
+                }, arquivo)
+
+            shutil.rmtree(destino, ignore_errors=True)
+            os.replace(temporario, destino)
+        finally:
+            shutil.rmtree(temporario, ignore_errors=True)
+
+    def escrever(caminho):
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write(versao)
+
+    gravar_atomico(os.path.join(diretorio, ARQUIVO_ATUAL), escrever)
+    _limpar_versoes(diretorio, versao)
+    return versao
+
+
+def _limpar_versoes(diretorio, atual):
+    versoes = [
+        os.path.join(diretorio, nome) for nome in os.listdir(diretorio)
+        if nome != atual and os.path.isdir(os.path.join(diretorio, nome)) and ".tmp-" not in nome
+    ]
+    versoes.sort(key=os.path.getmtime, reverse=True)
+    for caminho in versoes[VERSOES_MANTIDAS - 1:]:
+        apagar_se_livre(caminho, os.path.join(caminho, "meta.json"))
+
+
+# Função para ler o nome da versão publicada atual (None se nada foi publicado)
+def versao_publicada(diretorio=DIRETORIO_SERVICO):
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_ATUAL), encoding="utf-8") as arquivo:
+            return arquivo.read().strip() or None
+    except OSError:
+        return None
+
+
+# Função para obter a assinatura da publicação (muda a cada troca de versão)
+def assinatura_publicacao(diretorio=DIRETORIO_SERVICO):
+    try:
+        estado = os.stat(os.path.join(diretorio, ARQUIVO_ATUAL))
+    except OSError:
+        return None
+    return (estado.st_mtime_ns, estado.st_size)
+
+
+# Função para carregar o dataset publicado (worker): tabela Arrow mapeada da página do disco
+def carregar_publicado(diretorio=DIRETORIO_SERVICO):
+    versao = versao_publicada(diretorio)
+    meta = _ler_json(os.path.join(diretorio, versao, "meta.json")) if versao else None
+    if meta is None:
+        raise FileNotFoundError(f"Nenhuma versão publicada em {diretorio} (rode: python servico.py)")
+
+    # A versão fica travada (não é apagada) enquanto o DataFrame mapeado existir
+    liberar = travar_uso(os.path.join(diretorio, versao, "meta.json"))
+    tabela = ler_snapshot(os.path.join(diretorio, versao, "dados.arrow"))
+    df = montar_dataframe(tabela, meta["sha256"], meta["particoes"])
+    weakref.finalize(df, liberar)
+    return df
+
+
+def _abrir_indices(diretorio, versao):
+    with _trava:
+        if versao in _indices_abertos:
+            _indices_abertos.move_to_end(versao)
+            return _indices_abertos[versao][0]
+
+    meta = _ler_json(os.path.join(diretorio, versao, "meta.json"))
+    if meta is None or meta.get("formato") != FORMATO_INDICES:
+        return {}
+    # Travada enquanto os índices estiverem entre os abertos deste processo
+    liberar = travar_uso(os.path.join(diretorio, versao, "meta.json"))
+    indices = _ler_objetos(os.path.join(diretorio, versao), meta["buffers"])
+
+    liberados = []
+    with _trava:
+        if versao in _indices_abertos:
+            liberados.append(liberar)
+            indices = _indices_abertos[versao][0]
+        else:
+            _indices_abertos[versao] = (indices, liberar)
+        while len(_indices_abertos) > VERSOES_MANTIDAS:
+            liberados.append(_indices_abertos.popitem(last=False)[1][1])
+    for funcao in liberados:
+        funcao()
+    return indices
+
+
+# Função para obter um índice publicado para a versão do DataFrame (None se não houver)
+def indice_publicado(nome, df, diretorio=DIRETORIO_SERVICO):
+    versao = df.attrs.get("versao")
+    if versao is None or df.attrs.get("linhas") != len(df):
+        return None
+    if not os.path.isdir(os.path.join(diretorio, versao)):
+        return None
+    return _abrir_indices(diretorio, versao).get(nome)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "status":
+        print(f"Versão publicada: {versao_publicada() or 'nenhuma'}")
+        sys.exit(0)
+
+    versao = publicar()
+    print(f"Versão {versao} publicada em {DIRETORIO_SERVICO}.")
+    print("Inicie os workers com INFORMATIVOS_MODO_SERVICO=1 streamlit run app.py")
@@ -0,0 +1,46 @@
+import pyarrow as pa
+
+# Colunas exibidas no modo Tabela
+COLUNAS_TABELA = ["Informativo", "Classe Processo", "Data Julgamento", "Título", "Ramo Direito", "Matéria"]
+
+# Acima deste número de linhas a tabela é enviada em lotes (um lote por vez)
+LINHAS_POR_LOTE = 5000
+
+
+# Provedor de dados da tabela
+#
+# Projeta as colunas antes de tocar nas linhas e entrega Arrow (datas continuam
+# datetime nativo; a formatação fica a cargo do column_config na interface).
+class ProvedorTabela:
+    def __init__(self, df, colunas=COLUNAS_TABELA, linhas_por_lote=LINHAS_POR_LOTE):
+        self.df = df
+        self.colunas = list(colunas)
+        self.linhas_por_lote = linhas_por_lote
+        self._indices_colunas = [df.columns.get_loc(c) for c in self.colunas]
+
+    def num_lotes(self, linhas):
+        return max(1, (len(linhas) + self.linhas_por_lote - 1) // self.linhas_por_lote)
+
+    # Função para gerar um RecordBatch com as colunas projetadas das posições pedidas
+    def lote(self, linhas, numero=0):
+        inicio = numero * self.linhas_por_lote
+        posicoes = linhas[inicio:inicio + self.linhas_por_lote]
+        projetado = self.df.iloc[posicoes, self._indices_colunas]
+        # Com partições ingeridas as colunas Arrow do DataFrame têm vários pedaços
+        # (ChunkedArray), que RecordBatch.from_pandas não aceita: juntar os pedaços
+        tabela = pa.Table.from_pandas(projetado, preserve_index=False).combine_chunks()
+        lotes = tabela.to_batches()
+        return lotes[0] if lotes else pa.RecordBatch.from_pylist([], schema=tabela.schema)
+
+    # Função para iterar sobre todos os lotes (ex.: exportação ou envio incremental)
+    def lotes(self, linhas):
+        for numero in range(self.num_lotes(linhas)):
+            yield self.lote(linhas, numero)
+
+    # Tabela Arrow de um lote, pronta para o st.dataframe
+    def tabela(self, linhas, numero=0):
+        return pa.Table.from_batches([self.lote(linhas, numero)])
+
+    # Posição global (iloc) de uma linha selecionada dentro de um lote
+    def posicao_global(self, linhas, numero, linha_no_lote):
+        return int(linhas[numero * self.linhas_por_lote + linha_no_lote])
@@ -0,0 +1,439 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from colunar import Posicoes, Textos
+from texto import STOPWORDS, tokenizar, tokenizar_lote
+
+# Campos de onde saem os termos
+CAMPOS_TENDENCIAS = ["Título", "Resumo", "Tese Julgado"]
+
+COLUNA_DATA = "Data Julgamento"
+COLUNA_RAMO = "Ramo Direito"
+
+# Registros mínimos (somando os dois períodos) para um termo entrar nos rankings
+MINIMO_REGISTROS = 5
+
+# Textos tokenizados por vez (limita a memória da construção)
+TEXTOS_POR_BLOCO = 8192
+
+# Chave de um n-grama: palavra << 32 | segunda palavra (unigramas usam _SEM_SEGUNDA)
+_SEM_SEGUNDA = np.int64(0xFFFFFFFF)
+
+
+def _palavra_valida(palavra):
+    return len(palavra) >= 3 and palavra not in STOPWORDS and not palavra.isdigit()
+
+
+def _textos(df):
+    colunas = [df[c].astype(object).where(df[c].notna(), None).tolist() for c in CAMPOS_TENDENCIAS]
+    return [" ".join(valor for valor in valores if valor) for valores in zip(*colunas)]
+
+
+# Mês (meses desde 1970) de cada registro; -1 quando não há data
+def _meses(df):
+    datas = df[COLUNA_DATA].to_numpy(dtype="datetime64[ns]")
+    meses = datas.astype("datetime64[M]").astype(np.int64)
+    meses[np.isnat(datas)] = -1
+    return meses
+
+
+# Ramos de cada registro ("Direito A;Direito B" conta nos dois), como CSR sobre os registros
+def _ramos(df, posicao, ramos):
+    inicio = [0]
+    grupos = []
+    for valor in df[COLUNA_RAMO].astype(object).where(df[COLUNA_RAMO].notna(), None).tolist():
+        for ramo in dict.fromkeys(r.strip() for r in (valor or "").split(";")):
+            if ramo:
+                if ramo not in posicao:
+                    posicao[ramo] = len(ramos)
+                    ramos.append(ramo)
+                grupos.append(posicao[ramo] + 1)
+        inicio.append(len(grupos))
+    return np.array(inicio, dtype=np.int64), np.array(grupos, dtype=np.int64)
+
+
+# Função para extrair os n-gramas distintos de cada texto: (documentos, chaves)
+#
+# Unigramas são as palavras válidas (sem stopwords, números e palavras curtas);
+# bigramas, pares de palavras válidas vizinhas no texto. As palavras novas entram
+# no vocabulário (posicao/palavras), que só cresce.
+def _ngramas(textos, posicao, palavras):
+    tokens = tokenizar_lote(textos)
+    contagens = np.array([len(t) for t in tokens], dtype=np.int64)
+    if not contagens.sum():
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    codigos, unicos = pd.factorize(np.array([token for t in tokens for token in t], dtype=object))
+    traducao = np.full(len(unicos), -1, dtype=np.int64)
+    for i, palavra in enumerate(unicos):
+        if _palavra_valida(palavra):
+            if palavra not in posicao:
+                posicao[palavra] = len(palavras)
+                palavras.append(palavra)
+            traducao[i] = posicao[palavra]
+    ids = traducao[codigos]
+    documento = np.repeat(np.arange(len(textos)), contagens)
+    validas = ids >= 0
+
+    pares = np.flatnonzero(validas[:-1] & validas[1:] & (documento[:-1] == documento[1:]))
+    documentos = np.concatenate([documento[validas], documento[pares]])
+    chaves = np.concatenate([(ids[validas] << 32) | _SEM_SEGUNDA, (ids[pares] << 32) | ids[pares + 1]])
+
+    if not len(chaves):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    # Cada n-grama conta uma vez por texto (frequência em registros)
+    locais, unicas = pd.factorize(chaves)
+    distintos = np.unique(documentos * len(unicas) + locais)
+    return distintos // len(unicas), unicas[distintos % len(unicas)]
+
+
+# Função para contar os registros de cada (n-grama, grupo, mês) de um DataFrame
+#
+# Grupo 0 reúne todos os registros; o grupo g > 0 é o ramo g - 1. Devolve as células
+# (chaves dos n-gramas, grupos, meses, contagens) e os registros por (grupo, mês).
+def _celulas(df, posicao, palavras, posicao_ramos, ramos):
+    meses = _meses(df)
+    inicio_ramos, grupos_ramos = _ramos(df, posicao_ramos, ramos)
+    textos = _textos(df)
+
+    partes = []
+    for inicio in range(0, len(textos), TEXTOS_POR_BLOCO):
+        documentos, chaves = _ngramas(textos[inicio:inicio + TEXTOS_POR_BLOCO], posicao, palavras)
+        documentos += inicio
+        com_data = meses[documentos] >= 0
+        documentos, chaves = documentos[com_data], chaves[com_data]
+
+        # Uma entrada no grupo 0 e uma em cada ramo do registro
+        tamanhos = inicio_ramos[documentos + 1] - inicio_ramos[documentos]
+        entradas = np.repeat(np.arange(len(documentos)), tamanhos)
+        posicoes = np.arange(tamanhos.sum()) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+        grupos = np.concatenate([np.zeros(len(documentos), dtype=np.int64), grupos_ramos[inicio_ramos[documentos[entradas]] + posicoes]])
+        documentos = np.concatenate([documentos, documentos[entradas]])
+        chaves = np.concatenate([chaves, chaves[entradas]])
+        partes.append(_agregar(chaves, grupos, meses[documentos], np.ones(len(chaves), dtype=np.int64)))
+
+    registros = np.stack([meses, np.zeros(len(meses), dtype=np.int64)])
+    linhas = np.repeat(np.arange(len(meses)), np.diff(inicio_ramos))
+    registros = np.concatenate([registros, np.stack([meses[linhas], grupos_ramos])], axis=1)
+    registros = registros[:, registros[0] >= 0]
+    return _juntar(partes), _contar_registros(registros[1], registros[0], np.ones(registros.shape[1], dtype=np.int64))
+
+
+# Função para somar os registros por (grupo, mês)
+def _contar_registros(grupos, meses, quantidades):
+    mes_inicial = meses.min() if len(meses) else 0
+    num_meses = meses.max() - mes_inicial + 1 if len(meses) else 1
+    celulas, inverso = np.unique(grupos * num_meses + (meses - mes_inicial), return_inverse=True)
+    somas = np.bincount(inverso, weights=quantidades, minlength=len(celulas)).astype(np.int64)
+    grupos, meses = np.divmod(celulas, num_meses)
+    return grupos, meses + mes_inicial, somas
+
+
+# Função para somar as contagens de células repetidas (chave, grupo, mês)
+def _agregar(chaves, grupos, meses, contagens):
+    locais, unicas = pd.factorize(chaves)
+    mes_inicial = meses.min() if len(meses) else 0
+    num_meses = meses.max() - mes_inicial + 1 if len(meses) else 1
+    num_grupos = grupos.max() + 1 if len(grupos) else 1
+    combinadas = (locais * num_grupos + grupos) * num_meses + (meses - mes_inicial)
+    celulas, inverso = np.unique(combinadas, return_inverse=True)
+    somas = np.bincount(inverso, weights=contagens, minlength=len(celulas)).astype(np.int64)
+    locais, resto = np.divmod(celulas, num_grupos * num_meses)
+    grupos, meses = np.divmod(resto, num_meses)
+    return unicas[locais], grupos, meses + mes_inicial, somas
+
+
+def _juntar(partes):
+    if not partes:
+        vazio = np.empty(0, dtype=np.int64)
+        return vazio, vazio, vazio, vazio
+    if len(partes) == 1:
+        return partes[0]
+    return _agregar(*(np.concatenate(coluna) for coluna in zip(*partes)))
+
+
+# Função para converter um período ("AAAA-MM", date ou datetime64) em meses desde 1970
+def _mes(valor):
+    return int(np.datetime64(pd.Timestamp(valor), "M").astype(np.int64))
+
+
+# Matriz esparsa termo × período: registros com cada n-grama em cada mês, por ramo
+#
+# Uma linha CSR por (grupo, termo) presente, com as células (meses com contagem
+# positiva) em ordem e as contagens acumuladas. Cada linha guarda também a máscara
+# de bits dos seus meses: a posição do mês m dentro da linha é o número de bits
+# abaixo de m (popcount), então a soma de um intervalo de meses é a diferença de duas
+# acumuladas. Os rankings fazem isso para todas as linhas de um grupo de uma vez
+# (operações vetorizadas sobre fatias contíguas), sem voltar aos textos.
+# Grupo 0 reúne todos os registros; o grupo g > 0 é o ramo g - 1.
+class MatrizTendencias:
+    def __init__(self, palavras, termos, ramos, celulas, registros, num_linhas, max_memo=256):
+        self.palavras = palavras
+        self.termos = termos
+        self.ramos = ramos
+        self.num_linhas = num_linhas
+        self.num_grupos = len(ramos) + 1
+        self.max_memo = max_memo
+        self._memo = OrderedDict()
+        self._trava = threading.Lock()
+
+        # Meses cobertos: do primeiro ao último mês com registros
+        grupos_registros, meses_registros, quantidades = registros
+        self.registros = registros
+        self.mes_inicial = int(meses_registros.min()) if len(meses_registros) else 0
+        self.num_meses = int(meses_registros.max()) - self.mes_inicial + 1 if len(meses_registros) else 1
+
+        # Registros por grupo e mês (denominador das taxas), acumulados no mês
+        por_mes = np.zeros((self.num_grupos, self.num_meses + 1), dtype=np.int64)
+        por_mes[grupos_registros, meses_registros - self.mes_inicial + 1] = quantidades
+        self.registros_acumulados = np.cumsum(por_mes, axis=1)
+
+        # Células ordenadas por (grupo, termo, mês)
+        termos_celulas, grupos, meses, contagens = celulas
+        meses = meses - self.mes_inicial
+        ordem = np.lexsort((meses, termos_celulas, grupos))
+        linhas_celulas = grupos[ordem] * len(termos) + termos_celulas[ordem]
+        self.meses = meses[ordem].astype(np.int16)
+        self.acumuladas = np.concatenate([[0], np.cumsum(contagens[ordem])])
+
+        # Linhas (grupo, termo): início das células, termo e máscara dos meses (64 por palavra)
+        linhas, self.inicio_linhas = np.unique(linhas_celulas, return_index=True)
+        self.inicio_linhas = np.append(self.inicio_linhas, len(linhas_celulas))
+        grupos_linhas, termos_linhas = np.divmod(linhas, max(len(termos), 1))
+        self.termos_linhas = termos_linhas.astype(np.int32)
+        self.inicio_grupos = np.searchsorted(grupos_linhas, np.arange(self.num_grupos + 1))
+        self.mascaras = np.zeros((len(linhas), -(-self.num_meses // 64)), dtype=np.uint64)
+        indices = np.repeat(np.arange(len(linhas)), np.diff(self.inicio_linhas))
+        np.bitwise_or.at(
+            self.mascaras, (indices, self.meses // 64), np.left_shift(np.uint64(1), (self.meses % 64).astype(np.uint64))
+        )
+
+        # Ordem do n-grama (1 ou 2 palavras) de cada termo
+        self.ordens = np.where((termos & _SEM_SEGUNDA) == _SEM_SEGUNDA, 1, 2).astype(np.int8)
+        self._posicao_termos = None
+
+    # Serialização (modo de serviço): o memo e a trava ficam de fora; palavras e a
+    # busca de termos viram arrays (ver colunar.py)
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado["_memo"], estado["_trava"]
+        posicao, ordem = self._busca_termos()
+        estado["palavras"] = Textos.de_lista(self.palavras)
+        estado["_posicao_termos"] = (Posicoes.de_dict(posicao), ordem)
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._memo = OrderedDict()
+        self._trava = threading.Lock()
+
+    @classmethod
+    def construir(cls, df):
+        palavras = []
+        ramos = []
+        celulas, registros = _celulas(df, {}, palavras, {}, ramos)
+        return cls._montar(palavras, np.empty(0, dtype=np.int64), ramos, None, celulas, registros, len(df))
+
+    # Células (termo, grupo, mês, contagem) a partir das linhas
+    def _celulas(self):
+        linhas = np.repeat(np.arange(len(self.termos_linhas)), np.diff(self.inicio_linhas))
+        grupos = np.repeat(np.arange(self.num_grupos), np.diff(self.inicio_grupos))[linhas]
+        return (
+            self.termos_linhas[linhas].astype(np.int64), grupos,
+            self.meses.astype(np.int64) + self.mes_inicial, np.diff(self.acumuladas),
+        )
+
+    @classmethod
+    def _montar(cls, palavras, termos, ramos, anteriores, celulas, registros, num_linhas):
+        # Chaves dos n-gramas -> códigos dos termos (termos novos entram no fim)
+        chaves, grupos, meses, contagens = celulas
+        todos = pd.Index(np.concatenate([termos, pd.unique(chaves)]))
+        termos = todos[~todos.duplicated()].to_numpy()
+        codigos = pd.Index(termos).get_indexer(chaves).astype(np.int64)
+        celulas = (codigos, grupos, meses, contagens)
+        if anteriores is not None:
+            celulas = _agregar(*(np.concatenate(coluna) for coluna in zip(anteriores, celulas)))
+        return cls(np.array(palavras, dtype=object), termos, list(ramos), celulas, registros, num_linhas)
+
+    # Função para criar uma nova matriz com os registros adicionais (a atual não muda)
+    #
+    # Só os textos novos são tokenizados; as células novas são somadas às antigas.
+    def estendido(self, df_novos):
+        palavras = self.palavras.tolist()
+        ramos = list(self.ramos)
+        posicao = {palavra: i for i, palavra in enumerate(palavras)}
+        celulas, registros = _celulas(df_novos, posicao, palavras, {r: i for i, r in enumerate(ramos)}, ramos)
+        registros = _contar_registros(*(np.concatenate(coluna) for coluna in zip(self.registros, registros)))
+        return MatrizTendencias._montar(
+            palavras, self.termos, ramos, self._celulas(), celulas, registros, self.num_linhas + len(df_novos)
+        )
+
+    def __len__(self):
+        return self.num_linhas
+
+    # Texto de um termo (uma ou duas palavras)
+    def texto(self, termo):
+        chave = int(self.termos[termo])
+        segunda = chave & int(_SEM_SEGUNDA)
+        if segunda == int(_SEM_SEGUNDA):
+            return self.palavras[chave >> 32]
+        return f"{self.palavras[chave >> 32]} {self.palavras[segunda]}"
+
+    # Busca dos termos digitados: palavra -> código e a ordem das chaves dos termos
+    def _busca_termos(self):
+        with self._trava:
+            if self._posicao_termos is None:
+                self._posicao_termos = (
+                    {palavra: i for i, palavra in enumerate(self.palavras)},
+                    np.argsort(self.termos, kind="stable"),
+                )
+            return self._posicao_termos
+
+    # Código do termo digitado (uma ou duas palavras) ou None
+    def termo(self, texto):
+        posicao, ordem = self._busca_termos()
+        palavras = tokenizar(texto)
+        if not 1 <= len(palavras) <= 2 or any(p not in posicao for p in palavras):
+            return None
+        chave = (posicao[palavras[0]] << 32) | (posicao[palavras[1]] if len(palavras) == 2 else int(_SEM_SEGUNDA))
+        i = np.searchsorted(self.termos, chave, sorter=ordem)
+        if i < len(ordem) and self.termos[ordem[i]] == chave:
+            return int(ordem[i])
+        return None
+
+    # Grupo de um ramo (None ou "Todos": grupo 0)
+    def grupo(self, ramo):
+        if ramo is None or ramo == "Todos":
+            return 0
+        if ramo not in self.ramos:
+            raise ValueError(f"Ramo do Direito desconhecido: {ramo}")
+        return self.ramos.index(ramo) + 1
+
+    # Meses com registros: (primeiro, último), como datetime64[M]
+    def intervalo(self):
+        com_registros = np.flatnonzero(np.diff(self.registros_acumulados[0]))
+        if not len(com_registros):
+            return None
+        return tuple((self.mes_inicial + com_registros[[0, -1]]).astype("datetime64[M]"))
+
+    # Anos com registros
+    def anos(self):
+        intervalo = self.intervalo()
+        if intervalo is None:
+            return []
+        return list(range(intervalo[0].astype(object).year, intervalo[1].astype(object).year + 1))
+
+    # Períodos padrão: os últimos `meses` meses com dados e os `meses` anteriores
+    # (None quando não há registros com data)
+    def periodos_padrao(self, meses=12):
+        intervalo = self.intervalo()
+        if intervalo is None:
+            return None
+        _, ultimo = intervalo
+        fim = int(ultimo.astype(np.int64))
+        return (fim - 2 * meses + 1, fim - meses), (fim - meses + 1, fim)
+
+    # Período inclusivo -> meses relativos [início, fim), limitados aos meses da matriz
+    def _relativo(self, periodo):
+        if periodo is None:
+            return 0, self.num_meses
+        inicio, fim = (valor if isinstance(valor, (int, np.integer)) else _mes(valor) for valor in periodo)
+        inicio = min(max(inicio - self.mes_inicial, 0), self.num_meses)
+        fim = min(max(fim - self.mes_inicial + 1, 0), self.num_meses)
+        return inicio, max(inicio, fim)
+
+    # Posição do mês (relativo) dentro de cada linha: início da linha + meses abaixo dele
+    def _posicoes(self, linhas, mes):
+        palavra, bit = divmod(mes, 64)
+        mascaras = self.mascaras[linhas]
+        abaixo = np.bitwise_count(mascaras[:, :palavra]).sum(axis=1, dtype=np.int64)
+        if bit:
+            abaixo += np.bitwise_count(mascaras[:, palavra] & np.uint64((1 << bit) - 1))
+        return self.inicio_linhas[linhas] + abaixo
+
+    # Registros com o termo no intervalo de meses relativos [início, fim), para as linhas dadas
+    def _somas(self, linhas, inicio, fim):
+        return self.acumuladas[self._posicoes(linhas, fim)] - self.acumuladas[self._posicoes(linhas, inicio)]
+
+    # Linha de (grupo, termo), ou None se o termo não aparece no grupo
+    def _linha(self, grupo, termo):
+        inicio, fim = self.inicio_grupos[grupo], self.inicio_grupos[grupo + 1]
+        linha = inicio + np.searchsorted(self.termos_linhas[inicio:fim], termo)
+        if linha < fim and self.termos_linhas[linha] == termo:
+            return int(linha)
+        return None
+
+    # Função para obter os termos que mais subiram e mais caíram entre dois períodos
+    #
+    # Períodos são pares (início, fim) de meses ("AAAA-MM", datas ou meses desde 1970),
+    # inclusivos. A variação é a diferença da fração de registros com o termo, em
+    # pontos percentuais. ordem: 1 (palavras), 2 (pares de palavras) ou None (ambos).
+    # Devolve {"subindo": DataFrame, "caindo": DataFrame}, memoizado entre sessões.
+    def variacoes(self, anterior, recente, ramo=None, ordem=None, limite=20, minimo=MINIMO_REGISTROS):
+        grupo = self.grupo(ramo)
+        anterior, recente = self._relativo(anterior), self._relativo(recente)
+        assinatura = (grupo, anterior, recente, ordem, limite, minimo)
+        with self._trava:
+            if assinatura in self._memo:
+                self._memo.move_to_end(assinatura)
+                return self._memo[assinatura]
+
+        # Só as linhas do grupo (termos que aparecem nele)
+        linhas = slice(self.inicio_grupos[grupo], self.inicio_grupos[grupo + 1])
+        termos = self.termos_linhas[linhas]
+        contagem_anterior = self._somas(linhas, *anterior)
+        contagem_recente = self._somas(linhas, *recente)
+        acumulados = self.registros_acumulados[grupo]
+        total_anterior = max(int(acumulados[anterior[1]] - acumulados[anterior[0]]), 1)
+        total_recente = max(int(acumulados[recente[1]] - acumulados[recente[0]]), 1)
+
+        taxa_anterior = contagem_anterior / total_anterior * 100
+        taxa_recente = contagem_recente / total_recente * 100
+        variacao = taxa_recente - taxa_anterior
+        elegiveis = contagem_anterior + contagem_recente >= minimo
+        if ordem is not None:
+            elegiveis &= self.ordens[termos] == ordem
+
+        resultado = {}
+        for nome, sinal in (("subindo", 1), ("caindo", -1)):
+            candidatos = np.flatnonzero(elegiveis & (sinal * variacao > 0))
+            if len(candidatos) > limite:
+                candidatos = candidatos[np.argpartition(-sinal * variacao[candidatos], limite - 1)[:limite]]
+            candidatos = candidatos[np.lexsort((termos[candidatos], -sinal * variacao[candidatos]))]
+            resultado[nome] = pd.DataFrame({
+                "Termo": [self.texto(t) for t in termos[candidatos]],
+                "Anterior": contagem_anterior[candidatos],
+                "Recente": contagem_recente[candidatos],
+                "Anterior (%)": taxa_anterior[candidatos],
+                "Recente (%)": taxa_recente[candidatos],
+                "Variação (p.p.)": variacao[candidatos],
+            })
+
+        with self._trava:
+            self._memo[assinatura] = resultado
+            if len(self._memo) > self.max_memo:
+                self._memo.popitem(last=False)
+        return resultado
+
+    # Função para obter a série mensal de um termo (registros com o termo por mês)
+    def serie(self, termo, ramo=None):
+        contagens = np.zeros(self.num_meses, dtype=np.int64)
+        linha = self._linha(self.grupo(ramo), termo)
+        if linha is not None:
+            inicio, fim = self.inicio_linhas[linha], self.inicio_linhas[linha + 1]
+            contagens[self.meses[inicio:fim]] = np.diff(self.acumuladas[inicio:fim + 1])
+        meses = np.arange(self.mes_inicial, self.mes_inicial + self.num_meses)
+        return pd.Series(contagens, index=meses.astype("datetime64[M]"))
+
+    # Função para obter os registros com o termo em cada ramo (no período, se dado)
+    def por_ramo(self, termo, periodo=None):
+        linhas = [self._linha(grupo, termo) for grupo in range(1, self.num_grupos)]
+        presentes = [i for i, linha in enumerate(linhas) if linha is not None]
+        contagens = self._somas(np.array([linhas[i] for i in presentes], dtype=np.int64), *self._relativo(periodo))
+        serie = pd.Series(contagens, index=pd.Index([self.ramos[i] for i in presentes], dtype=object))
+        serie = serie[serie > 0]
+        return serie.iloc[np.argsort(-serie.to_numpy(), kind="stable")]
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from dados import ARQUIVO_ORIGEM, ler_planilha  # noqa: E402
+
+PLANILHA = os.path.join(RAIZ, ARQUIVO_ORIGEM)
+
+
+# Planilha real lida direto (sem snapshot nem partições), compartilhada pelos testes
+@pytest.fixture(scope="session")
+def df():
+    return ler_planilha(PLANILHA, "pandas")
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from assertivas import GeradorAssertivas
+
+
+def test_mesma_semente_gera_as_mesmas_assertivas(df):
+    a = GeradorAssertivas.construir(df).gerar(200, semente=42)
+    b = GeradorAssertivas.construir(df).gerar(200, semente=42)
+    pd.testing.assert_frame_equal(a, b)
+    assert len(a) == 200
+
+
+def test_sementes_diferentes_geram_assertivas_diferentes(df):
+    gerador = GeradorAssertivas.construir(df)
+    assert not gerador.gerar(50, semente=1).equals(gerador.gerar(50, semente=2))
+
+
+def test_estendido_gera_o_mesmo_que_construir(df):
+    completo = GeradorAssertivas.construir(df)
+    estendido = GeradorAssertivas.construir(df.iloc[:500]).estendido(df.iloc[500:])
+    pd.testing.assert_frame_equal(completo.gerar(100, semente=7), estendido.gerar(100, semente=7))
+
+
+def test_linhas_restringem_os_registros(df):
+    linhas = np.arange(10, 30)
+    assertivas = GeradorAssertivas.construir(df).gerar(15, semente=3, linhas=linhas)
+    assert len(assertivas) == 15
+    assert set(assertivas["posicao"]) <= set(linhas.tolist())
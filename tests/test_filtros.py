@@ -0,0 +1,74 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agregacoes import DIMENSOES_ESTATISTICAS, CuboAgregacoes
+from filtros import COLUNAS_FACETAS, MotorFiltros
+
+
+# Seleções com o valor mais comum e um valor raro de cada faceta, e uma combinação
+def _selecoes(df):
+    selecoes = [{}]
+    for coluna in COLUNAS_FACETAS:
+        contagens = df[coluna].value_counts()
+        selecoes += [{coluna: contagens.index[0]}, {coluna: contagens.index[-1]}]
+    selecoes.append({
+        "Ramo Direito": df["Ramo Direito"].value_counts().index[0],
+        "Repercussão Geral": df["Repercussão Geral"].value_counts().index[0],
+    })
+    return selecoes
+
+
+INTERVALOS = [None, (datetime.date(2023, 1, 1), datetime.date(2023, 12, 31)), (datetime.date(2022, 3, 15), datetime.date(2024, 2, 10))]
+
+
+# Máscara calculada linha a linha com o pandas
+def _mascara(df, selecoes, intervalo):
+    mascara = np.ones(len(df), dtype=bool)
+    for coluna, valor in selecoes.items():
+        mascara &= (df[coluna] == valor).to_numpy()
+    if intervalo is not None:
+        datas = df["Data Julgamento"]
+        mascara &= (datas >= pd.Timestamp(intervalo[0])).to_numpy() & (datas < pd.Timestamp(intervalo[1]) + pd.Timedelta(days=1)).to_numpy()
+    return mascara
+
+
+@pytest.mark.parametrize("intervalo", INTERVALOS)
+def test_filtrar_igual_ao_pandas(df, intervalo):
+    motor = MotorFiltros.construir(df)
+    for selecoes in _selecoes(df):
+        esperado = np.flatnonzero(_mascara(df, selecoes, intervalo))
+        np.testing.assert_array_equal(motor.filtrar(selecoes, intervalo), esperado, err_msg=str(selecoes))
+
+
+def test_valor_inexistente_nao_filtra_nada(df):
+    assert not len(MotorFiltros.construir(df).filtrar({"Informativo": -1}))
+
+
+@pytest.mark.parametrize("corte", [1, 13, 640])
+def test_estendido_igual_a_construir(df, corte):
+    completo = MotorFiltros.construir(df)
+    estendido = MotorFiltros.construir(df.iloc[:corte]).estendido(df.iloc[corte:])
+    for coluna in COLUNAS_FACETAS:
+        np.testing.assert_array_equal(estendido.facetas[coluna]["bitsets"], completo.facetas[coluna]["bitsets"])
+    for selecoes in _selecoes(df):
+        np.testing.assert_array_equal(estendido.filtrar(selecoes, INTERVALOS[2]), completo.filtrar(selecoes, INTERVALOS[2]))
+
+
+# Intervalos alinhados ao mês saem do cubo; o de 15/03 a 10/02 sai das linhas filtradas
+@pytest.mark.parametrize("intervalo", INTERVALOS)
+def test_estatisticas_do_cubo_iguais_ao_pandas(df, intervalo):
+    cubo = CuboAgregacoes.construir(MotorFiltros.construir(df))
+    for selecoes in _selecoes(df):
+        filtrado = df[_mascara(df, selecoes, intervalo)]
+        estatisticas = cubo.estatisticas(selecoes, intervalo)
+
+        assert estatisticas["Total"] == len(filtrado)
+        for coluna in DIMENSOES_ESTATISTICAS:
+            assert estatisticas[coluna].to_dict() == filtrado[coluna].value_counts().to_dict(), (selecoes, coluna)
+        anos = filtrado["Data Julgamento"].dt.year.value_counts()
+        assert estatisticas["Ano"].to_dict() == anos.to_dict()
+        meses = filtrado["Data Julgamento"].dt.to_period("M").value_counts()
+        assert {pd.Period(m, "M"): n for m, n in estatisticas["Mês"].items()} == meses.to_dict()
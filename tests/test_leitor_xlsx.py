@@ -0,0 +1,53 @@
+import re
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from conftest import PLANILHA
+from dados import ler_planilha
+from leitor_xlsx import PLANILHA_PADRAO, ler_lotes
+
+
+# Nulos do mesmo jeito nos dois lados (read_excel usa NaN, o leitor usa None)
+def _nulos(df):
+    return df.apply(lambda c: c.astype(object).where(c.notna(), None) if c.dtype == object else c)
+
+
+def _planilha_exemplo(caminho):
+    pd.DataFrame({
+        "Número": np.arange(23),
+        "Fração": np.linspace(0, 1, 23),
+        "Texto": [f"Ação nº {i}" if i % 3 else None for i in range(23)],
+        "Especiais": [" espaços ", "a & b < c > d", "linha\nquebrada"] * 7 + ["", "fim"],
+    }).to_excel(caminho, index=False)
+
+
+def test_lotes_iguais_ao_read_excel(tmp_path):
+    caminho = tmp_path / "exemplo.xlsx"
+    _planilha_exemplo(caminho)
+
+    lotes = list(ler_lotes(caminho, linhas_por_lote=5))
+    assert [len(lote) for lote in lotes] == [5, 5, 5, 5, 3]
+    lido = pd.concat(lotes, ignore_index=True)
+    pd.testing.assert_frame_equal(_nulos(lido), _nulos(pd.read_excel(caminho)))
+
+
+# O atributo r das células é opcional: sem ele a célula fica na coluna seguinte
+def test_celulas_sem_referencia(tmp_path):
+    caminho = tmp_path / "exemplo.xlsx"
+    _planilha_exemplo(caminho)
+    with zipfile.ZipFile(caminho) as arquivo_zip:
+        conteudos = {nome: arquivo_zip.read(nome) for nome in arquivo_zip.namelist()}
+    conteudos[PLANILHA_PADRAO] = re.sub(rb'<c r="[AB]\d+"', b"<c", conteudos[PLANILHA_PADRAO])
+    sem_referencia = tmp_path / "sem_referencia.xlsx"
+    with zipfile.ZipFile(sem_referencia, "w") as arquivo_zip:
+        for nome, conteudo in conteudos.items():
+            arquivo_zip.writestr(nome, conteudo)
+
+    lido = pd.concat(ler_lotes(sem_referencia), ignore_index=True)
+    pd.testing.assert_frame_equal(_nulos(lido), _nulos(pd.read_excel(caminho)))
+
+
+def test_planilha_real_igual_ao_read_excel():
+    pd.testing.assert_frame_equal(_nulos(ler_planilha(PLANILHA, "streaming")), _nulos(ler_planilha(PLANILHA, "pandas")))
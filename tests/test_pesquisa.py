@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from pesquisa import CAMPOS_PESQUISA, IndicePesquisa
+from texto import tokenizar
+
+CONSULTAS = [
+    "tributario",
+    "ICMS",
+    "constitucion",
+    "Repercussão",
+    '"direito adquirido"',
+    '"servidor publico" estabilidade',
+    "ICMS-comunicação",
+    "xyzinexistente",
+]
+
+
+# Busca por força bruta: str.contains em cada campo normalizado (sem acentos, minúsculo)
+#
+# Palavras casam em qualquer parte do texto; frases só com palavras inteiras nas pontas.
+def _buscar_pandas(df, consulta):
+    normalizados = {c: df[c].fillna("").map(lambda v: f" {' '.join(tokenizar(v))} ") for c in CAMPOS_PESQUISA}
+    trechos = [f" {' '.join(tokenizar(f))} " for f in consulta.split('"')[1::2]]
+    for trecho in "".join(consulta.split('"')[0::2]).split():
+        tokens = tokenizar(trecho)
+        trechos.append(f" {' '.join(tokens)} " if len(tokens) > 1 else tokens[0])
+
+    mascara = np.ones(len(df), dtype=bool)
+    for trecho in trechos:
+        presente = np.zeros(len(df), dtype=bool)
+        for serie in normalizados.values():
+            presente |= serie.str.contains(trecho, regex=False).to_numpy()
+        mascara &= presente
+    return np.flatnonzero(mascara)
+
+
+@pytest.fixture(scope="module")
+def indice(df):
+    return IndicePesquisa.construir(df)
+
+
+@pytest.mark.parametrize("consulta", CONSULTAS)
+def test_buscar_igual_ao_str_contains(df, indice, consulta):
+    np.testing.assert_array_equal(np.sort(indice.buscar(consulta)), _buscar_pandas(df, consulta))
+
+
+def test_buscar_restrito_as_linhas(df, indice):
+    linhas = np.arange(0, len(df), 3)
+    esperado = np.intersect1d(_buscar_pandas(df, "tributario"), linhas)
+    np.testing.assert_array_equal(np.sort(indice.buscar("tributario", linhas)), esperado)
+
+
+def test_estendido_igual_a_construir(df, indice):
+    estendido = IndicePesquisa.construir(df.iloc[:700]).estendido(df.iloc[700:])
+    for consulta in CONSULTAS:
+        np.testing.assert_array_equal(np.sort(estendido.buscar(consulta)), np.sort(indice.buscar(consulta)))
@@ -0,0 +1,79 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tendencias import CAMPOS_TENDENCIAS, MINIMO_REGISTROS, MatrizTendencias
+from texto import STOPWORDS, tokenizar
+
+ANTERIOR = ("2023-01", "2023-12")
+RECENTE = ("2024-01", "2024-12")
+
+
+def _valida(palavra):
+    return len(palavra) >= 3 and palavra not in STOPWORDS and not palavra.isdigit()
+
+
+# Contagem direta: registros do período (e do ramo) com cada palavra ou par de palavras vizinhas
+def _contar(df, periodo, ramo=None):
+    meses = df["Data Julgamento"].dt.to_period("M")
+    mascara = (meses >= pd.Period(periodo[0], "M")) & (meses <= pd.Period(periodo[1], "M"))
+    if ramo is not None:
+        mascara &= df["Ramo Direito"].fillna("").map(lambda v: ramo in [r.strip() for r in v.split(";")])
+
+    contagem = Counter()
+    for _, registro in df[mascara].iterrows():
+        tokens = tokenizar(" ".join(registro[c] for c in CAMPOS_TENDENCIAS if pd.notna(registro[c])))
+        termos = {t for t in tokens if _valida(t)}
+        termos |= {f"{a} {b}" for a, b in zip(tokens, tokens[1:]) if _valida(a) and _valida(b)}
+        contagem.update(termos)
+    return contagem, int(mascara.sum())
+
+
+@pytest.fixture(scope="module")
+def matriz(df):
+    return MatrizTendencias.construir(df)
+
+
+@pytest.mark.parametrize("ordem", [1, 2, None])
+@pytest.mark.parametrize("ramo", [None, "Direito Tributário"])
+def test_variacoes_iguais_a_contagem_direta(df, matriz, ordem, ramo):
+    anterior, total_anterior = _contar(df, ANTERIOR, ramo)
+    recente, total_recente = _contar(df, RECENTE, ramo)
+    variacoes = {
+        termo: recente[termo] / total_recente * 100 - anterior[termo] / total_anterior * 100
+        for termo in set(anterior) | set(recente)
+        if anterior[termo] + recente[termo] >= MINIMO_REGISTROS and ordem in (None, termo.count(" ") + 1)
+    }
+
+    resultado = matriz.variacoes(ANTERIOR, RECENTE, ramo=ramo, ordem=ordem, limite=15)
+    for nome, sinal in (("subindo", 1), ("caindo", -1)):
+        tabela = resultado[nome]
+        assert len(tabela)
+        for linha in tabela.to_dict("records"):
+            termo = linha["Termo"]
+            assert (linha["Anterior"], linha["Recente"]) == (anterior[termo], recente[termo]), termo
+            assert linha["Anterior (%)"] == pytest.approx(anterior[termo] / total_anterior * 100)
+            assert linha["Variação (p.p.)"] == pytest.approx(variacoes[termo])
+
+        # Os maiores (ou menores) valores da contagem direta, na ordem do ranking
+        esperados = sorted((sinal * v for v in variacoes.values() if sinal * v > 0), reverse=True)[:15]
+        np.testing.assert_allclose(sinal * tabela["Variação (p.p.)"].to_numpy(), esperados)
+
+
+def test_estendido_igual_a_construir(df, matriz):
+    estendido = MatrizTendencias.construir(df.iloc[:900]).estendido(df.iloc[900:])
+    for ramo in (None, "Direito Tributário"):
+        esperado = matriz.variacoes(ANTERIOR, RECENTE, ramo=ramo)
+        obtido = estendido.variacoes(ANTERIOR, RECENTE, ramo=ramo)
+        for nome in ("subindo", "caindo"):
+            pd.testing.assert_frame_equal(obtido[nome], esperado[nome])
+
+
+def test_sem_registros_com_data(df):
+    vazia = MatrizTendencias.construir(df.iloc[:0])
+    assert vazia.intervalo() is None
+    assert vazia.periodos_padrao() is None
+    sem_datas = MatrizTendencias.construir(df.iloc[:20].assign(**{"Data Julgamento": pd.NaT}))
+    assert sem_datas.periodos_padrao() is None
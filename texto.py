@@ -0,0 +1,50 @@
+import re
+import unicodedata
+
+# Padrão de token: sequências de letras/dígitos (após remoção de acentos)
+_PADRAO_TOKEN = re.compile(r"\w+")
+
+# Palavras muito frequentes em português, já sem acento
+STOPWORDS = frozenset("""
+a ao aos as ate com como da das de dela dele deles do dos e ela elas ele eles em entre
+era essa essas esse esses esta estas este estes eu foi foram ha isso isto ja la lhe
+mais mas me mesmo meu minha muito na nao nas nem no nos num numa o os ou para pela
+pelas pelo pelos por qual quais quando que quem se sem ser seu seus so sobre sua suas
+tambem te tem ter um uma umas uns voce
+""".split())
+
+
+# Função para normalizar texto: minúsculas e sem acentos (ex.: "Tributário" -> "tributario")
+def normalizar(texto):
+    if not texto:
+        return ""
+    decomposto = unicodedata.normalize("NFKD", str(texto).casefold())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+# Função para quebrar um texto em tokens normalizados
+def tokenizar(texto):
+    return _PADRAO_TOKEN.findall(normalizar(texto))
+
+
+# Separador entre textos ao normalizar um bloco de uma vez
+_SEPARADOR = "\x1e"
+
+
+# Função para quebrar vários textos em tokens de uma vez (listas de palavras minúsculas e sem acentos)
+#
+# Mesmo resultado prático do tokenizar, mas com o bloco inteiro normalizado numa
+# única chamada (caracteres sem equivalente ASCII são descartados).
+def tokenizar_lote(textos):
+    normalizado = unicodedata.normalize("NFKD", _SEPARADOR.join(textos).casefold())
+    normalizado = normalizado.encode("ascii", "ignore").decode("ascii")
+    return [_PADRAO_TOKEN.findall(texto) for texto in normalizado.split(_SEPARADOR)]
+
+
+# Função para extrair os termos de uma consulta (sem stopwords e sem termos curtos)
+def termos_consulta(texto, tamanho_minimo=4):
+    termos = []
+    for token in tokenizar(texto):
+        if len(token) >= tamanho_minimo and token not in STOPWORDS and token not in termos:
+            termos.append(token)
+    return termos